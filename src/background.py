@@ -46,6 +46,11 @@ class Background:
         self.mountains = self.make_mountains()
         self.trees = self.generate_trees()
         self.clouds = self.generate_clouds()
+
+        # Render quality settings, changed by the QualityGovernor in quality.py
+        self.tree_count = len(self.trees)  # Trees are placed randomly, so the first N trees are a random subset
+        self.render_scale = 1.0  # Internal resolution of the scenery, 1.0 means full window resolution
+        self.low_res_surface = None
         
 
     def make_mountains(self):
@@ -131,7 +136,7 @@ class Background:
             clouds.append({"x": x, "y": y})
         return clouds
 
-    def draw_pixel_tree(self, screen, x, y, trunk_height, leaves_height):
+    def draw_pixel_tree(self, screen, x, y, trunk_height, leaves_height, scale=1.0):
         trunk_color = (101, 67, 33)  # Muted brown
         leaves_color = (76, 115, 76)  # Muted green
         
@@ -139,45 +144,45 @@ class Background:
         leaves_width = trunk_height // 2
         
         # Draw trunk from bottom up
-        pygame.draw.rect(screen, trunk_color, (x - trunk_width // 2, y - trunk_height // 2, trunk_width, trunk_height // 2))
+        pygame.draw.rect(screen, trunk_color, ((x - trunk_width // 2) * scale, (y - trunk_height // 2) * scale, max(1, trunk_width * scale), trunk_height // 2 * scale))
         
         # Draw lower part of the leaves as a larger triangle
         pygame.draw.polygon(screen, leaves_color, [
-            (x, y - trunk_height // 2 - leaves_height),
-            (x - leaves_width, y - trunk_height // 2),
-            (x + leaves_width, y - trunk_height // 2)
+            (x * scale, (y - trunk_height // 2 - leaves_height) * scale),
+            ((x - leaves_width) * scale, (y - trunk_height // 2) * scale),
+            ((x + leaves_width) * scale, (y - trunk_height // 2) * scale)
         ])
         
         # Draw upper part of the leaves as a smaller triangle, intertwined with the lower part
         pygame.draw.polygon(screen, leaves_color, [
-            (x, y - trunk_height // 2 - leaves_height * 1.3),
-            (x - leaves_width * 0.7, y - trunk_height // 2 - leaves_height * 0.5),
-            (x + leaves_width * 0.7, y - trunk_height // 2 - leaves_height * 0.5)
+            (x * scale, (y - trunk_height // 2 - leaves_height * 1.3) * scale),
+            ((x - leaves_width * 0.7) * scale, (y - trunk_height // 2 - leaves_height * 0.5) * scale),
+            ((x + leaves_width * 0.7) * scale, (y - trunk_height // 2 - leaves_height * 0.5) * scale)
         ])
 
-    def draw_pixel_cloud(self, screen, x, y):
+    def draw_pixel_cloud(self, screen, x, y, scale=1.0):
         cloud_color = (255, 255, 255)  # White
         
-        pygame.draw.rect(screen, cloud_color, (x, y, 30, 15))
-        pygame.draw.rect(screen, cloud_color, (x + 5, y - 5, 20, 5))
-        pygame.draw.rect(screen, cloud_color, (x + 10, y + 15, 15, 5))
+        pygame.draw.rect(screen, cloud_color, (x * scale, y * scale, 30 * scale, 15 * scale))
+        pygame.draw.rect(screen, cloud_color, ((x + 5) * scale, (y - 5) * scale, 20 * scale, 5 * scale))
+        pygame.draw.rect(screen, cloud_color, ((x + 10) * scale, (y + 15) * scale, 15 * scale, 5 * scale))
         
-    def draw_mountain(self, screen, x, y, width, height, snow_height):
+    def draw_mountain(self, screen, x, y, width, height, snow_height, scale=1.0):
         # Draw the main mountain body
         mountain_color = (100, 100, 100)  # Gray
         mountain_points = [
-            (x, y),
-            (x + width // 2, y - height),
-            (x + width, y)
+            (x * scale, y * scale),
+            ((x + width // 2) * scale, (y - height) * scale),
+            ((x + width) * scale, y * scale)
         ]
         pygame.draw.polygon(screen, mountain_color, mountain_points)
 
         # Calculate snow cap points
         snow_width = width * snow_height // height  # Adjust snow width based on mountain proportions
         snow_points = [
-            (x + width // 2, y - height),
-            (x + (width - snow_width) // 2, y - height + snow_height),
-            (x + (width + snow_width) // 2, y - height + snow_height)
+            ((x + width // 2) * scale, (y - height) * scale),
+            ((x + (width - snow_width) // 2) * scale, (y - height + snow_height) * scale),
+            ((x + (width + snow_width) // 2) * scale, (y - height + snow_height) * scale)
         ]
 
         # Draw the snow cap
@@ -185,39 +190,51 @@ class Background:
         pygame.draw.polygon(screen, snow_color, snow_points)
 
     def draw(self, screen, vehicle,delta_time):
+        self.update(vehicle, delta_time)
+        if self.render_scale >= 1.0:
+            self.draw_layers(screen, 1.0)
+            return
+        # Lower quality: draw the scenery on a smaller surface and stretch it over the window
+        low_res_size = (int(self.width * self.render_scale), int(self.height * self.render_scale))
+        if self.low_res_surface is None or self.low_res_surface.get_size() != low_res_size:
+            self.low_res_surface = pygame.Surface(low_res_size).convert()
+        self.draw_layers(self.low_res_surface, self.render_scale)
+        pygame.transform.scale(self.low_res_surface, screen.get_size(), screen)
+
+    def draw_layers(self, screen, scale):
+        # All positions below are in window pixels; scale converts them to the surface we draw on
         screen.fill(self.sky_color)
-        pygame.draw.rect(screen, self.ground_color, (0, self.horizon, self.width, self.height - self.horizon))
+        pygame.draw.rect(screen, self.ground_color, (0, self.horizon * scale, self.width * scale, (self.height - self.horizon) * scale))
         # Draw road 
-        pygame.draw.rect(screen, self.road_color, (0, self.road_top_position, self.width, self.road_thickness))
-        self.update(vehicle, delta_time)
+        pygame.draw.rect(screen, self.road_color, (0, self.road_top_position * scale, self.width * scale, self.road_thickness * scale))
         # Draw mountains
         for mountain in self.mountains:
             x, y, width, height, peak_offset = mountain
             adjusted_x = (x + self.mountain_offset) % self.width
-            self.draw_mountain(screen, adjusted_x, self.horizon, width, height, height // 4)
+            self.draw_mountain(screen, adjusted_x, self.horizon, width, height, height // 4, scale)
             if adjusted_x + width > self.width:
-                self.draw_mountain(screen, adjusted_x - self.width, self.horizon, width, height, height // 4)
+                self.draw_mountain(screen, adjusted_x - self.width, self.horizon, width, height, height // 4, scale)
         
         # Draw clouds
         sky_height_limit = int(self.height * 0.19)  # Set the sky height limit to 19% of the screen height
         for cloud in self.clouds:
             adjusted_x = (cloud["x"] + self.cloud_offset) % self.width
             adjusted_y = min(cloud["y"], sky_height_limit - 20)  # Ensure clouds are above the sky height limit
-            self.draw_pixel_cloud(screen, adjusted_x, adjusted_y)
+            self.draw_pixel_cloud(screen, adjusted_x, adjusted_y, scale)
             if adjusted_x + 30 > self.width:  # 30 is the width of the cloud in draw_pixel_cloud
-                self.draw_pixel_cloud(screen, adjusted_x - self.width, adjusted_y)
+                self.draw_pixel_cloud(screen, adjusted_x - self.width, adjusted_y, scale)
 
         # Draw trees
-        for tree in self.trees:
+        for tree in self.trees[:self.tree_count]:
             adjusted_x = (tree["x"] + self.tree_offset) % self.width
-            self.draw_pixel_tree(screen, adjusted_x, tree["y"], tree["trunk_height"], tree["leaves_height"])
+            self.draw_pixel_tree(screen, adjusted_x, tree["y"], tree["trunk_height"], tree["leaves_height"], scale)
             if adjusted_x + tree["trunk_height"] // 2 > self.width:
-                self.draw_pixel_tree(screen, adjusted_x - self.width, tree["y"], tree["trunk_height"], tree["leaves_height"])
+                self.draw_pixel_tree(screen, adjusted_x - self.width, tree["y"], tree["trunk_height"], tree["leaves_height"], scale)
 
         # Draw road marks
-        marking_y = self.road_top_position + self.road_thickness // 2
+        marking_y = (self.road_top_position + self.road_thickness // 2) * scale
         for x in range(int(self.road_marks_offset) % self.ROAD_MARK_CYCLE - self.ROAD_MARK_CYCLE, self.width, self.ROAD_MARK_CYCLE):
-            pygame.draw.line(screen, (255, 255, 255), (x, marking_y), (x + self.DASH_LENGTH, marking_y), 2)
+            pygame.draw.line(screen, (255, 255, 255), (x * scale, marking_y), ((x + self.DASH_LENGTH) * scale, marking_y), max(1, int(2 * scale)))
     
     def update(self, vehicle, delta_time):
         if not self.paused:
@@ -235,4 +252,10 @@ class Background:
             self.cloud_offset -= visual_speed * delta_time / 40
 
     def set_paused(self, paused):
-        self.paused = paused
\ No newline at end of file
+        self.paused = paused
+
+    def set_tree_count(self, tree_count):
+        self.tree_count = max(0, min(tree_count, len(self.trees)))
+
+    def set_render_scale(self, render_scale):
+        self.render_scale = max(0.25, min(render_scale, 1.0))
\ No newline at end of file
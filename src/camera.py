@@ -0,0 +1,38 @@
+# camera.py
+# This file defines the Camera, the part of the world the window shows.
+# - The vehicle and its trailers move in world coordinates (pixels, the vehicle's position), which keep growing
+#   for as long as the run goes on. The camera turns them into window coordinates by moving them left by x.
+# - At first the camera stands still and the vehicle drives from the left of the window to follow_x (a third of
+#   the window), like the game always looked. From there on the camera follows the vehicle, so it stays at follow_x
+#   and a run goes on to top speed and beyond instead of starting over at the right edge of the window.
+# - rect is the window in world coordinates. Everything that is drawn in the world (the vehicle, its wheels, the
+#   trailers, and later other traffic) first checks sees(rect) and is not drawn at all when it is off screen.
+#   The scenery (background.py) scrolls with the vehicle's speed and wraps around the window, so it only ever draws
+#   what is inside the window anyway.
+
+import pygame
+
+
+class Camera:
+    def __init__(self, width, height, follow_x=None):
+        self.follow_x = width // 3 if follow_x is None else follow_x  # Window x where the vehicle's left edge stays
+        self.rect = pygame.Rect(0, 0, width, height)  # The window, in world coordinates
+
+    @property
+    def x(self):
+        return self.rect.x
+
+    def reset(self):
+        self.rect.x = 0
+
+    def follow(self, world_x):
+        # Keeps world_x (the vehicle's left edge) at follow_x once it got there. Whole pixels, like the vehicle's
+        # rect, so the vehicle doesn't jitter by one pixel from frame to frame.
+        self.rect.x = max(0, int(world_x) - self.follow_x)
+
+    def sees(self, rect):
+        return self.rect.colliderect(rect)
+
+    def to_screen(self, position):
+        # World (x, y) -> window (x, y)
+        return position[0] - self.rect.x, position[1]
@@ -0,0 +1,208 @@
+# conformance.py
+# This file checks that every physics backend (see physics_backends.py) gives the same results as the
+# reference backend, for every vehicle in VEHICLE_CONFIGS and every trailer load from the menu.
+# It records a trace (speed, position, RPM, gear, throttle, forces, CO2 at every tick) with each backend
+# and compares them channel by channel. For every channel it reports the biggest difference and the
+# first tick where the difference goes over the tolerance.
+# Optionally (--game) it also checks the reference backend against the game's own Vehicle class,
+# so we know the reference itself still matches what you see on screen.
+# choose_backend() uses this to pick the fastest backend on this machine, but only among the ones that pass.
+#
+# Run it from the src folder with:  python conformance.py
+# or, to also time the backends:   python conformance.py --benchmark 10000
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from vehicle_configs import VEHICLE_CONFIGS
+from results_cache import default_runs
+from fleet import Fleet
+from physics_backends import available_backends, ELECTRIC_JITTER_MAX
+
+TRACE_DURATION = 60.0  # seconds of simulated time, enough for every vehicle to go through all its gears
+TRACE_TIME_STEP = 1 / 60
+TRACE_SEED = 1234  # Same random RPM drops for every backend
+
+# Channel -> (absolute tolerance, relative tolerance)
+CHANNEL_TOLERANCES = {
+    "speed": (1e-6, 1e-9),  # m/s
+    "position": (1e-4, 1e-9),  # m
+    "current_rpm": (1e-3, 1e-9),
+    "current_gear": (0, 0),  # must be exactly the same
+    "throttle": (1e-9, 1e-9),
+    "wheel_force": (1e-3, 1e-9),  # N
+    "resistance_force": (1e-3, 1e-9),  # N
+    "slip_ratio": (1e-6, 1e-9),
+    "co2_emissions": (1e-9, 1e-9),  # kg
+}
+
+
+def make_fleet(runs, backend, seed=TRACE_SEED):
+    configs = [VEHICLE_CONFIGS[vehicle_type] for vehicle_type, _ in runs]
+    names = [vehicle_type for vehicle_type, _ in runs]
+    return Fleet(configs, [trailer_mass for _, trailer_mass in runs], names=names, seed=seed, backend=backend)
+
+
+def record_trace(backend, runs=None, duration=TRACE_DURATION, delta_time=TRACE_TIME_STEP):
+    # Full-throttle launch of all the runs at once. Returns {channel: array of shape (ticks, runs)}.
+    runs = default_runs() if runs is None else runs
+    fleet = make_fleet(runs, backend)
+    fleet.reset()
+    fleet.start()
+    ticks = int(round(duration / delta_time))
+    trace = {channel: np.zeros((ticks, len(runs))) for channel in CHANNEL_TOLERANCES}
+    for tick in range(ticks):
+        fleet.step(delta_time)
+        for channel, values in trace.items():
+            values[tick] = getattr(fleet, channel)
+    return trace
+
+
+def record_game_trace(runs=None, duration=TRACE_DURATION, delta_time=TRACE_TIME_STEP, seed=None):
+    # Same trace, but made with the game's Vehicle class (one run at a time). Needs pygame.
+    # seed makes the electric motor RPM drops repeatable (golden_traces.py needs the same trace every time).
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Never open a window for this
+    from headless import make_headless_vehicle
+    runs = default_runs() if runs is None else runs
+    ticks = int(round(duration / delta_time))
+    trace = {channel: np.zeros((ticks, len(runs))) for channel in CHANNEL_TOLERANCES if channel != "resistance_force"}
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")  # Vehicle prints a lot of debug messages
+    try:
+        for column, (vehicle_type, trailer_mass) in enumerate(runs):
+            vehicle = make_headless_vehicle(vehicle_type, trailer_mass, seed)
+            vehicle.start()
+            start_position = vehicle.position[0]
+            for tick in range(ticks):
+                vehicle.update(delta_time)
+                trace["speed"][tick, column] = vehicle.speed
+                trace["position"][tick, column] = vehicle.position[0] - start_position
+                trace["current_rpm"][tick, column] = vehicle.current_rpm
+                trace["current_gear"][tick, column] = vehicle.current_gear
+                trace["throttle"][tick, column] = vehicle.throttle
+                trace["wheel_force"][tick, column] = vehicle.wheel_force
+                trace["slip_ratio"][tick, column] = vehicle.slip_ratio
+                trace["co2_emissions"][tick, column] = vehicle.co2_emissions
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return trace
+
+
+def compare_traces(trace, reference, tolerances=CHANNEL_TOLERANCES):
+    # Returns {channel: (max error, first tick over the tolerance or None)} for the channels in both traces
+    report = {}
+    for channel in trace:
+        if channel not in reference:
+            continue
+        absolute, relative = tolerances[channel]
+        error = np.abs(trace[channel] - reference[channel])
+        over = error > absolute + relative * np.abs(reference[channel])
+        failing_ticks = np.nonzero(over.any(axis=1))[0]
+        report[channel] = (float(error.max()), int(failing_ticks[0]) if len(failing_ticks) else None)
+    return report
+
+
+def passed(report):
+    return all(first_tick is None for _, first_tick in report.values())
+
+
+def print_report(name, report, runs, trace, reference, tolerances=CHANNEL_TOLERANCES):
+    print(f"{name}: {'PASS' if passed(report) else 'FAIL'}")
+    for channel, (max_error, first_tick) in report.items():
+        line = f"    {channel:<17} max error {max_error:.3g}"
+        if first_tick is not None:
+            # Name the first vehicle that goes wrong, it's the one to look at
+            absolute, relative = tolerances[channel]
+            error = np.abs(trace[channel][first_tick] - reference[channel][first_tick])
+            column = int(np.argmax(error > absolute + relative * np.abs(reference[channel][first_tick])))
+            vehicle_type, trailer_mass = runs[column]
+            load = f" with {trailer_mass:.0f} kg" if trailer_mass is not None else ""
+            line += (f", diverges at tick {first_tick} ({first_tick * TRACE_TIME_STEP:.2f} s) for {vehicle_type}{load}:"
+                     f" {trace[channel][first_tick, column]:.6g} vs {reference[channel][first_tick, column]:.6g}")
+        print(line)
+
+
+def check_backends(backends=None, runs=None, duration=TRACE_DURATION, verbose=True):
+    # Compares every backend with the reference backend. Returns {backend name: True if it passes}.
+    runs = default_runs() if runs is None else runs
+    backends = available_backends() if backends is None else backends
+    reference = record_trace("reference", runs, duration)
+    results = {"reference": True}
+    for name in backends:
+        if name == "reference":
+            continue
+        trace = record_trace(name, runs, duration)
+        report = compare_traces(trace, reference)
+        results[name] = passed(report)
+        if verbose:
+            print_report(name, report, runs, trace, reference)
+    return results
+
+
+def check_game(runs=None, duration=TRACE_DURATION):
+    # Compares the reference backend with the game's Vehicle class
+    runs = default_runs() if runs is None else runs
+    reference = record_trace("reference", runs, duration)
+    trace = record_game_trace(runs, duration)
+    tolerances = dict(CHANNEL_TOLERANCES)
+    # The game's Vehicle draws the electric motor RPM drops from its own seeded random.Random and the Fleet from a
+    # NumPy generator, two different streams, so the RPM can differ by up to one drop.
+    # The drop only changes the RPM shown on the gauge, not the force, so the other channels must still match.
+    if any(VEHICLE_CONFIGS[vehicle_type].get('is_electric', False) for vehicle_type, _ in runs):
+        tolerances["current_rpm"] = (ELECTRIC_JITTER_MAX, 1e-9)
+    report = compare_traces(trace, reference, tolerances)
+    print_report("game Vehicle vs reference", report, runs, trace, reference, tolerances)
+    return passed(report)
+
+
+def benchmark(backend, fleet_size, ticks=200, delta_time=TRACE_TIME_STEP):
+    # Seconds per tick for a fleet of fleet_size vehicles (the default runs repeated)
+    runs = default_runs()
+    fleet = make_fleet([runs[row % len(runs)] for row in range(fleet_size)], backend)
+    fleet.reset()
+    fleet.start()
+    fleet.step(delta_time)  # The first step may compile code (numba), don't count it
+    start = time.perf_counter()
+    for _ in range(ticks):
+        fleet.step(delta_time)
+    return (time.perf_counter() - start) / ticks
+
+
+def choose_backend(fleet_size=1000, duration=TRACE_DURATION, verbose=False, check_results=None):
+    # The fastest backend on this machine for fleets of about fleet_size vehicles, among the ones
+    # that pass the conformance check. The reference backend always passes, so there is always an answer.
+    # check_results: the output of check_backends, if it was already run
+    check_results = check_backends(duration=duration, verbose=verbose) if check_results is None else check_results
+    conforming = [name for name, ok in check_results.items() if ok]
+    timings = {name: benchmark(name, fleet_size) for name in conforming}
+    if verbose:
+        for name, seconds in sorted(timings.items(), key=lambda item: item[1]):
+            print(f"    {name:<10} {seconds * 1e6:10.1f} us per tick for {fleet_size} vehicles")
+    return min(timings, key=timings.get)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the physics backends against the reference traces")
+    parser.add_argument("--duration", type=float, default=TRACE_DURATION, help="seconds of simulated time per trace")
+    parser.add_argument("--backend", action="append", help="only check this backend (can be repeated)")
+    parser.add_argument("--game", action="store_true", help="also check the reference against the game's Vehicle class")
+    parser.add_argument("--benchmark", type=int, metavar="VEHICLES", help="time the passing backends on a fleet this size")
+    args = parser.parse_args()
+
+    print(f"Available backends: {', '.join(available_backends())}")
+    results = check_backends(args.backend, duration=args.duration)
+    ok = all(results.values())
+    if args.game:
+        ok = check_game(duration=args.duration) and ok
+    if args.benchmark:
+        print(f"Benchmark with {args.benchmark} vehicles:")
+        fastest = choose_backend(args.benchmark, args.duration, verbose=True, check_results=results)
+        print(f"Fastest conforming backend: {fastest}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,15 @@ def draw_buttons(screen, font, screen_width, screen_height, simulation_started,
 
     return start_button, restart_button, menu_button
 
+def draw_time_warp_button(screen, font, screen_width, time_warp=None):
+    # Button under "Back to Menu" that cycles the time warp (see time_warp.py). Shows the real warp when we lag behind.
+    warp_button = pygame.Rect(screen_width - 220, 190, 210, 50)
+    if time_warp is not None:
+        pygame.draw.rect(screen, (173, 216, 230), warp_button)
+        warp_text = font.render(time_warp.get_hud_text(), True, (0, 0, 0))
+        screen.blit(warp_text, (warp_button.x + 10, warp_button.y + 10))
+    return warp_button
+
 def draw_metrics(screen, font, vehicle, current_speed, current_rpm, distance, emissions, HEIGHT, use_metric):
     if use_metric:
         speed_unit = "km/h"
@@ -61,15 +70,21 @@ def draw_metrics(screen, font, vehicle, current_speed, current_rpm, distance, em
     if not vehicle.is_electric:
         screen.blit(gear_text, (10,170))
 
-    if hasattr(vehicle, 'gear_shift_data'):
+    if not vehicle.is_electric:
         draw_gear_info(screen, font, vehicle, HEIGHT)
         
-def draw_screen(screen, vehicle, font, current_speed, current_rpm, distance, emissions, WIDTH, HEIGHT, delta_time, start_button, restart_button, back_to_menu_button, simulation_started, simulation_paused, use_metric):
+def draw_screen(screen, vehicle, font, current_speed, current_rpm, distance, emissions, WIDTH, HEIGHT, delta_time, start_button, restart_button, back_to_menu_button, simulation_started, simulation_paused, use_metric, quality=None, time_warp=None, charts=None, camera=None):
+    # quality is the QualityGovernor from quality.py (None means full quality)
+    # time_warp is the TimeWarp from time_warp.py (None hides the warp button)
+    # charts is the TelemetryCharts from telemetry_charts.py (None hides the strip charts)
+    # camera is the Camera from camera.py that follows the vehicle (None: the window doesn't scroll)
+    quality_level = quality.level if quality is not None else {"arc_points": 50, "smooth_wheels": True}
     # Draw the vehicle on the screen
-    vehicle.draw(screen, HEIGHT)
+    vehicle.draw(screen, HEIGHT, quality_level["smooth_wheels"], camera)
 
     # Draw buttons and other information
     draw_buttons(screen, font, WIDTH, HEIGHT, simulation_started, simulation_paused)
+    draw_time_warp_button(screen, font, WIDTH, time_warp)
     draw_metrics(screen, font, vehicle, current_speed, current_rpm, distance, emissions, HEIGHT, use_metric)
 
     # Try to get the vehicle information
@@ -98,10 +113,14 @@ def draw_screen(screen, vehicle, font, current_speed, current_rpm, distance, emi
                        WIDTH, HEIGHT, font,
                        vehicle_info.get("green_start"),
                        vehicle_info.get("green_end"),
-                       vehicle_info.get("yellow_end"))
+                       vehicle_info.get("yellow_end"),
+                       quality_level["arc_points"])
     
     # Draw the speed gauge
     draw_speed_gauge(screen, current_speed, max_speed, WIDTH, HEIGHT, font, use_metric)
+    # Strip charts on the left of the gauges, only their newest columns are drawn
+    if charts is not None:
+        charts.draw(screen)
     # Calculate and display acceleration times
     if vehicle.speed < 100 / 3.6:  # 3.6 is used to convert km/h to m/s
         acceleration_text = f"0-100 km/h: {vehicle.acceleration_timer:.1f} seconds"
@@ -124,10 +143,13 @@ def draw_screen(screen, vehicle, font, current_speed, current_rpm, distance, emi
     # max_speed_surface = font.render(max_speed_text, True, (0, 0, 0))
     # screen.blit(max_speed_surface, (10, HEIGHT - 40))
 
-    # Update the display
-    pygame.display.flip()
+    # Show the active render quality level under the buttons
+    if quality is not None:
+        quality_surface = font.render(quality.get_hud_text(), True, (0, 0, 0))
+        screen.blit(quality_surface, (WIDTH - 220, 250))
+    # The display is flipped once by the main loop after everything is drawn
     
-def draw_rpm_gauge(screen, vehicle, current_rpm, WIDTH, HEIGHT, font, green_start, green_end, yellow_end):
+def draw_rpm_gauge(screen, vehicle, current_rpm, WIDTH, HEIGHT, font, green_start, green_end, yellow_end, arc_points=50):
         # This part is pretty complex but also really cool! I got help from online sources
         # to make this realistic looking RPM gauge. I'm still learning how it all works, and encountered lot of issues
         # but it's awesome to finally see it in action! Here's how it works.It creates a circular RPM gauge using trigonometry.
@@ -144,7 +166,8 @@ def draw_rpm_gauge(screen, vehicle, current_rpm, WIDTH, HEIGHT, font, green_star
 
     # This function creates points to draw arcs
     # It's complex, but it helps us draw the curved shapes of the gauge
-    def get_arc_points(start_angle, end_angle, r1, r2, num_points=50):
+    # num_points comes from the render quality level, fewer points are cheaper to draw
+    def get_arc_points(start_angle, end_angle, r1, r2, num_points=arc_points):
         points = []
         # Create outer arc points
         for i in range(num_points):
@@ -353,24 +376,25 @@ def draw_speed_gauge(screen, current_speed,max_speed, WIDTH, HEIGHT, font, use_m
     screen.blit(speed_text, speed_text_rect)
     
 def draw_gear_info(screen, font, vehicle, HEIGHT):
-    # Get gear info
-    gear_info = vehicle.gear_shift_data
+    # Get gear info (NumPy views of the per-gear stats, nothing is copied)
+    stats = vehicle.gear_stats
+    time_in_gear = stats.time[0]
+    entry_speed = stats.entry_speed[0]
+    exit_speed = stats.exit_speed[0]
 
     # Start drawing from here
     y = HEIGHT - 150
 
-    # Show info for each gear
-    for i in range(len(gear_info)):
-        gear = gear_info[i][0]
-        time = gear_info[i][1]
-        speed = gear_info[i][2]
-        
+    # Show info for each gear we have driven in
+    for gear in stats.used_gears():
+        index = gear - 1
+        time = time_in_gear[index]
+
         # Make text
-        if i < len(gear_info) - 1:
-            next_speed = gear_info[i+1][2]
-            text = f"Gear {gear}: {time:.1f}s ({speed:.0f} - {next_speed:.0f} km/h)"
+        if gear != vehicle.current_gear:
+            text = f"Gear {gear}: {time:.1f}s ({entry_speed[index]:.0f} - {exit_speed[index]:.0f} km/h)"
         else:
-            text = f"Gear {gear}: {time:.1f}s ({speed:.0f} km/h+)"
+            text = f"Gear {gear}: {time:.1f}s ({entry_speed[index]:.0f} km/h+)"
         
         # Put text on screen
         words = font.render(text, True, (0, 0, 0))
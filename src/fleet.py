@@ -0,0 +1,273 @@
+# fleet.py
+# This file simulates many vehicles at once with NumPy arrays instead of one Vehicle object each.
+# Every vehicle property (mass, gear ratios, power curve...) and every piece of state (speed, RPM, gear,
+# shift timers...) is stored in an array with one entry per vehicle, and each tick updates all of them
+# with a few array operations. This is what makes batches of hundreds of configs fast.
+# The per-tick physics (gear shifting, engine force, resistance, integration) is done by a physics backend
+# (see physics_backends.py); the Fleet keeps the arrays and the bookkeeping (emissions, 0-100 time, gear times).
+# The physics is the same as Vehicle.update, step by step, so a fleet of one gives the same results as the game.
+# It doesn't need pygame, so it can run anywhere (servers, command line tools, worker processes).
+
+import math
+import numpy as np
+from physics_backends import get_backend, tire_tables, tire_table_key, ELECTRIC_JITTER_MAX, GRAVITY
+from vehicle_configs import tire_for, DEFAULT_DRIVEN_WHEELS, DEFAULT_DRIVEN_LOAD_SHARE
+from gear_stats import GearStats
+
+FUEL_ENERGY_PER_LITER = 34e6  # J/L, between petrol (32 MJ/L) and diesel (36 MJ/L)
+
+
+def curve_arrays(curves):
+    # Turns a list of (rpm, value) curves of different lengths into two 2D arrays.
+    # Shorter curves are padded by repeating their last point, which doesn't change the interpolation.
+    longest = max(len(curve) for curve in curves)
+    curve_x = np.zeros((len(curves), longest))
+    curve_y = np.zeros((len(curves), longest))
+    for row, curve in enumerate(curves):
+        points = sorted(curve, key=lambda point: point[0])
+        points += [points[-1]] * (longest - len(points))
+        curve_x[row] = [point[0] for point in points]
+        curve_y[row] = [point[1] for point in points]
+    return curve_x, curve_y
+
+
+class Fleet:
+    def __init__(self, configs, trailer_masses=None, names=None, seed=None, backend="numpy"):
+        # configs: list of vehicle configs in the VEHICLE_CONFIGS schema (see vehicle_configs.py)
+        # trailer_masses: list with a trailer mass in kg (or None) for each vehicle
+        # backend: name of a physics backend ("reference", "numpy", "numba") or a backend object
+        count = len(configs)
+        if count == 0:
+            raise ValueError("A fleet needs at least one vehicle")
+        trailer_masses = trailer_masses if trailer_masses is not None else [None] * count
+        self.names = names if names is not None else [config.get('name', 'Unknown Vehicle') for config in configs]
+        self.count = count
+        self.rows = np.arange(count)  # Row index of every vehicle, used to pick one value per row from 2D arrays
+        self.rng = np.random.default_rng(seed)  # Used for the electric motor RPM jitter
+        self.backend = get_backend(backend)
+        self.fuel_cut_off = False  # True: no fuel and no CO2 while the throttle is closed (the game is always on the throttle)
+        self.fuel_from_work = False  # True: the fuel comes from the work done at the wheels, so loads count (see calculate_fuel_from_work)
+
+        def column(key, default=None):
+            return np.array([float(config.get(key, default)) for config in configs])
+
+        self.is_electric = np.array([bool(config.get('is_electric', False)) for config in configs])
+        self.has_electric = bool(self.is_electric.any())
+        self.no_jitter = np.zeros(count)
+        for config in configs:
+            if config['mass'] is None or config['mass'] <= 0:
+                raise ValueError(f"Vehicle mass must be specified and greater than zero. Received: {config['mass']}")
+            if not config.get('is_electric', False) and not config.get('gear_ratios'):
+                raise ValueError("gear_ratios must be provided and non-empty for ICE vehicles")
+        self.mass = column('mass')
+        self.trailer_mass = np.array([float(mass) if mass is not None else 0.0 for mass in trailer_masses])
+        self.total_mass = self.mass + self.trailer_mass
+        self.max_rpm = column('max_rpm')
+        self.max_speed = column('max_speed') / 3.6  # m/s
+        self.wheel_circumference = column('wheel_circumference')
+        self.friction_coefficient = column('friction_coefficient')
+        self.air_resistance_coefficient = column('air_resistance_coefficient')
+        self.frontal_area = column('frontal_area')
+        self.torque_x, self.torque_y = curve_arrays([config['torque_curve'] for config in configs])
+        self.power_x, self.power_y = curve_arrays([config['power_curve'] for config in configs])
+
+        # Gear tables. Electric cars get their single gear ratio as "gear 1" with a final drive of 1
+        gear_lists = [[config['single_gear_ratio']] if config.get('is_electric', False) else list(config['gear_ratios'])
+                      for config in configs]
+        self.gear_count = np.array([len(gears) for gears in gear_lists])
+        self.gear_ratios = np.ones((count, self.gear_count.max()))
+        for row, gears in enumerate(gear_lists):
+            self.gear_ratios[row, :len(gears)] = gears
+            self.gear_ratios[row, len(gears):] = gears[-1]
+        self.final_drive_ratio = np.where(self.is_electric, 1.0, column('final_drive_ratio', 1.0))
+
+        # ICE only settings (electric cars get harmless defaults)
+        self.idle_rpm = np.where(self.is_electric, 0.0, column('idle_rpm', 0))
+        self.shift_up_rpm = column('shift_up_rpm', math.inf)
+        self.shift_down_rpm = column('shift_down_rpm', 0)
+        self.rev_drop_rate = column('rev_drop_rate', 200)
+        self.post_shift_adjustment_factor = column('post_shift_adjustment_factor', 1.0)
+        self.fuel_efficiency = column('fuel_efficiency', 1.0)
+        self.emission_factor = column('emission_factor', 0)
+        self.speed_emission_coefficient = column('speed_emission_coefficient', 0.2)
+        self.base_engine_efficiency = column('base_engine_efficiency', 0.35)
+        # Same formula as Vehicle.calculate_post_shift_duration
+        self.post_shift_duration = np.clip(682 / self.rev_drop_rate * self.post_shift_adjustment_factor, 0.1, 2.0)
+        self.gear_stats = GearStats(self.gear_ratios.shape[1], count)  # Same per-gear stats as Vehicle, one row per vehicle
+
+        # Tires (see tire_step in physics_backends.py). Every kind of tire has one row in the grip and stiffness
+        # tables, tire_index says which row a vehicle uses, so thousands of vehicles share a few tables.
+        tires = [tire_for(config) for config in configs]
+        table_keys = list(dict.fromkeys(tire_table_key(tire) for tire in tires))
+        self.tire_index = np.array([table_keys.index(tire_table_key(tire)) for tire in tires])
+        tables = [tire_tables(*key) for key in table_keys]
+        self.grip_table = np.stack([grip for grip, _ in tables])
+        self.stiffness_table = np.stack([stiffness for _, stiffness in tables])
+        self.wheel_radius = self.wheel_circumference / (2 * math.pi)
+        self.wheel_inertia = column('driven_wheels', DEFAULT_DRIVEN_WHEELS) * np.array([tire['wheel_inertia'] for tire in tires])
+        self.normal_force = self.total_mass * GRAVITY * column('driven_load_share', DEFAULT_DRIVEN_LOAD_SHARE)
+
+        self.reset()
+
+    def reset(self):
+        count = self.count
+        self.speed = np.zeros(count)  # m/s
+        self.position = np.zeros(count)  # m
+        self.acceleration = np.zeros(count)
+        self.wheel_force = np.zeros(count)
+        self.resistance_force = np.zeros(count)
+        self.brake_force = np.zeros(count)  # N, only the drive cycle runner brakes
+        self.current_rpm = self.idle_rpm.copy()
+        self.throttle = np.zeros(count)
+        self.current_gear = np.ones(count, dtype=int)
+        self.shifting = np.zeros(count, dtype=bool)
+        self.next_gear = np.ones(count, dtype=int)
+        self.shift_target_rpm = np.zeros(count)
+        self.last_shift_time = np.zeros(count)
+        self.post_shift_adjustment = np.zeros(count, dtype=bool)
+        self.post_shift_adjustment_time = np.zeros(count)
+        self.wheel_speed = np.zeros(count)  # rad/s, angular speed of the driven wheels
+        self.slip_ratio = np.zeros(count)
+        self.time_elapsed = 0.0
+        self.co2_emissions = np.zeros(count)  # kg
+        self.fuel_used = np.zeros(count)  # L
+        self.distance_traveled = np.zeros(count)  # m
+        self.acceleration_timer = np.zeros(count)
+        self.zero_to_hundred_time = np.full(count, np.nan)  # nan until 100 km/h is reached
+        self.top_speed = np.zeros(count)
+        self.gear_stats.reset()
+
+    def start(self):
+        # Same as Vehicle.start: full throttle, electric motors start at 100 RPM
+        self.throttle[:] = 1.0
+        self.current_rpm[:] = np.where(self.is_electric, 100.0, self.idle_rpm)
+
+    def gear_ratio(self, gear):
+        return self.gear_ratios[self.rows, gear - 1]
+
+    def calculate_emissions(self, delta_time):
+        # Vehicle.calculate_emissions, in kg CO2 for this tick (0 for electric cars)
+        return self.calculate_fuel_and_emissions(delta_time)[1]
+
+    def calculate_fuel_and_emissions(self, delta_time):
+        # Vehicle.calculate_emissions, but it also returns the fuel it is based on.
+        # Returns (fuel in L, CO2 in kg) for this tick, both 0 for electric cars.
+        if self.fuel_from_work:
+            return self.calculate_fuel_from_work(delta_time)
+        rpm_factor = np.minimum(1.0, self.current_rpm / self.max_rpm)
+        rpm_coefficient = 1 + 0.2 * (1 - rpm_factor)
+        speed_factor = 1 + self.speed_emission_coefficient * (self.speed / 100) ** 2
+        gear_efficiency = 0.85 + 0.15 * self.current_gear / self.gear_count
+        full_throttle_efficiency = self.fuel_efficiency * 0.7
+        distance_km = self.speed * delta_time / 3600
+        fuel = distance_km / (full_throttle_efficiency / 100) * speed_factor * rpm_coefficient / gear_efficiency
+        engine_efficiency = np.maximum(0.3, self.base_engine_efficiency * gear_efficiency)
+        emissions = fuel * (self.emission_factor / engine_efficiency * 1.02) / 1000
+        if self.fuel_cut_off:
+            # Engines cut the fuel when the driver is off the throttle (coasting or braking)
+            burning = ~self.is_electric & (self.throttle > 0)
+        else:
+            burning = ~self.is_electric
+        return np.where(burning, fuel, 0.0), np.where(burning, emissions, 0.0)
+
+    def calculate_fuel_from_work(self, delta_time):
+        # The game's estimate only depends on the distance, RPM and gear, so a loaded truck burns as much as an
+        # empty one. Here the fuel is what the engine burns for the work it does at the wheels in this tick, at the
+        # engine efficiency of calculate_fuel_and_emissions: the heavier the load and the harder the driver
+        # accelerates, the more it burns. Nothing while coasting or braking. The CO2 per liter comes from the
+        # config's own ratings (emission_factor g/km at fuel_efficiency L/100km).
+        work = np.maximum(0.0, self.wheel_force * self.speed) * delta_time  # J
+        gear_efficiency = 0.85 + 0.15 * self.current_gear / self.gear_count
+        engine_efficiency = np.maximum(0.3, self.base_engine_efficiency * gear_efficiency)
+        fuel = np.where(self.is_electric, 0.0, work / (engine_efficiency * FUEL_ENERGY_PER_LITER))
+        co2_per_liter = self.emission_factor / self.fuel_efficiency / 10  # (g/km) / (L/100km) = kg/L
+        return fuel, fuel * co2_per_liter
+
+    def step(self, delta_time):
+        previous_gear = self.current_gear.copy()
+        # The random RPM drops of the electric motors are drawn here, so every backend gets the same ones
+        jitter = self.rng.uniform(0, ELECTRIC_JITTER_MAX, self.count) if self.has_electric else self.no_jitter
+        self.backend.step(self, delta_time, jitter)
+        self.distance_traveled += self.speed * delta_time
+        self.time_elapsed += delta_time
+        fuel, emissions = self.calculate_fuel_and_emissions(delta_time)
+        self.fuel_used += fuel
+        self.co2_emissions += emissions
+        self.gear_stats.add(previous_gear, delta_time, self.speed * delta_time, fuel, emissions)
+        self.record_gear_shift_times(previous_gear)
+        self.update_performance_metrics(delta_time)
+
+    def record_gear_shift_times(self, previous_gear):
+        # GearShiftingSystem.record_gear_shift_time for every vehicle that shifted in this tick
+        changed = np.nonzero(self.current_gear != previous_gear)[0]
+        if len(changed):
+            self.gear_stats.shift(changed, previous_gear[changed], self.current_gear[changed], self.speed[changed] * 3.6)
+
+    def update_performance_metrics(self, delta_time):
+        below_hundred = self.speed < 100 / 3.6
+        self.acceleration_timer += np.where(below_hundred, delta_time, 0.0)
+        reached = ~below_hundred & np.isnan(self.zero_to_hundred_time)
+        self.zero_to_hundred_time[reached] = self.acceleration_timer[reached]
+        np.maximum(self.top_speed, self.speed, out=self.top_speed)  # In place, shared_fleet.py keeps the arrays in shared memory
+
+    def results(self, row):
+        # Same dictionary as headless.run_headless, for one vehicle of the fleet
+        distance_km = self.distance_traveled[row] / 1000
+        co2_kg = float(self.co2_emissions[row])
+        zero_to_hundred = self.zero_to_hundred_time[row]
+        return {
+            "vehicle_type": self.names[row],
+            "trailer_mass": float(self.trailer_mass[row]) if self.trailer_mass[row] > 0 else None,
+            "zero_to_hundred_time": None if np.isnan(zero_to_hundred) else float(zero_to_hundred),
+            "top_speed_kmh": float(self.top_speed[row] * 3.6),
+            "gear_shift_data": [list(shift) for shift in self.gear_stats.shift_data(row)],
+            "co2_kg": co2_kg,
+            "co2_g_per_km": co2_kg * 1000 / distance_km if distance_km > 0 else 0,
+            "distance_km": float(distance_km),
+            "time_simulated": self.time_elapsed,
+        }
+
+    def launch(self, duration, delta_time):
+        # Full-throttle launch like run(), but the results are arrays (one value per vehicle) instead of
+        # dictionaries, for analyses with thousands of vehicles (sensitivity.py, monte_carlo.py).
+        # - zero_to_hundred_time: s, interpolated inside the tick where 100 km/h was crossed, nan if never reached
+        # - top_speed_kmh and co2_g_per_km: taken when the vehicle reaches its max speed, like run()
+        self.reset()
+        self.start()
+        hundred = 100 / 3.6
+        zero_to_hundred = np.full(self.count, np.nan)
+        top_speed = np.zeros(self.count)
+        co2_per_km = np.zeros(self.count)
+        done = np.zeros(self.count, dtype=bool)
+        while self.time_elapsed < duration and not done.all():
+            previous_speed = self.speed.copy()
+            self.step(delta_time)
+            crossed = np.isnan(zero_to_hundred) & (self.speed >= hundred)
+            if crossed.any():
+                fraction = (hundred - previous_speed[crossed]) / (self.speed[crossed] - previous_speed[crossed])
+                zero_to_hundred[crossed] = self.time_elapsed - delta_time * (1 - fraction)
+            finished = ~done & (self.speed >= self.max_speed)
+            top_speed[finished] = self.top_speed[finished] * 3.6
+            co2_per_km[finished] = self.co2_emissions[finished] * 1e6 / self.distance_traveled[finished]
+            done |= finished
+        rest = ~done
+        top_speed[rest] = self.top_speed[rest] * 3.6
+        moved = rest & (self.distance_traveled > 0)
+        co2_per_km[moved] = self.co2_emissions[moved] * 1e6 / self.distance_traveled[moved]
+        return {"zero_to_hundred_time": zero_to_hundred, "top_speed_kmh": top_speed, "co2_g_per_km": co2_per_km}
+
+    def run(self, duration, delta_time, stop_at_max_speed=True):
+        # Full-throttle launch for the whole fleet, like headless.run_headless.
+        # A vehicle's results are frozen when it reaches its max speed; the run ends when all are done.
+        self.reset()
+        self.start()
+        finished = [None] * self.count
+        while self.time_elapsed < duration:
+            self.step(delta_time)
+            if stop_at_max_speed:
+                for row in np.nonzero(self.speed >= self.max_speed)[0]:
+                    if finished[row] is None:
+                        finished[row] = self.results(row)
+                if all(result is not None for result in finished):
+                    break
+        return [result if result is not None else self.results(row) for row, result in enumerate(finished)]
@@ -0,0 +1,219 @@
+# frame_capture.py
+# This file records the game screen for demo videos and reports without slowing down the 60 FPS loop.
+# - The frames are copied into a pool of CAPTURE_BUFFERS surfaces made once at the start. Copying the screen is
+#   one blit (about a millisecond), nothing is allocated while recording.
+# - A writer thread takes the filled buffers from a bounded queue, writes them to disk and gives the buffers back.
+#   pygame.image.save holds Python's lock for the whole PNG encoding (tens of milliseconds), which would freeze
+#   the game loop, so the writer encodes the PNGs itself with NumPy and zlib, which let the game loop run.
+# - "png" writes frame_000001.png, frame_000002.png, ... and "raw" writes all frames as RGB bytes into one
+#   frames.rgb file (much faster, encode it later with the ffmpeg command saved in capture_info.json).
+# - When the writer can't keep up, all buffers are full. With the "drop" policy the frame is skipped, with the
+#   "block" policy the game waits for a free buffer (backpressure). Either way the count of dropped frames and the
+#   time spent waiting are shown on screen while recording. The physics run in fixed steps of simulated time
+#   (see time_warp.py), so a slow frame never changes the results, it only makes the video jump.
+# Press R in the simulation to start and stop recording. The frames go to captures/<date and time>/.
+
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+import numpy as np
+import pygame
+
+CAPTURE_FOLDER = "captures"  # In the project folder (main.py changes the working directory there)
+CAPTURE_FORMAT = "png"  # "png" for a picture per frame, "raw" for one RGB file (encode it later with ffmpeg)
+CAPTURE_POLICY = "drop"  # "drop" skips frames when the writer is behind, "block" waits for it
+CAPTURE_BUFFERS = 8  # Frames that can wait for the writer (1200 x 800 is about 4 MB each)
+CAPTURE_FPS = 60  # Frame rate written to capture_info.json for encoding the video
+PNG_COMPRESSION = 1  # zlib level. 1 is fast and still much smaller than raw frames
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+
+def encode_png(rgb, compression=PNG_COMPRESSION):
+    # PNG bytes of an (height, width, 3) uint8 array. Every row uses the "Sub" filter (difference to the pixel
+    # on the left), which makes the flat colors of the game compress very well.
+    height, width, _ = rgb.shape
+    rows = np.empty((height, 1 + width * 3), dtype=np.uint8)
+    rows[:, 0] = 1  # Filter type Sub
+    pixels = rows[:, 1:].reshape(height, width, 3)
+    pixels[:, 0] = rgb[:, 0]
+    np.subtract(rgb[:, 1:], rgb[:, :-1], out=pixels[:, 1:])  # uint8 arithmetic wraps around, like PNG wants
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8 bits per channel, RGB
+    return (PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(rows.tobytes(), compression))
+            + png_chunk(b"IEND", b""))
+
+
+def write_capture_info(folder, frame_format, size, frames, dropped=0, wait_time=0.0, policy=CAPTURE_POLICY):
+    # capture_info.json: what was recorded and the ffmpeg command that turns it into a video
+    width, height = size
+    if frame_format == "raw":
+        source = f"-f rawvideo -pixel_format rgb24 -video_size {width}x{height} -framerate {CAPTURE_FPS} -i frames.rgb"
+    else:
+        source = f"-framerate {CAPTURE_FPS} -i frame_%06d.png"
+    info = {"format": frame_format, "width": width, "height": height, "frames": frames,
+            "dropped": dropped, "wait_time": wait_time, "policy": policy,
+            "ffmpeg": f"ffmpeg {source} -pix_fmt yuv420p demo.mp4"}
+    with open(os.path.join(folder, "capture_info.json"), "w") as info_file:
+        json.dump(info, info_file, indent=1)
+
+
+def rgb_channels(surface):
+    # Byte positions of red, green and blue inside a 32-bit pixel of surface
+    channels = []
+    for mask in surface.get_masks()[:3]:
+        shift = (mask & -mask).bit_length() - 1
+        channels.append(shift // 8 if sys.byteorder == "little" else 3 - shift // 8)
+    return channels
+
+
+class FrameCapture:
+    def __init__(self, size, folder=None, frame_format=CAPTURE_FORMAT, policy=CAPTURE_POLICY, buffer_count=CAPTURE_BUFFERS,
+                 first_frame=1):
+        # first_frame is the number of the first PNG, so several captures can fill one sequence (see replay.py)
+        if frame_format not in ("png", "raw") or policy not in ("drop", "block"):
+            raise ValueError("frame_format must be 'png' or 'raw' and policy 'drop' or 'block'")
+        self.size = tuple(size)
+        self.folder = folder or os.path.join(CAPTURE_FOLDER, datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+        self.frame_format = frame_format
+        self.policy = policy
+        # The buffer pool: 32-bit surfaces, so the writer can read the pixels as a NumPy array
+        self.buffers = [pygame.Surface(self.size, 0, 32) for _ in range(buffer_count)]
+        self.channels = rgb_channels(self.buffers[0])
+        self.free = queue.Queue()  # Buffers the game can fill
+        for index in range(buffer_count):
+            self.free.put(index)
+        self.filled = queue.Queue(maxsize=buffer_count)  # (frame number, buffer) waiting for the writer
+        self.first_frame = first_frame
+        self.frames = 0  # Frames handed to the writer
+        self.written = 0
+        self.dropped = 0
+        self.wait_time = 0.0  # Seconds the game waited for a free buffer ("block" policy)
+        self.error = None
+        self.start_time = time.perf_counter()
+        self.raw_file = None
+        self.writer = None
+
+    def start(self):
+        os.makedirs(self.folder, exist_ok=True)
+        if self.frame_format == "raw":
+            self.raw_file = open(os.path.join(self.folder, "frames.rgb"), "wb")
+        self.writer = threading.Thread(target=self.write_frames, name="frame-writer", daemon=True)
+        self.writer.start()
+        print(f"Recording {self.frame_format} frames to {self.folder} ({self.policy} policy)")
+        return self
+
+    def capture(self, screen):
+        # Copy the screen into a free buffer and queue it. Returns False if the frame was dropped.
+        if self.writer is None or self.error is not None:
+            return False
+        try:
+            if self.policy == "drop":
+                index = self.free.get_nowait()
+            else:
+                wait_start = time.perf_counter()
+                index = self.free.get()
+                self.wait_time += time.perf_counter() - wait_start
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        self.buffers[index].blit(screen, (0, 0))
+        self.frames += 1
+        self.filled.put((self.first_frame + self.frames - 1, index))
+        return True
+
+    def write_frames(self):
+        # The writer thread. A None in the queue means "stop".
+        while True:
+            item = self.filled.get()
+            if item is None:
+                break
+            number, index = item
+            try:
+                if self.error is None:
+                    self.write_frame(number, self.buffers[index])
+                    self.written += 1
+            except Exception as e:  # Any error, if this thread died capture() would wait forever for a free buffer
+                # Without its traceback, which would keep write_frame's pixel view and so the buffer locked
+                self.error = e.with_traceback(None)
+                print(f"Frame capture stopped, can't write: {e}")
+            finally:
+                self.free.put(index)
+
+    def write_frame(self, number, buffer):
+        # RGB pixels of the buffer without copying the whole surface first
+        width, height = self.size
+        pixels = np.frombuffer(buffer.get_buffer(), dtype=np.uint8).reshape(height, buffer.get_pitch())
+        rgb = pixels[:, :width * 4].reshape(height, width, 4)[:, :, self.channels]
+        if self.frame_format == "raw":
+            self.raw_file.write(np.ascontiguousarray(rgb).data)
+        else:
+            with open(os.path.join(self.folder, f"frame_{number:06d}.png"), "wb") as png_file:
+                png_file.write(encode_png(rgb))
+
+    def stop(self, write_info=True):
+        # Waits until every queued frame is written
+        if self.writer is None:
+            return
+        self.filled.put(None)
+        self.writer.join()
+        self.writer = None
+        if self.raw_file is not None:
+            self.raw_file.close()
+        if write_info:
+            write_capture_info(self.folder, self.frame_format, self.size, self.written, self.dropped, self.wait_time, self.policy)
+        print(f"Recording stopped: {self.written} frames written, {self.dropped} dropped, "
+              f"{self.wait_time:.2f} s waited for the writer")
+
+    def get_hud_text(self):
+        seconds = int(time.perf_counter() - self.start_time)
+        text = f"REC {seconds // 60}:{seconds % 60:02d}  {self.frames} frames"
+        if self.dropped:
+            text += f", {self.dropped} dropped"
+        if self.wait_time >= 0.01:
+            text += f", waited {self.wait_time:.1f} s"
+        return text
+
+    def draw_status(self, screen, font):
+        # Red dot and counters under the quality text, on the right edge. Drawn after capture(), so it isn't in the recording.
+        text = font.render(self.get_hud_text(), True, (255, 80, 80) if self.dropped or self.error else (255, 255, 255))
+        text_x = screen.get_width() - text.get_width() - 10
+        screen.blit(text, (text_x, 282))
+        pygame.draw.circle(screen, (220, 0, 0), (text_x - 12, 282 + text.get_height() // 2), 6)
+
+
+class ScreenRecorder:
+    # The R key in the simulation: starts a new FrameCapture, or stops the one that is running
+    def __init__(self, frame_format=CAPTURE_FORMAT, policy=CAPTURE_POLICY):
+        self.frame_format = frame_format
+        self.policy = policy
+        self.capture = None
+        self.font = None
+
+    def toggle(self, screen):
+        if self.capture is None:
+            self.capture = FrameCapture(screen.get_size(), frame_format=self.frame_format, policy=self.policy).start()
+        else:
+            self.stop()
+
+    def record(self, screen):
+        # Call after drawing a frame and before pygame.display.flip
+        if self.capture is None:
+            return
+        self.capture.capture(screen)
+        if self.font is None:
+            self.font = pygame.font.Font(None, 24)
+        self.capture.draw_status(screen, self.font)
+
+    def stop(self):
+        if self.capture is not None:
+            self.capture.stop()
+            self.capture = None
@@ -1,6 +1,8 @@
 # gear_shifting.py
-import pygame
+# All the timers in here (shift cooldown, post-shift throttle ramp) run on simulation time
+# (vehicle.get_simulation_time and delta_time), so shifting behaves the same with time warp and headless runs.
 from datetime import datetime
+from gear_stats import GearStats
 
 class GearShiftingSystem:
     def __init__(self, vehicle, rev_drop_rate):
@@ -16,13 +18,7 @@ class GearShiftingSystem:
         self._clutch_position = 1  # Fully engaged
         self._clutch_engaged = True
         self.rpm_drop_rate = 1000
-        self.gear_start_times = [0] * len(self.gear_ratios)
-        self.gear_shift_times = [0] * len(self.gear_ratios)
-        self.gear_start_speeds = [0] * (len(self.gear_ratios) + 1)
-        self.gear_stats = []
-        self.gear_stats = [{'time_spent': 0, 'distance_traveled': 0, 'max_speed': 0} for _ in range(len(self.gear_ratios))]
-        self.gear_start_time = None
-        self.gear_max_speed = 0
+        self.gear_stats = GearStats(len(self.gear_ratios))  # Time, distance, speeds, fuel, CO2 and shifts per gear (the vehicle fills it every tick)
         self.throttle = 1
         self.throttle_ramp = 0
         self.shift_progress = 0
@@ -59,7 +55,7 @@ class GearShiftingSystem:
         if self.vehicle.is_electric:
             return # Electric cars don't change gears like normal cars.
 
-        current_time = pygame.time.get_ticks() / 1000
+        current_time = self.vehicle.get_simulation_time()
         
         # Update throttle ramp
         self.vehicle.update_throttle_ramp(delta_time)
@@ -195,8 +191,7 @@ class GearShiftingSystem:
             self.next_gear = target_gear
             self.clutch_engaged = False
             self.shift_start_rpm = self.vehicle.current_rpm
-            wheel_speed = self.vehicle.calculate_wheel_speed()
-            self.shift_target_rpm = self.vehicle.calculate_rpm_for_gear(wheel_speed, target_gear)        
+            self.shift_target_rpm = self.calculate_target_rpm(target_gear)
 
     def complete_gear_shift(self): # final step of the gear shifting process, needed for the shifting process to work
         print("complete_gear_shift is called")
@@ -214,7 +209,7 @@ class GearShiftingSystem:
         self.shifting = False  # Set the shifting process as complete
         self.clutch_engaged = True  # Re-engage the clutch after shifting (as if releasing the pedal)
         self.clutch_position = 1  # Ensure clutch is fully engaged
-        self.last_shift_time = pygame.time.get_ticks() / 1000
+        self.last_shift_time = self.vehicle.get_simulation_time()
         self.shift_start_rpm = None
         self.shift_target_rpm = None
         self.next_gear = None
@@ -226,20 +221,8 @@ class GearShiftingSystem:
         self.vehicle.post_shift_adjustment_time = 0
         print(f"Debug: Shift completed. Current Gear: {self.vehicle.current_gear}, RPM: {self.vehicle.current_rpm:.2f}")
         print(f"Debug: Post-shift throttle adjustment started, duration: {duration:.2f}s")
-    def record_gear_shift_time(self): # records the time spent in each gear and the speed at which shifts occur
-   
-         if not self.vehicle.is_electric and self.vehicle.current_gear != self.vehicle.previous_gear: # only for non-electric vehicles
+    def record_gear_shift_time(self): # records the speed at which shifts occur (the time in each gear is added up every tick in gear_stats)
+        if not self.vehicle.is_electric and self.vehicle.current_gear != self.vehicle.previous_gear: # only for non-electric vehicles
             current_speed = self.vehicle.speed * 3.6  # Convert to km/h
-            gear_time = self.vehicle.time_elapsed - self.gear_start_times[self.vehicle.previous_gear - 1] # time elapsed from the start of the previous gear to the current gear
-            
-            for i, (gear, _, _) in enumerate(self.vehicle.gear_shift_data): # Iterates through existing data, updates if gear exists, or appends new entry
-                if gear == self.vehicle.previous_gear:
-                    self.vehicle.gear_shift_data[i] = (self.vehicle.previous_gear, gear_time, current_speed)
-                    break
-            else:
-                self.vehicle.gear_shift_data.append((self.vehicle.previous_gear, gear_time, current_speed))
-            
-            # Set the start time for the new gear
-            self.gear_start_times[self.vehicle.current_gear - 1] = self.vehicle.time_elapsed
-            self.gear_start_speeds[self.vehicle.current_gear - 1] = self.vehicle.speed
+            self.gear_stats.shift(0, self.vehicle.previous_gear, self.vehicle.current_gear, current_speed)
             self.vehicle.previous_gear = self.vehicle.current_gear          
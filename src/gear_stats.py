@@ -0,0 +1,60 @@
+# gear_stats.py
+# This file defines GearStats, the per-gear statistics of a run: time in each gear, distance, speed when
+# entering and leaving it, fuel, CO2 and how many times we shifted out of it.
+# Everything lives in NumPy arrays of shape (vehicles, gears) made once at the start, so each tick is a few
+# array writes at [vehicle, gear], no matter how long the run is or how often the vehicle shifts.
+# The game's Vehicle uses one row, a Fleet (see fleet.py) one row per vehicle. The arrays are public, so
+# analysis code and draw_gear_info can read them directly (stats.time[row] is a view, not a copy).
+# Each tick counts for the gear the vehicle was in when the tick started.
+
+import numpy as np
+
+
+class GearStats:
+    def __init__(self, gear_count, rows=1):
+        self.gear_count = int(gear_count)
+        self.rows = np.arange(rows)
+        self.reset()
+
+    def reset(self):
+        shape = (len(self.rows), self.gear_count)
+        self.time = np.zeros(shape)  # s spent in each gear
+        self.distance = np.zeros(shape)  # m driven in each gear
+        self.entry_speed = np.zeros(shape)  # km/h when we last shifted into the gear
+        self.exit_speed = np.zeros(shape)  # km/h when we last shifted out of the gear
+        self.fuel = np.zeros(shape)  # L burned in each gear
+        self.co2 = np.zeros(shape)  # kg CO2 emitted in each gear
+        self.shift_count = np.zeros(shape, dtype=int)  # times we shifted out of the gear
+
+    def resize(self, gear_count):
+        # A new number of gears (a tuned gearbox, see vehicle_tuning.py). The gears both sizes have keep their stats.
+        old = {name: getattr(self, name) for name in ('time', 'distance', 'entry_speed', 'exit_speed', 'fuel', 'co2', 'shift_count')}
+        kept = min(self.gear_count, int(gear_count))
+        self.gear_count = int(gear_count)
+        self.reset()
+        for name, values in old.items():
+            getattr(self, name)[:, :kept] = values[:, :kept]
+
+    def add(self, gear, delta_time, distance, fuel=0.0, co2=0.0):
+        # One tick. gear is the gear (1 = first) of every row, the other values are what happened in the tick.
+        index = (self.rows, np.asarray(gear) - 1)
+        self.time[index] += delta_time
+        self.distance[index] += distance
+        self.fuel[index] += fuel
+        self.co2[index] += co2
+
+    def shift(self, rows, from_gear, to_gear, speed_kmh):
+        # The rows in rows shifted from from_gear to to_gear at speed_kmh
+        self.exit_speed[rows, from_gear - 1] = speed_kmh
+        self.entry_speed[rows, to_gear - 1] = speed_kmh
+        self.shift_count[rows, from_gear - 1] += 1
+
+    def used_gears(self, row=0):
+        # Gear numbers the vehicle has driven in so far
+        return np.nonzero(self.time[row] > 0)[0] + 1
+
+    def shift_data(self, row=0):
+        # [(gear, time in gear, speed when leaving it), ...] for the gears we shifted out of, like the old
+        # gear_shift_data list (used by the results cache and the performance cards)
+        return [(int(gear) + 1, float(self.time[row, gear]), float(self.exit_speed[row, gear]))
+                for gear in np.nonzero(self.shift_count[row])[0]]
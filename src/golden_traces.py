@@ -0,0 +1,129 @@
+# golden_traces.py
+# This file keeps "golden" traces of the game's physics in the repository, so a change that should only make
+# Vehicle.update, GearShiftingSystem or estimate_engine_output faster can be checked to give the same results.
+# - The golden traces are the conformance.py traces (speed, position, RPM, gear, throttle, wheel force, slip, CO2 at
+#   every tick) of the game's Vehicle class, for every vehicle in VEHICLE_CONFIGS and every trailer load from the
+#   menu, with a fixed seed for the electric motor RPM drops. They are saved in assets/golden_traces.npz.
+# - A check records the traces again and compares them with the golden ones using the per-channel tolerances of
+#   conformance.py (all channels and ticks at once with NumPy). The report has one line per channel: the biggest
+#   error and, if it goes over the tolerance, the first tick where it does and which vehicle it is.
+# - To keep the file small, every channel is stored as whole multiples of a quarter of its absolute tolerance
+#   (so the stored value is off by at most an eighth of the tolerance, the gear is stored exactly). The change
+#   of the change from tick to tick of those numbers is small, its bytes are regrouped (all first bytes, then all
+#   second bytes...) and zlib compresses that to about a tenth of the raw trace.
+# The fleet backends don't need their own golden traces: conformance.py checks them against the reference
+# backend, and "python conformance.py --game" checks the reference against the game's Vehicle.
+# When a change is meant to change the results (new physics, new vehicle), look at the report and then save new
+# golden traces with --update, in the same commit.
+#
+# Run it from the src folder with:  python golden_traces.py
+# or, after an intended change:    python golden_traces.py --update
+
+import argparse
+import io
+import os
+import sys
+import time
+import numpy as np
+from results_cache import default_runs
+from conformance import CHANNEL_TOLERANCES, TRACE_DURATION, TRACE_TIME_STEP, TRACE_SEED, record_game_trace, compare_traces, passed, print_report
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "golden_traces.npz")
+GOLDEN_FORMAT = 1  # Change this when the layout of the file changes
+QUANTUM_FRACTION = 0.25  # Values are stored in steps of this part of the channel's absolute tolerance
+
+
+def channel_quantum(channel):
+    absolute, _ = CHANNEL_TOLERANCES[channel]
+    return absolute * QUANTUM_FRACTION if absolute > 0 else 1.0  # Exact channels (the gear) are whole numbers
+
+
+def encode_channel(values, quantum):
+    # (ticks, runs) floats -> bytes that compress well: steps of quantum, second difference along the ticks,
+    # and the 8 bytes of every number regrouped by position
+    if not np.isfinite(values).all():
+        raise ValueError("Golden traces can't hold nan or infinite values")
+    steps = np.round(values.T / quantum).astype(np.int64)  # One row per run
+    second_difference = np.diff(steps, n=2, axis=1, prepend=np.zeros((steps.shape[0], 2), dtype=np.int64))
+    return np.ascontiguousarray(second_difference).view(np.uint8).reshape(-1, 8).T.copy()
+
+
+def decode_channel(data, quantum, ticks, runs):
+    second_difference = np.ascontiguousarray(data.T).view(np.int64).reshape(runs, ticks)
+    steps = np.cumsum(np.cumsum(second_difference, axis=1), axis=1)
+    return (steps * quantum).T
+
+
+def save_golden(trace, runs, duration, delta_time, seed, path=GOLDEN_FILE):
+    ticks = len(next(iter(trace.values())))
+    arrays = {
+        "format": np.array(GOLDEN_FORMAT),
+        "vehicle_types": np.array([vehicle_type for vehicle_type, _ in runs]),
+        "trailer_masses": np.array([np.nan if mass is None else mass for _, mass in runs], dtype=float),
+        "settings": np.array([duration, delta_time, seed, ticks], dtype=float),
+    }
+    for channel, values in trace.items():
+        arrays["channel_" + channel] = encode_channel(values, channel_quantum(channel))
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as golden_file:
+        golden_file.write(buffer.getvalue())
+    return len(buffer.getvalue())
+
+
+def load_golden(path=GOLDEN_FILE):
+    # Returns (trace, runs, duration, delta_time, seed)
+    with np.load(path) as data:
+        if int(data["format"]) != GOLDEN_FORMAT:
+            raise ValueError(f"{path} was saved by another version of golden_traces.py, save it again with --update")
+        runs = [(str(vehicle_type), None if np.isnan(mass) else float(mass))
+                for vehicle_type, mass in zip(data["vehicle_types"], data["trailer_masses"])]
+        duration, delta_time, seed, ticks = data["settings"]
+        trace = {}
+        for key in data.files:
+            if key.startswith("channel_"):
+                channel = key[len("channel_"):]
+                trace[channel] = decode_channel(data[key], channel_quantum(channel), int(ticks), len(runs))
+    return trace, runs, float(duration), float(delta_time), int(seed)
+
+
+def update_golden(path=GOLDEN_FILE, duration=TRACE_DURATION, delta_time=TRACE_TIME_STEP, seed=TRACE_SEED):
+    runs = default_runs()
+    trace = record_game_trace(runs, duration, delta_time, seed)
+    size = save_golden(trace, runs, duration, delta_time, seed, path)
+    print(f"Saved golden traces of {len(runs)} runs, {duration:.0f} s each, to {path} ({size / 1024:.0f} KB)")
+
+
+def check_golden(path=GOLDEN_FILE):
+    # Records the traces again and compares them with the golden ones. Returns True if nothing drifted.
+    golden, runs, duration, delta_time, seed = load_golden(path)
+    if runs != default_runs():
+        print("The vehicles or trailer loads changed since the golden traces were saved, save them again with --update")
+        return False
+    start_time = time.perf_counter()
+    trace = record_game_trace(runs, duration, delta_time, seed)
+    report = compare_traces(trace, golden)
+    print_report(f"Golden traces ({len(runs)} runs, {duration:.0f} s, {time.perf_counter() - start_time:.1f} s to check)",
+                 report, runs, trace, golden)
+    return passed(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the game's physics against the golden traces in the repository")
+    parser.add_argument("--update", action="store_true", help="record and save new golden traces instead of checking")
+    parser.add_argument("--file", default=GOLDEN_FILE, help="golden traces file")
+    parser.add_argument("--duration", type=float, default=TRACE_DURATION, help="seconds of simulated time per run (--update)")
+    args = parser.parse_args()
+
+    if args.update:
+        update_golden(args.file, args.duration)
+        return
+    if not os.path.exists(args.file):
+        print(f"No golden traces at {args.file}, save them first with --update")
+        sys.exit(2)
+    sys.exit(0 if check_golden(args.file) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# headless.py
+# This file runs the vehicle simulation without a window and without drawing anything.
+# It uses the same Vehicle, Trailer and GearShiftingSystem classes as the game, so the results
+# are the same as watching a full-throttle run on screen, just much faster than real time.
+# It is used to fill the results cache (see results_cache.py) for the performance cards in the menu.
+# run_headless can also solve the launch with a higher-order integrator ("rk4" or "rk45", see integrators.py),
+# which takes much bigger steps and gives the 0-100, max speed and shift times to the millisecond.
+
+from config import VEHICLE_CONFIGS, TRAILER_CONFIGS
+from vehicle import Vehicle
+from trailer import Trailer
+from integrators import run_launch
+
+DEFAULT_DURATION = 180.0  # seconds of simulated time, long enough for a loaded semi truck
+DEFAULT_TIME_STEP = 1 / 60  # same step as the 60 FPS game loop
+
+
+def make_headless_vehicle(vehicle_type, trailer_mass=None, seed=None, trailer_count=1):
+    # Same as make_vehicle in main.py, but without loading any pictures.
+    # seed makes the random RPM drops of the electric motor repeatable.
+    # trailer_mass is the load of each trailer, trailer_count > 1 makes a road train (semi truck only).
+    vehicle_info = VEHICLE_CONFIGS[vehicle_type].copy()
+    vehicle_info['name'] = vehicle_type
+    vehicle_info['seed'] = seed
+    vehicle_info['load_visuals'] = False
+    if vehicle_type == "Semi truck":
+        trailer_info = TRAILER_CONFIGS["Standard trailer"].copy()
+        if trailer_mass is not None:
+            trailer_info['mass'] = float(trailer_mass)
+        trailer_info['load_visuals'] = False
+        vehicle_info['trailers'] = [Trailer(**trailer_info) for _ in range(max(1, trailer_count))]
+    return Vehicle(**vehicle_info)
+
+
+def run_headless(vehicle_type, trailer_mass=None, duration=DEFAULT_DURATION, delta_time=DEFAULT_TIME_STEP, integrator="euler"):
+    # Full-throttle launch from standstill until the vehicle reaches its max speed or the time runs out.
+    # Returns a dictionary with the same performance metrics the game shows on screen.
+    # integrator "euler" steps the game's Vehicle (the results match the screen), "rk4" and "rk45" solve the
+    # continuous model instead. delta_time is the fixed step of "rk4", "rk45" picks its own steps.
+    if integrator != "euler":
+        return run_launch(vehicle_type, trailer_mass, duration, integrator, delta_time if integrator == "rk4" else None)
+    vehicle = make_headless_vehicle(vehicle_type, trailer_mass)
+    vehicle.start()
+    top_speed = 0
+    while vehicle.time_elapsed < duration:
+        vehicle.update(delta_time)
+        top_speed = max(top_speed, vehicle.speed)
+        if vehicle.speed >= vehicle.max_speed / 3.6:
+            break
+
+    distance_km = vehicle.get_distance_km()
+    return {
+        "vehicle_type": vehicle_type,
+        "trailer_mass": trailer_mass,
+        "zero_to_hundred_time": vehicle.zero_to_hundred_time,  # None if 100 km/h was never reached
+        "top_speed_kmh": top_speed * 3.6,
+        "gear_shift_data": [list(shift) for shift in vehicle.gear_shift_data],  # (gear, time in gear, speed at shift)
+        "co2_kg": vehicle.get_emissions_kg(),
+        "co2_g_per_km": vehicle.get_emissions_kg() * 1000 / distance_km if distance_km > 0 else 0,
+        "distance_km": distance_km,
+        "time_simulated": vehicle.time_elapsed,
+    }
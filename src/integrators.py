@@ -0,0 +1,475 @@
+# integrators.py
+# This file runs the full-throttle launch as a continuous model with a higher-order integrator, so headless runs
+# can take big steps and still give the time of every event (0-100 km/h, max speed, gear shifts) to the millisecond.
+# The game's tick (Vehicle.update, step_rows in physics_backends.py) moves the RPM, the throttle and the gear a bit
+# every 1/60 s and uses one explicit Euler step, so its times are only as exact as the tick. Here the same rules
+# are written as functions of the time and the speed:
+# - With the clutch closed the engine turns with the wheels: RPM = wheel RPM * gear ratio * final drive, kept
+#   between idle and max RPM (the game gets there within a tick or two through its 0.8 smoothing).
+# - A shift opens the clutch. The revs fall at rev_drop_rate + SHIFT_RPM_FALL_RATE per second and the shift is done
+#   SHIFT_RPM_TOLERANCE above the target RPM. The throttle then goes from 0.1 back to 1, twice as fast as the
+#   post-shift duration says (the game ramps it twice per tick).
+# - The tires (see tire_step) have three modes. Below the peak of the grip curve the wheel settles within
+#   milliseconds, much faster than the steps here, so the tires pass the wheel force minus what it takes to speed
+#   up the wheels with the vehicle ("grip").
+#   When the wheel force goes over the peak, the wheel speed becomes part of the equation ("slip"): past the peak
+#   the grip falls slowly with the slip, so the wheel takes tenths of a second to break loose, and it needs as long
+#   to grip again. At the end of the grip table the wheel spins and pushes with the grip of a spinning tire ("spin")
+#   until the wheel force drops below that.
+# Between two events the speed, position, fuel, CO2 (and wheel speed) follow an ordinary differential equation,
+# solved with:
+# - "rk4": the classic fourth-order Runge-Kutta method with a fixed step.
+# - "rk45": Dormand-Prince 5(4). The step grows and shrinks to keep the error estimate under the tolerance.
+# Events are zero crossings of event functions (speed - 100 km/h, RPM - shift_up_rpm, time - end of the shift...).
+# They are checked at both ends of every step. When one changed sign, its time is found by bisection on the cubic
+# Hermite curve through the ends of the step (values and slopes), the step is cut there and the event is handled:
+# a shift starts or ends, the tires grip or spin, a time is recorded.
+# The results have the same keys as headless.run_headless, plus the exact event times.
+# It doesn't need pygame. Run it from the src folder with:
+#     python integrators.py "Sports car" --method rk4 --step 0.25
+
+import argparse
+import numpy as np
+from physics_backends import (resistance_force, ice_wheel_force, electric_motor_force, find_optimal_gear_row,
+                              tire_tables, tire_table_key, GRAVITY, SHIFT_COOLDOWN, SHIFT_RPM_TOLERANCE,
+                              SHIFT_RPM_FALL_RATE, SLIP_TABLE_RANGE, SLIP_TABLE_SIZE, SLIP_MIN_SPEED)
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS, tire_for, DEFAULT_DRIVEN_WHEELS, DEFAULT_DRIVEN_LOAD_SHARE
+from gear_stats import GearStats
+
+INTEGRATORS = ("rk4", "rk45")
+DEFAULT_DURATION = 180.0  # seconds of simulated time, same as headless.py
+DEFAULT_RK4_STEP = 0.1  # s
+DEFAULT_TOLERANCE = 1e-7  # RK45 error per step, relative to the size of the values (and the same as an absolute floor)
+RK45_FIRST_STEP = 0.01  # s, the step grows from there
+RK45_MAX_STEP = 2.0  # s, so a step never jumps over an event that goes up and down again
+SLIP_MAX_STEP = 0.01  # s, biggest rk4 step while a wheel slips (it breaks loose or grips within tenths of a second)
+EVENT_TIME_TOLERANCE = 1e-6  # s, events are located at least this exactly
+POST_SHIFT_THROTTLE = 0.1  # Throttle right after a shift (GearShiftingSystem.complete_gear_shift)
+HUNDRED_KMH = 100 / 3.6  # m/s
+
+# Dormand-Prince 5(4): the time of each stage (as a part of the step), the weights of the earlier stages in each
+# stage, and the difference between the fifth and the fourth order weights (the error estimate). The last stage
+# is at the end of the step with the fifth-order weights, so it is the first stage of the next step.
+DP_NODES = (0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1)
+DP_WEIGHTS = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+DP_ERROR = (71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def rk4_step(derivative, t, y, h, slope):
+    # One classic Runge-Kutta step. slope is derivative(t, y), which the step before already has.
+    k2 = derivative(t + h / 2, y + h / 2 * slope)
+    k3 = derivative(t + h / 2, y + h / 2 * k2)
+    k4 = derivative(t + h, y + h * k3)
+    return y + h / 6 * (slope + 2 * k2 + 2 * k3 + k4)
+
+
+def dormand_prince_step(derivative, t, y, h, slope):
+    # One Dormand-Prince step. Returns (new y, slope at the new y, error estimate of the new y).
+    stages = [slope]
+    for node, weights in zip(DP_NODES[1:], DP_WEIGHTS[1:]):
+        stage_y = y + h * sum(weight * stage for weight, stage in zip(weights, stages))
+        stages.append(derivative(t + node * h, stage_y))
+    error = h * sum(weight * stage for weight, stage in zip(DP_ERROR, stages))
+    return stage_y, stages[-1], error
+
+
+def hermite(y0, slope0, y1, slope1, h, fraction):
+    # The cubic through both ends of a step with the right slopes, at fraction (0 to 1) of the step
+    f2 = fraction * fraction
+    f3 = f2 * fraction
+    return ((2 * f3 - 3 * f2 + 1) * y0 + (f3 - 2 * f2 + fraction) * h * slope0
+            + (3 * f2 - 2 * f3) * y1 + (f3 - f2) * h * slope1)
+
+
+class Integrator:
+    def __init__(self, method="rk45", step=None, tolerance=DEFAULT_TOLERANCE):
+        # step is the fixed step of rk4 and the first step of rk45 (s)
+        if method not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator {method!r}, choose from {', '.join(INTEGRATORS)}")
+        self.method = method
+        self.step = step if step is not None else (DEFAULT_RK4_STEP if method == "rk4" else RK45_FIRST_STEP)
+        if self.step <= 0 or tolerance <= 0:
+            raise ValueError("The step and the tolerance must be greater than zero")
+        self.tolerance = tolerance
+        self.steps = 0  # Accepted steps
+        self.rejected = 0  # RK45 steps done again with a smaller step
+        self.evaluations = 0  # Calls of the derivative
+
+    def solve(self, derivative, t, y, t_end, events, max_step=None):
+        # Integrates dy/dt = derivative(t, y) from t until t_end or the first event, whichever comes first.
+        # events: functions g(t, y). An event happens where g goes from below zero to zero or above.
+        # max_step caps the step for fast parts of the motion.
+        # Returns (t, y, index of the event that happened or None).
+        def counted(t, y):
+            self.evaluations += 1
+            return derivative(t, y)
+
+        slope = counted(t, y)
+        values = [event(t, y) for event in events]
+        cap = max_step if max_step is not None else t_end - t
+        limit = cap  # Biggest step allowed, smaller while closing in on an event
+        closing_in = False
+        while t < t_end:
+            last = min(self.step, limit) >= t_end - t
+            h = t_end - t if last else min(self.step, limit)
+            ratio = 0.0  # Error estimate over the tolerance (rk45 only)
+            if self.method == "rk4":
+                new_y = rk4_step(counted, t, y, h, slope)
+                new_slope = counted(t + h, new_y)
+            else:
+                new_y, new_slope, error = dormand_prince_step(counted, t, y, h, slope)
+                scale = self.tolerance * (1 + np.maximum(np.abs(y), np.abs(new_y)))
+                ratio = float(np.max(np.abs(error) / scale))
+
+            new_values = [event(t + h, new_y) for event in events]
+            first = None
+            for index, (before, after) in enumerate(zip(values, new_values)):
+                if before < 0 <= after:
+                    fraction = self.locate(events[index], t, y, slope, new_y, new_slope, h)
+                    if first is None or fraction < first[0]:
+                        first = (fraction, index)
+            if first is not None and not closing_in and (1 - first[0]) * h > EVENT_TIME_TOLERANCE:
+                # The later stages of this step were past the event, where the forces can jump (a shift, the tires
+                # breaking loose), so the step and its error estimate are off. Do it again, ending just after the event.
+                limit = first[0] * h + EVENT_TIME_TOLERANCE
+                closing_in = True
+                self.rejected += 1
+                continue
+            if self.method == "rk45":
+                # Fifth root for a fifth-order method, with a safety factor, and never more than 5 times bigger or smaller.
+                # A step that was cut short (end of the time, an event) only makes the next one smaller if it failed.
+                factor = 5.0 if ratio == 0 else min(5.0, max(0.2, 0.9 * ratio ** -0.2))
+                proposed = min(RK45_MAX_STEP, h * factor)
+                self.step = proposed if h >= self.step or ratio > 1 else max(self.step, proposed)
+                if ratio > 1:
+                    self.rejected += 1
+                    continue
+
+            self.steps += 1
+            if first is not None:
+                fraction, index = first
+                return t + fraction * h, hermite(y, slope, new_y, new_slope, h, fraction), index
+            t, y, slope, values = (t_end if last else t + h), new_y, new_slope, new_values
+            limit = cap
+            closing_in = False
+        return t, y, None
+
+    def locate(self, event, t, y, slope, new_y, new_slope, h):
+        # Where (as a part of the step) event crosses zero, by bisection on the Hermite curve.
+        # Returns the end just after the zero (where the event is already >= 0), so it isn't found again.
+        low, high = 0.0, 1.0
+        while (high - low) * h > EVENT_TIME_TOLERANCE:
+            middle = (low + high) / 2
+            if event(t + middle * h, hermite(y, slope, new_y, new_slope, h, middle)) < 0:
+                low = middle
+            else:
+                high = middle
+        return high
+
+
+class LaunchModel:
+    def __init__(self, config, trailer_mass=0.0):
+        # config: a vehicle config in the VEHICLE_CONFIGS schema, trailer_mass: kg of trailers behind it
+        self.is_electric = config.get('is_electric', False)
+        self.total_mass = float(config['mass']) + trailer_mass
+        self.max_speed = config['max_speed'] / 3.6  # m/s
+        self.max_rpm = config['max_rpm']
+        self.wheel_circumference = config['wheel_circumference']
+        self.friction_coefficient = config['friction_coefficient']
+        self.air_resistance_coefficient = config['air_resistance_coefficient']
+        self.frontal_area = config['frontal_area']
+        self.torque_curve = tuple(np.array(values, dtype=float) for values in zip(*sorted(config['torque_curve'])))
+        self.power_curve = tuple(np.array(values, dtype=float) for values in zip(*sorted(config['power_curve'])))
+        # Electric cars get their single gear ratio as "gear 1" with a final drive of 1, like in the Fleet
+        if self.is_electric:
+            self.gear_ratios = [config['single_gear_ratio']]
+            self.final_drive_ratio = 1.0
+        else:
+            self.gear_ratios = list(config['gear_ratios'])
+            self.final_drive_ratio = config['final_drive_ratio']
+        self.gear_table = np.array([self.gear_ratios])  # One row, for find_optimal_gear_row
+        self.idle_rpm = config.get('idle_rpm', 0)
+        self.shift_up_rpm = config.get('shift_up_rpm', float('inf'))
+        self.shift_down_rpm = config.get('shift_down_rpm', 0)
+        self.rev_drop_rate = config.get('rev_drop_rate', 200)
+        # Same formula as Vehicle.calculate_post_shift_duration
+        self.post_shift_duration = min(max(682 / self.rev_drop_rate * config.get('post_shift_adjustment_factor', 1.0), 0.1), 2.0)
+        self.fuel_efficiency = config.get('fuel_efficiency', 1.0)
+        self.emission_factor = config.get('emission_factor', 0)
+        self.speed_emission_coefficient = config.get('speed_emission_coefficient', 0.2)
+        self.base_engine_efficiency = config.get('base_engine_efficiency', 0.35)
+        # Tires: the grip table, the most force they give (at the peak slip) and the force of a spinning tire
+        tire = tire_for(config)
+        self.grip_table, _ = tire_tables(*tire_table_key(tire))
+        self.slip_table = np.linspace(-SLIP_TABLE_RANGE, SLIP_TABLE_RANGE, SLIP_TABLE_SIZE)
+        self.peak_slip = float(self.slip_table[np.argmax(self.grip_table)])
+        self.normal_force = self.total_mass * GRAVITY * config.get('driven_load_share', DEFAULT_DRIVEN_LOAD_SHARE)
+        self.grip_force = self.normal_force * float(self.grip_table.max())
+        self.spin_force = self.normal_force * float(self.grip_table[-1])
+        self.wheel_radius = self.wheel_circumference / (2 * np.pi)
+        self.wheel_inertia = config.get('driven_wheels', DEFAULT_DRIVEN_WHEELS) * tire['wheel_inertia']
+        self.wheel_mass = self.wheel_inertia / self.wheel_radius ** 2  # The wheels' inertia as a mass at the tread
+        self.reset()
+
+    def reset(self):
+        self.gear = 1
+        self.shifting = False
+        self.next_gear = 1
+        self.shift_start_time = 0.0
+        self.shift_start_rpm = 0.0
+        self.shift_end_time = 0.0
+        self.last_shift_time = 0.0
+        self.ramp_start = None  # Time the post-shift throttle ramp started, None when the throttle is at 1
+        self.tire_mode = "grip"  # "grip", "slip" or "spin"
+        self.finished = False
+        self.zero_to_hundred_time = None
+        self.zero_to_max_speed_time = None
+        self.shifts = []  # [start time, end time, from gear, to gear, speed in km/h at the end] for every shift
+        self.gear_stats = GearStats(len(self.gear_ratios))
+
+    def engine_rpm(self, t, speed):
+        # RPM of the engine (or the motor) at time t
+        if self.shifting:
+            return max(self.idle_rpm, self.shift_start_rpm - (self.rev_drop_rate + SHIFT_RPM_FALL_RATE) * (t - self.shift_start_time))
+        rpm = speed / self.wheel_circumference * self.gear_ratios[self.gear - 1] * self.final_drive_ratio * 60
+        return rpm if self.is_electric else max(self.idle_rpm, min(rpm, self.max_rpm))
+
+    def throttle(self, t):
+        if self.ramp_start is None:
+            return 1.0
+        return min(1.0, POST_SHIFT_THROTTLE + 2 * (t - self.ramp_start) / self.post_shift_duration)
+
+    def drive_force(self, t, speed):
+        # Force of the engine or the motor at the wheels (N), nothing while the clutch is open
+        if self.shifting:
+            return 0.0
+        rpm = self.engine_rpm(t, speed)
+        torque = float(np.interp(rpm, *self.torque_curve))
+        power = float(np.interp(rpm, *self.power_curve))
+        if self.is_electric:
+            return electric_motor_force(torque, power, self.gear_ratios[0], self.wheel_circumference, speed, 1.0)
+        total_gear_ratio = self.gear_ratios[self.gear - 1] * self.final_drive_ratio
+        return ice_wheel_force(torque, power, self.throttle(t), total_gear_ratio, self.wheel_circumference, speed)
+
+    def fuel_rates(self, t, speed):
+        # Vehicle.calculate_fuel_and_emissions per second instead of per tick: (L/s, kg CO2/s)
+        if self.is_electric:
+            return 0.0, 0.0
+        rpm_coefficient = 1 + 0.2 * (1 - min(1.0, self.engine_rpm(t, speed) / self.max_rpm))
+        speed_factor = 1 + self.speed_emission_coefficient * (speed / 100) ** 2
+        gear_efficiency = 0.85 + 0.15 * self.gear / len(self.gear_ratios)
+        fuel = speed / 3600 / (self.fuel_efficiency * 0.7 / 100) * speed_factor * rpm_coefficient / gear_efficiency
+        engine_efficiency = max(0.3, self.base_engine_efficiency * gear_efficiency)
+        return fuel, fuel * self.emission_factor / engine_efficiency * 1.02 / 1000
+
+    def slip_ratio(self, state):
+        speed = max(0.0, state[1])
+        return (state[4] * self.wheel_radius - speed) / max(speed, SLIP_MIN_SPEED)
+
+    def resistance(self, speed):
+        return resistance_force(self.total_mass, self.friction_coefficient, self.air_resistance_coefficient,
+                                self.frontal_area, speed)
+
+    def gripping_force(self, drive, resistance):
+        # Force of gripping tires: the wheels turn with the vehicle, so part of the wheel force speeds them up
+        return (self.total_mass * drive + self.wheel_mass * resistance) / (self.total_mass + self.wheel_mass)
+
+    def tire_change(self, t, speed):
+        # How close gripping or spinning tires are to slipping (zero or more: they slip now)
+        drive = self.drive_force(t, speed)
+        resistance = self.resistance(speed)
+        if self.tire_mode == "grip":
+            return self.gripping_force(drive, resistance) - self.grip_force
+        # A spinning wheel slows down once the wheel force can't keep it at the end of the table (twice the road speed)
+        return self.spin_force + 2 * self.wheel_mass * (self.spin_force - resistance) / self.total_mass - drive
+
+    def derivative(self, t, state):
+        # state: [position (m), speed (m/s), fuel (L), CO2 (kg), wheel speed (rad/s, only used while slipping)]
+        speed = max(0.0, state[1])
+        drive = self.drive_force(t, speed)
+        resistance = self.resistance(speed)
+        wheel_acceleration = 0.0
+        if self.tire_mode == "slip":
+            tire_force = self.normal_force * float(np.interp(self.slip_ratio(state), self.slip_table, self.grip_table))
+            wheel_acceleration = (drive - tire_force) * self.wheel_radius / self.wheel_inertia
+        elif self.tire_mode == "spin":
+            tire_force = self.spin_force
+        else:
+            tire_force = self.gripping_force(drive, resistance)
+        acceleration = (tire_force - resistance) / self.total_mass
+        if speed <= 0 and acceleration < 0:
+            acceleration = 0.0  # The speed never goes negative
+        fuel, co2 = self.fuel_rates(t, speed)
+        return np.array([speed, acceleration, fuel, co2, wheel_acceleration])
+
+    def events(self, t):
+        # (event function, what to do when it happens) for the current state. Every function goes from below
+        # zero to zero or above when its event happens.
+        events = [(lambda t, y: y[1] - self.max_speed, self.reach_max_speed)]
+        if self.zero_to_hundred_time is None:
+            events.append((lambda t, y: y[1] - HUNDRED_KMH, self.reach_hundred))
+        if self.tire_mode != "slip":
+            events.append((lambda t, y: self.tire_change(t, max(0.0, y[1])), self.settle_tires))
+        else:
+            events.append((lambda t, y: self.slip_ratio(y) - SLIP_TABLE_RANGE, self.start_spinning))
+            events.append((lambda t, y: self.peak_slip - self.slip_ratio(y), self.start_gripping))
+        if self.ramp_start is not None:
+            ramp_end = self.ramp_start + (1 - POST_SHIFT_THROTTLE) * self.post_shift_duration / 2
+            events.append((lambda t, y: t - ramp_end, self.end_ramp))
+        if self.is_electric:
+            # The motor force switches from torque to power at 1 m/s, a step must not straddle that
+            events.append((lambda t, y: y[1] - 1.0, None))
+        elif self.shifting:
+            events.append((lambda t, y: t - self.shift_end_time, self.complete_shift))
+        elif t < self.last_shift_time + SHIFT_COOLDOWN:
+            events.append((lambda t, y: t - (self.last_shift_time + SHIFT_COOLDOWN), self.check_shift))
+        else:
+            events.append((lambda t, y: self.engine_rpm(t, y[1]) - self.shift_up_rpm, self.check_shift))
+            events.append((lambda t, y: self.shift_down_rpm - self.engine_rpm(t, y[1]), self.check_shift))
+        return events
+
+    def reach_max_speed(self, t, state):
+        self.zero_to_max_speed_time = t
+        self.finished = True
+
+    def reach_hundred(self, t, state):
+        self.zero_to_hundred_time = t
+
+    def end_ramp(self, t, state):
+        self.ramp_start = None
+
+    def settle_tires(self, t, state):
+        # Checked after every event: gripping tires start to slip when their force goes over the peak of the
+        # grip curve, spinning wheels slow down when the wheel force drops under the force of a spinning tire
+        if self.tire_mode != "slip" and self.tire_change(t, max(0.0, state[1])) >= 0:
+            self.start_slipping(state, self.peak_slip if self.tire_mode == "grip" else SLIP_TABLE_RANGE)
+
+    def start_slipping(self, state, slip):
+        # The wheel speed joins the equation, starting at the given slip ratio
+        self.tire_mode = "slip"
+        speed = max(0.0, state[1])
+        state[4] = (speed + slip * max(speed, SLIP_MIN_SPEED)) / self.wheel_radius
+
+    def start_spinning(self, t, state):
+        self.tire_mode = "spin"  # At the end of the table, a rev limiter takes the extra torque (see tire_step)
+
+    def start_gripping(self, t, state):
+        self.tire_mode = "grip"
+
+    def check_shift(self, t, state):
+        # GearShiftingSystem.handle_gear_shifting once the cooldown is over
+        speed = state[1]
+        rpm = self.engine_rpm(t, speed)
+        shifting_up = rpm >= self.shift_up_rpm
+        if not shifting_up and rpm > self.shift_down_rpm:
+            return
+        wheel_rpm = speed / self.wheel_circumference * 60
+        target_gear = find_optimal_gear_row(wheel_rpm, self.gear, len(self.gear_ratios), self.gear_table, 0,
+                                            self.final_drive_ratio, self.shift_up_rpm, self.shift_down_rpm, shifting_up)
+        if target_gear == self.gear:
+            return
+        target_rpm = wheel_rpm * self.gear_ratios[target_gear - 1] * self.final_drive_ratio
+        target_rpm = max(self.idle_rpm, min(target_rpm, self.max_rpm))
+        self.shifting = True
+        self.next_gear = target_gear
+        self.shift_start_time = t
+        self.shift_start_rpm = rpm
+        # The revs fall until they are SHIFT_RPM_TOLERANCE above the target (a downshift is done right away)
+        self.shift_end_time = t + max(0.0, rpm - target_rpm - SHIFT_RPM_TOLERANCE) / (self.rev_drop_rate + SHIFT_RPM_FALL_RATE)
+        if self.shift_end_time <= t:
+            self.complete_shift(t, state)
+
+    def complete_shift(self, t, state):
+        speed_kmh = float(state[1] * 3.6)
+        self.gear_stats.shift(0, self.gear, self.next_gear, speed_kmh)
+        self.shifts.append([self.shift_start_time, t, self.gear, self.next_gear, speed_kmh])
+        self.gear = self.next_gear
+        self.shifting = False
+        self.last_shift_time = t
+        self.ramp_start = t
+
+    def run(self, integrator, duration=DEFAULT_DURATION):
+        # Full-throttle launch until the max speed or the end of the time. Returns (time, final state, top speed).
+        self.reset()
+        t = 0.0
+        state = np.zeros(5)
+        self.settle_tires(t, state)
+        top_speed = 0.0
+        while t < duration and not self.finished:
+            events = self.events(t)
+            max_step = SLIP_MAX_STEP if self.tire_mode == "slip" and integrator.method == "rk4" else None
+            new_t, new_state, fired = integrator.solve(self.derivative, t, state, duration, [event for event, _ in events], max_step)
+            # The gear only changes at events, so the whole piece counts for the gear we were in
+            change = new_state - state
+            self.gear_stats.add(self.gear, new_t - t, change[0], change[2], change[3])
+            t, state = new_t, new_state
+            top_speed = max(top_speed, state[1])
+            if fired is not None:
+                action = events[fired][1]
+                if action is not None:
+                    action(t, state)
+                self.settle_tires(t, state)
+        return t, state, top_speed
+
+
+def run_launch(vehicle_type, trailer_mass=None, duration=DEFAULT_DURATION, method="rk45", step=None,
+               tolerance=DEFAULT_TOLERANCE):
+    # Same launch and results as headless.run_headless, solved with the continuous model
+    config = VEHICLE_CONFIGS[vehicle_type]
+    trailers = 0.0
+    if vehicle_type == "Semi truck":  # Same rule as headless.make_headless_vehicle
+        trailers = float(trailer_mass) if trailer_mass is not None else TRAILER_CONFIGS["Standard trailer"]["mass"]
+    model = LaunchModel(config, trailers)
+    integrator = Integrator(method, step, tolerance)
+    time_simulated, state, top_speed = model.run(integrator, duration)
+    distance_km = state[0] / 1000
+    co2_kg = float(state[3])
+    return {
+        "vehicle_type": vehicle_type,
+        "trailer_mass": trailer_mass,
+        "zero_to_hundred_time": model.zero_to_hundred_time,  # None if 100 km/h was never reached
+        "top_speed_kmh": float(top_speed * 3.6),
+        "gear_shift_data": [list(shift) for shift in model.gear_stats.shift_data()],  # (gear, time in gear, speed at shift)
+        "co2_kg": co2_kg,
+        "co2_g_per_km": co2_kg * 1000 / distance_km if distance_km > 0 else 0,
+        "distance_km": float(distance_km),
+        "time_simulated": time_simulated,
+        "zero_to_max_speed_time": model.zero_to_max_speed_time,  # None if the max speed was never reached
+        "shifts": model.shifts,  # [start time, end time, from gear, to gear, speed in km/h at the end]
+        "integrator": method,
+        "steps": integrator.steps,
+        "evaluations": integrator.evaluations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-throttle launch with a higher-order integrator and exact event times")
+    parser.add_argument("vehicle", choices=list(VEHICLE_CONFIGS))
+    parser.add_argument("--trailer-mass", type=float, help="trailer load in kg (semi truck only)")
+    parser.add_argument("--method", choices=INTEGRATORS, default="rk45")
+    parser.add_argument("--step", type=float, help=f"fixed step of rk4 (default {DEFAULT_RK4_STEP} s), first step of rk45")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="rk45 error per step")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of simulated time")
+    args = parser.parse_args()
+
+    results = run_launch(args.vehicle, args.trailer_mass, args.duration, args.method, args.step, args.tolerance)
+    print(f"{args.vehicle}: {results['integrator']}, {results['steps']} steps, {results['evaluations']} force evaluations")
+    for label, key in (("0-100 km/h", "zero_to_hundred_time"), ("Max speed reached", "zero_to_max_speed_time")):
+        value = results[key]
+        print(f"{label}: {value:.3f} s" if value is not None else f"{label}: not reached")
+    print(f"Top speed {results['top_speed_kmh']:.1f} km/h, {results['distance_km']:.2f} km, "
+          f"{results['co2_g_per_km']:.0f} g CO2/km")
+    for start, end, from_gear, to_gear, speed in results["shifts"]:
+        print(f"Shift {from_gear} -> {to_gear} at {start:.3f} s, done at {end:.3f} s ({speed:.1f} km/h)")
+
+
+if __name__ == "__main__":
+    main()
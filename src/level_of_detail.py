@@ -0,0 +1,154 @@
+# level_of_detail.py
+# This file draws many vehicles at once with levels of detail (LOD), so scenes with hundreds of vehicles on screen
+# (the traffic viewer in traffic.py) stay at 60 FPS. Every frame each vehicle gets one of three tiers:
+# - FULL: the vehicle picture, its trailer and every wheel turning with the distance driven, like Vehicle.draw and
+#   Trailer.draw. Only near the vehicle the camera follows, and only when the vehicle is long enough on screen
+#   (FULL_MIN_LENGTH) to see the wheels turn.
+# - SPRITE: one still picture of the vehicle with its wheels and trailer, scaled once per zoom level. One blit.
+# - FLAT: a rectangle, at least one pixel (a point when zoomed far out), in one color per vehicle type (FLAT_COLORS),
+#   so the mix of a dense scene can still be seen. For vehicles shorter on screen than min_sprite_length, where a
+#   picture would only be a few blurry pixels anyway.
+# The tiers are chosen for all the vehicles with a few array operations, from their length on screen and their
+# distance to the followed vehicle. How far FULL reaches (full_detail_radius) and how short a SPRITE may be
+# (min_sprite_length) are part of the render quality levels (quality.py), so when the frames take too long the
+# QualityGovernor steps them down together with the rest, and back up when there is time again.
+# Every picture is made the first time it is needed: the layers of a kind of vehicle once, the scaled pictures once
+# per zoom level, and the turning wheels come from the shared wheel_sprites cache (sprite_cache.py).
+
+import os
+import numpy as np
+import pygame
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS, PICTURE_PIXELS_PER_METER
+from sprite_cache import load_image, wheel_sprites
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FULL, SPRITE, FLAT = 0, 1, 2
+TIER_NAMES = ("full", "sprite", "flat")
+FULL_MIN_LENGTH = 60  # pixels. Shorter vehicles have wheels too small to see them turn
+# Colors of the FLAT tier, given to the vehicle types in the order they are first drawn. Strong colors, because the
+# pictures are mostly gray like the road.
+FLAT_COLORS = [(200, 40, 40), (30, 90, 210), (240, 190, 30), (30, 150, 70), (150, 60, 180), (240, 120, 30), (20, 20, 20)]
+
+
+def picture(path):
+    return load_image(os.path.join(PROJECT_FOLDER, path))  # Paths in the configs are from the project folder
+
+
+def vehicle_layers(vehicle_type, has_trailer):
+    # The pictures of a vehicle at the game's scale, in the order Vehicle.draw draws them (the trailer goes over the
+    # back of the truck): [(picture, wheel size or None, position)]. Positions are the top left of a picture or the
+    # center of a wheel, relative to the top left of the whole vehicle. Also returns the size of the whole vehicle.
+    config = VEHICLE_CONFIGS[vehicle_type]
+    layers = [(picture(config["image_path"]), None, (0, 0))]
+    if config.get("is_truck", False):
+        wheel_paths = [config["front_wheel_image_path"]] + [config["rear_wheel_image_path"]] * (len(config["wheel_positions"]) - 1)
+    else:
+        wheel_paths = [config["wheel_image_path"]] * len(config["wheel_positions"])
+    layers += [(picture(path), tuple(config["wheel_size"]), tuple(center)) for path, center in zip(wheel_paths, config["wheel_positions"])]
+    if has_trailer:
+        trailer = TRAILER_CONFIGS["Standard trailer"]
+        trailer_x = trailer["initial_position"][0]
+        trailer_y = trailer["initial_position"][1] - config["initial_position"][1]
+        layers.append((picture(trailer["image_path"]), None, (trailer_x, trailer_y)))
+        layers += [(picture(trailer["wheel_image_path"]), tuple(trailer["wheel_size"]), (trailer_x + x, trailer_y + y))
+                   for x, y in trailer["wheel_positions"]]
+
+    def bounds(image, wheel_size, position):
+        if wheel_size is None:
+            return pygame.Rect(position, image.get_size())
+        return pygame.Rect(position[0] - wheel_size[0] // 2, position[1] - wheel_size[1] // 2, *wheel_size)
+
+    whole = bounds(*layers[0]).unionall([bounds(*layer) for layer in layers[1:]])
+    layers = [(image, wheel_size, (x - whole.x, y - whole.y)) for image, wheel_size, (x, y) in layers]
+    return layers, whole.size
+
+
+def choose_tiers(front_x, length, focus_x, level):
+    # The tier of every vehicle: front_x and length (arrays) are its front bumper and length on screen in pixels,
+    # focus_x the front bumper of the followed vehicle. level is a render quality level (quality.py).
+    tiers = np.where(length < level["min_sprite_length"], FLAT, SPRITE)
+    near = np.abs(front_x - length / 2 - focus_x) <= level["full_detail_radius"] + length / 2
+    tiers[near & (length >= FULL_MIN_LENGTH)] = FULL
+    return tiers
+
+
+class LevelOfDetail:
+    def __init__(self):
+        self.layers = {}  # (vehicle type, has trailer) -> (layers, size) at the game's scale
+        self.scaled = {}  # (vehicle type, has trailer, pixels per meter) -> (still picture, scaled layers)
+        self.colors = {}  # vehicle type -> color of the FLAT tier
+        self.tier_counts = [0, 0, 0]  # Vehicles drawn in each tier in the last frame
+
+    def kind(self, key):
+        kind = self.layers.get(key)
+        if kind is None:
+            kind = vehicle_layers(*key)
+            self.layers[key] = kind
+        return kind
+
+    def scaled_kind(self, key, pixels_per_meter):
+        # The still picture of a kind of vehicle and its layers, for one zoom level
+        scaled = self.scaled.get(key + (pixels_per_meter,))
+        if scaled is None:
+            layers, size = self.kind(key)
+            composed = pygame.Surface(size, pygame.SRCALPHA)
+            for image, wheel_size, (x, y) in layers:
+                if wheel_size is None:
+                    composed.blit(image, (x, y))
+                else:
+                    wheel = pygame.transform.smoothscale(image, wheel_size)
+                    composed.blit(wheel, (x - wheel_size[0] // 2, y - wheel_size[1] // 2))
+            scale = pixels_per_meter / PICTURE_PIXELS_PER_METER
+            still = pygame.transform.smoothscale(composed, (max(1, round(size[0] * scale)), max(1, round(size[1] * scale))))
+            scaled_layers = []
+            for image, wheel_size, (x, y) in layers:
+                if wheel_size is None:
+                    body_size = (max(1, round(image.get_width() * scale)), max(1, round(image.get_height() * scale)))
+                    scaled_layers.append((pygame.transform.smoothscale(image, body_size), None, (round(x * scale), round(y * scale))))
+                else:
+                    wheel_size = (max(1, round(wheel_size[0] * scale)), max(1, round(wheel_size[1] * scale)))
+                    scaled_layers.append((image, wheel_size, (round(x * scale), round(y * scale))))
+            scaled = (still, scaled_layers)
+            self.scaled[key + (pixels_per_meter,)] = scaled
+        return scaled
+
+    def color(self, vehicle_type):
+        color = self.colors.get(vehicle_type)
+        if color is None:
+            color = FLAT_COLORS[len(self.colors) % len(FLAT_COLORS)]
+            self.colors[vehicle_type] = color
+        return color
+
+    def draw(self, screen, keys, front_x, length, bottom, wheel_angles, focus_x, pixels_per_meter, level):
+        # Draws vehicles standing on the line y = bottom. keys[i] is (vehicle type, has trailer) of vehicle i,
+        # front_x and length its front bumper and length on screen (pixels, arrays), wheel_angles its wheel angles
+        # in degrees (array). Returns the tier of every vehicle.
+        tiers = choose_tiers(front_x, length, focus_x, level)
+        self.tier_counts = np.bincount(tiers, minlength=3).tolist()
+        blits = []
+        for index in np.nonzero(tiers == SPRITE)[0]:
+            still, _ = self.scaled_kind(keys[index], pixels_per_meter)
+            blits.append((still, (int(front_x[index]) - still.get_width(), bottom - still.get_height())))
+        screen.blits(blits, False)
+
+        scale = pixels_per_meter / PICTURE_PIXELS_PER_METER
+        for index in np.nonzero(tiers == FLAT)[0]:
+            _, size = self.kind(keys[index])
+            width, height = max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+            screen.fill(self.color(keys[index][0]), (int(front_x[index]) - width, bottom - height, width, height))
+
+        # Full detail last, so the vehicles near the followed one are on top
+        smooth = level["smooth_wheels"]
+        for index in np.nonzero(tiers == FULL)[0]:
+            still, layers = self.scaled_kind(keys[index], pixels_per_meter)
+            left, top = int(front_x[index]) - still.get_width(), bottom - still.get_height()
+            for image, wheel_size, (x, y) in layers:
+                if wheel_size is None:
+                    screen.blit(image, (left + x, top + y))
+                else:
+                    wheel = wheel_sprites.get(image, wheel_size, wheel_angles[index], smooth)
+                    screen.blit(wheel, (left + x - wheel.get_width() // 2, top + y - wheel.get_height() // 2))
+        return tiers
+
+    def get_hud_text(self):
+        return ", ".join(f"{count} {name}" for count, name in zip(self.tier_counts, TIER_NAMES))
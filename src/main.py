@@ -6,16 +6,27 @@ simulator, from user interface to physics calculations.
 """
 
 import os
+import argparse
 import pygame
 from config import WIDTH, HEIGHT, VEHICLE_CONFIGS, TRAILER_CONFIGS, TRAILER_WEIGHT_OPTIONS, COLORS
 from simulation import Simulation
 from vehicle import Vehicle
 from trailer import Trailer
-from drawing import draw_screen, draw_buttons
-from menu import main_menu, get_custom_weight
+from drawing import draw_screen, draw_buttons, draw_time_warp_button
+from menu import main_menu, get_custom_weight, wait_for_events, needs_redraw_for, IDLE_TIMEOUT_MS
 import traceback
 import sys
 from background import Background
+from camera import Camera
+from quality import QualityGovernor
+from time_warp import TimeWarp, PHYSICS_TIME_STEP
+from results_cache import ResultsCache
+from vehicle_tuning import TuningWatcher
+from vehicle_catalog import open_catalog
+from sim_server import validate_request
+from frame_capture import ScreenRecorder
+from telemetry_charts import TelemetryCharts
+from telemetry_stream import TelemetryToggle, TELEMETRY_PORT
 
 # Change the working directory to the project root
 os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -39,7 +50,27 @@ print("This project was developed for Code in Place (Stanford), 2024.")
 print("Coded by isabytes https://github.com/isabytes")
 print("Have fun!")
 
-def make_vehicle(vehicle_type, trailer_weight=None, use_metric=True):
+def check_catalog_spec(spec):
+    # A catalog vehicle must be one the game can build and draw before it goes into VEHICLE_CONFIGS.
+    # Raises ValueError with the reason if it is not.
+    try:
+        validate_request({'config': spec})  # The physics keys, same check as vehicle_tuning.py
+    except TypeError as e:
+        raise ValueError(str(e))
+    required = ['engine_power', 'max_torque', 'image_path', 'initial_position', 'wheel_positions', 'wheel_size']
+    required += ['battery_capacity'] if spec.get('is_electric', False) else []
+    pictures = ['front_wheel_image_path', 'rear_wheel_image_path'] if spec.get('is_truck', False) else ['wheel_image_path']
+    missing = [key for key in required + pictures if key not in spec]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    # The vehicle picture has a fallback, the wheel pictures don't
+    missing_pictures = [spec[key] for key in pictures if not isinstance(spec[key], str) or not os.path.isfile(spec[key])]
+    if missing_pictures:
+        raise ValueError(f"wheel pictures not found: {', '.join(str(path) for path in missing_pictures)}")
+
+
+def make_vehicle(vehicle_type, trailer_weight=None, use_metric=True, trailer_count=1):
+    # trailer_weight is the load of each trailer, trailer_count > 1 makes a road train (semi truck only)
     print(f"Making a {vehicle_type}")
     if vehicle_type == "quit":
         return 
@@ -57,13 +88,12 @@ def make_vehicle(vehicle_type, trailer_weight=None, use_metric=True):
         try:
             if trailer_weight is not None:
                 trailer_info['mass'] = float(trailer_weight)
-            trailer = Trailer(**trailer_info)
-            print(f"Trailer created: {trailer}")
-            vehicle.trailer = trailer
-            vehicle.setup_trailer({'trailer': trailer})  # Call setup_trailer after assigning the trailer
-            vehicle.update_total_mass()
+            trailers = [Trailer(**trailer_info) for _ in range(max(1, trailer_count))]
+            trailer = trailers[0]
+            print(f"Trailers created: {len(trailers)}")
+            vehicle.setup_trailer({'trailers': trailers})
         
-            print(f"Trailer weight: {trailer.mass} kg")
+            print(f"Trailer weight: {trailer.mass} kg each")
             print(f"Total weight (truck + trailer): {vehicle.total_mass} kg")
         except:
             print(f"Oops, couldn't make the trailer")
@@ -74,9 +104,21 @@ def make_vehicle(vehicle_type, trailer_weight=None, use_metric=True):
     
     return vehicle
 
-def run_sim(vehicle, use_metric):
+def step_vehicle(vehicle, charts=None, telemetry=None):
+    # One fixed physics step. The camera follows the vehicle, so it never drives off screen and time warp
+    # may always go on stepping it.
+    vehicle.update(PHYSICS_TIME_STEP)
+    if charts is not None:
+        charts.sample(vehicle)
+    if telemetry is not None:
+        telemetry.publish_vehicle(vehicle)  # Only copies the values, a background thread sends them
+    return True
+
+def run_sim(vehicle, use_metric, tuning=None, recorder=None, telemetry=None):
     print(f"Starting simulation for: {vehicle.name}")
     background = Background(WIDTH, HEIGHT, vehicle.METERS_TO_PIXELS, vehicle.VISUAL_SPEED_FACTOR)
+    # The camera follows the vehicle through the world once it is a third into the window (see camera.py)
+    camera = Camera(WIDTH, HEIGHT)
     sim = Simulation()
     sim.add_vehicle(vehicle)
     
@@ -84,6 +126,7 @@ def run_sim(vehicle, use_metric):
     simulation_started = False
     simulation_paused = False
     start_button, restart_button, back_button = draw_buttons(screen, font, WIDTH, HEIGHT, simulation_started, simulation_paused)
+    warp_button = draw_time_warp_button(screen, font, WIDTH)
 
     # Set up other stuff
     speed = 0
@@ -91,16 +134,58 @@ def run_sim(vehicle, use_metric):
     distance = 0
     emissions = 0
 
+    # Render quality governor, lowers the quality on slow machines to keep 60 FPS
+    quality = QualityGovernor(target_fps=60)
+    quality.apply_to_background(background)
+
+    # Time warp runs the physics faster than real time (button or T key), the screen still draws at 60 FPS
+    time_warp = TimeWarp(target_fps=60)
+
+    # Strip charts of speed, RPM, gear, forces and CO2 (C key shows or hides them)
+    charts = TelemetryCharts(vehicle, use_metric)
+
     # Main loop
     running = True
     clock = pygame.time.Clock()
+    needs_redraw = True
     
     while running:
-        delta_time = clock.tick(60) / 1000.0
+        # Before Start and while paused nothing moves, so we sleep until the user clicks
+        idle = not simulation_started or simulation_paused
+        if idle:
+            events = pygame.event.get() if needs_redraw else wait_for_events(IDLE_TIMEOUT_MS)
+            clock.tick()  # Restart frame timing so the idle time isn't used as one big physics step
+            delta_time = 0
+        else:
+            delta_time = clock.tick(60) / 1000.0
+            # get_rawtime is the time the last frame really took, without the waiting done by tick
+            if quality.record_frame(clock.get_rawtime() / 1000.0):
+                quality.apply_to_background(background)
+            events = pygame.event.get()
+        if needs_redraw_for(events):
+            needs_redraw = True
+
+        # Changes to the tuning file (see vehicle_tuning.py) are swapped in before the next physics step
+        if tuning is not None and vehicle.name in tuning.poll():
+            try:
+                vehicle.apply_config(VEHICLE_CONFIGS[vehicle.name])
+            except (KeyError, ValueError) as e:
+                print(f"Couldn't apply the tuned config: {e}")
+            needs_redraw = True
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return "quit"
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_t:
+                time_warp.cycle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_r and recorder is not None:
+                recorder.toggle(screen)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                charts.toggle()
+                needs_redraw = True
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_u and telemetry is not None:
+                telemetry.toggle()
+                needs_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = event.pos
                 if start_button.collidepoint(mouse_pos):
@@ -115,7 +200,7 @@ def run_sim(vehicle, use_metric):
                         print(f"Simulation {'paused' if simulation_paused else 'unpaused'}")
                 elif restart_button.collidepoint(mouse_pos):
                     # Reset everything
-                    vehicle = make_vehicle(vehicle.name, str(vehicle.trailer.mass if vehicle.trailer else None), use_metric)
+                    vehicle = make_vehicle(vehicle.name, str(vehicle.trailer.mass if vehicle.trailer else None), use_metric, len(vehicle.trailers))
                     if vehicle is None:
                         print("Couldn't make vehicle. Quitting.")
                         return "quit"
@@ -127,48 +212,39 @@ def run_sim(vehicle, use_metric):
                     distance = 0
                     emissions = 0
                     vehicle.throttle = 0
+                    time_warp.reset()
+                    charts.reset(vehicle)
+                    camera.reset()
                     background.set_paused(False)
                 elif back_button.collidepoint(mouse_pos):
                     return "menu"
+                elif warp_button.collidepoint(mouse_pos):
+                    time_warp.cycle()
 
         if simulation_started and not simulation_paused:
             screen.fill(COLORS['BLACK'])
-            vehicle.update(delta_time)
+            # Physics in fixed steps of simulated time, as many as the time warp wants for this frame.
+            # The scenery scrolls with the real frame time so it doesn't turn into a blur.
+            time_warp.advance(delta_time, lambda: step_vehicle(vehicle, charts, telemetry))
             background.update(vehicle, delta_time)
             
-            # Update stuff
+            # Update stuff (the vehicle keeps its own totals in simulated time, so they are right at any warp)
             speed = vehicle.speed
             rpm = vehicle.current_rpm
-            distance += (speed / 3.6) * delta_time
+            distance = vehicle.distance_traveled
+            emissions = vehicle.co2_emissions
+            camera.follow(vehicle.rect.x)
 
-            emission_value = vehicle.calculate_emissions(delta_time)
-            if emission_value is not None:
-                emissions += emission_value
-            else:
-                print("Oops, emissions calculation didn't work")
-            
-            # Check if vehicle is off screen
-            if vehicle.position[0] > WIDTH:
-                # Reset simulation
-                vehicle = make_vehicle(vehicle.name, use_metric)
-                if vehicle is None:
-                    print("Couldn't make vehicle. Quitting.")
-                    return "quit"
-                sim.add_vehicle(vehicle)
-                simulation_started = False
-                simulation_paused = False
-                speed = 0
-                rpm = vehicle.current_rpm
-                distance = 0
-                emissions = 0
-                background.set_paused(False)
-                print("Vehicle went off screen. Starting over.")
-
-        # Draw stuff
-        background.draw(screen, vehicle, delta_time)
-        vehicle.draw(screen, HEIGHT)
-        draw_screen(screen, vehicle, font, speed, rpm, distance, emissions, WIDTH, HEIGHT, delta_time, start_button, restart_button, back_button, simulation_started, simulation_paused, use_metric)
-        pygame.display.flip()
+        # Draw stuff (draw_screen also draws the vehicle). When idle we only redraw after input.
+        if (simulation_started and not simulation_paused) or needs_redraw:
+            needs_redraw = False
+            background.draw(screen, vehicle, delta_time)
+            draw_screen(screen, vehicle, font, speed, rpm, distance, emissions, WIDTH, HEIGHT, delta_time, start_button, restart_button, back_button, simulation_started, simulation_paused, use_metric, quality, time_warp, charts, camera)
+            if recorder is not None:
+                recorder.record(screen)  # Copies the frame for the writer thread (see frame_capture.py)
+            if telemetry is not None:
+                telemetry.draw_status(screen)
+            pygame.display.flip()
         
     return "menu"
 
@@ -180,6 +256,11 @@ def show_loading(screen, font):
     pygame.time.wait(400)
 
 def main():
+    parser = argparse.ArgumentParser(description="Vehicle Dynamics Simulator")
+    parser.add_argument("--telemetry-port", type=int, metavar="PORT",
+                        help=f"send live telemetry over UDP to this localhost port from the start (U key, default port {TELEMETRY_PORT})")
+    args = parser.parse_args()
+
     pygame.init()
 
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -189,29 +270,63 @@ def main():
     use_metric = True
     running = True
 
+    # Watches vehicle_tuning.json, so vehicles can be tuned without restarting
+    tuning = TuningWatcher()
+
+    # Performance cards for the menu, missing ones are simulated in the background
+    results_cache = ResultsCache()
+    results_cache.start_background_fill()
+
+    # The vehicle catalog in the project folder, if there is one (only its index is read now)
+    catalog = open_catalog()
+
+    # Screen recording with the R key, the frames are written by a background thread
+    recorder = ScreenRecorder()
+
+    # Live telemetry over UDP with the U key (see telemetry_stream.py), sent by a background thread
+    telemetry = TelemetryToggle(args.telemetry_port or TELEMETRY_PORT)
+    if args.telemetry_port:
+        telemetry.toggle()
+
     while running:
-        result = main_menu(screen, font, WIDTH, HEIGHT)
+        result = main_menu(screen, font, WIDTH, HEIGHT, results_cache, catalog)
         if result == "quit":
             running = False
         elif result == "toggle_units":
             use_metric = not use_metric
         elif result:
-            vehicle_type, trailer_weight, use_metric = result
+            vehicle_type, trailer_weight, use_metric, trailer_count = result
+            if vehicle_type not in VEHICLE_CONFIGS:
+                # A catalog vehicle: its spec is read now and it gets a performance card for the next visit to the menu
+                try:
+                    spec = dict(catalog.spec(vehicle_type))
+                    check_catalog_spec(spec)
+                except (OSError, ValueError) as e:
+                    print(f"Can't use catalog vehicle {vehicle_type}: {e}")
+                    continue  # Back to the menu, the bad spec stays out of VEHICLE_CONFIGS
+                VEHICLE_CONFIGS[vehicle_type] = spec
+                results_cache.start_background_fill([(vehicle_type, None)])
             if vehicle_type == "Semi truck" and trailer_weight == "custom":
                 trailer_weight = get_custom_weight(screen, font, use_metric)
                 if not trailer_weight:
                     continue
             
-            vehicle = make_vehicle(vehicle_type, trailer_weight, use_metric)
+            vehicle = make_vehicle(vehicle_type, trailer_weight, use_metric, trailer_count)
             if vehicle:
                 show_loading(screen, font)
-                sim_result = run_sim(vehicle, use_metric)
+                sim_result = run_sim(vehicle, use_metric, tuning, recorder, telemetry)
+                recorder.stop()  # Writes the frames that are still queued
                 if sim_result == "quit":
                     running = False
+                else:
+                    tuning.poll(force=True)
+                    results_cache.start_background_fill()  # Cards of vehicles tuned during the run
             else:
                 print("Couldn't make vehicle. Quitting.")
                 running = False
 
+    results_cache.shutdown()
+    telemetry.stop()
     pygame.quit()
     print("Simulation ended")
 
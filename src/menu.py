@@ -4,14 +4,39 @@ VERSION = "1.0.0"
 # Importing necessary modules
 import pygame
 import time
-from config import VEHICLE_CONFIGS, TRAILER_WEIGHT_OPTIONS, WIDTH, HEIGHT, COLORS
-from utils import kg_to_lbs, lbs_to_kg
+from config import VEHICLE_CONFIGS, TRAILER_WEIGHT_OPTIONS, TRAILER_COUNT_OPTIONS, WIDTH, HEIGHT, COLORS
+from utils import kg_to_lbs, lbs_to_kg, kmh_to_mph
+from vehicle_catalog import CATALOG_PAGE_SIZE
 
 # Define button sizes
 BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 50
 FONT_SIZE = 32
 
+# Idle rendering: menus and paused simulations sleep until something happens instead of redrawing at a fixed FPS.
+# This keeps the CPU almost idle, which saves battery on laptops.
+IDLE_TIMEOUT_MS = 1000  # Wake up at least once a second even if nothing happens
+REDRAW_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE,
+                 pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSIZECHANGED)
+
+def wait_for_events(timeout_ms):
+    # Block until an event arrives or the timeout runs out, then return all waiting events.
+    # Returns an empty list on timeout.
+    event = pygame.event.wait(max(1, int(timeout_ms)))
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+def post_events(events):
+    # Puts events back on the queue, in order. Used when one event changed the menu: the rest of the events
+    # are handled in the next loop, after the redraw, so they are not lost and the clicks hit the new buttons.
+    for event in events:
+        pygame.event.post(event)
+
+def needs_redraw_for(events):
+    # Only input and window events change what the screen should look like
+    return any(event.type in REDRAW_EVENTS for event in events)
+
 def draw_button(screen, button_x, button_y, button_width, button_height, button_color, button_text=''):
     button_rect = pygame.Rect(button_x, button_y, button_width, button_height)
     pygame.draw.rect(screen, button_color, button_rect)
@@ -70,13 +95,76 @@ def draw_intro_page(screen, font):
     draw_text(screen, f"Version: {VERSION}", font, (255, 255, 255), version_x, version_y)
 
     return start_button  # Return the start button for event handling
-def draw_vehicle_menu(screen, font, use_metric):
+def draw_spec_card(screen, result, card_x, card_y, use_metric):
+    # Small performance card next to a menu button, filled from the results cache (see results_cache.py)
+    card_font = pygame.font.Font(None, 22)
+    if result is None:
+        draw_text(screen, "Simulating...", card_font, COLORS['LIGHT_GRAY'], card_x, card_y + 15)
+        return
+    if result["zero_to_hundred_time"] is not None:
+        zero_to_hundred = f"{result['zero_to_hundred_time']:.1f} s"
+    else:
+        zero_to_hundred = "N/A"
+    if use_metric:
+        top_speed = f"{result['top_speed_kmh']:.0f} km/h"
+        co2 = f"{result['co2_g_per_km']:.0f} g/km"
+    else:
+        top_speed = f"{kmh_to_mph(result['top_speed_kmh']):.0f} mph"
+        co2 = f"{result['co2_g_per_km'] / 0.621371:.0f} g/mi"
+    line_1 = f"0-100 km/h: {zero_to_hundred}   Top: {top_speed}"
+    line_2 = f"CO2: {co2}"
+    if result["gear_shift_data"]:
+        gear_times = " ".join(f"{gear}:{time:.1f}s" for gear, time, speed in result["gear_shift_data"][:5])
+        line_2 += f"   Gears: {gear_times}"
+    draw_text(screen, line_1, card_font, COLORS['WHITE'], card_x, card_y + 5)
+    draw_text(screen, line_2, card_font, COLORS['LIGHT_GRAY'], card_x, card_y + 27)
+
+def draw_index_card(screen, info, card_x, card_y, use_metric):
+    # Catalog vehicles that were never driven have no performance card yet, show what the catalog index knows
+    card_font = pygame.font.Font(None, 22)
+    mass = f"{info['mass']:,.0f} kg" if use_metric else f"{kg_to_lbs(info['mass']):,.0f} lbs"
+    draw_text(screen, f"{info['class'].capitalize()}   {mass}", card_font, COLORS['WHITE'], card_x, card_y + 5)
+    draw_text(screen, f"{info['power_to_weight']:.0f} kW per tonne", card_font, COLORS['LIGHT_GRAY'], card_x, card_y + 27)
+
+def draw_catalog_controls(screen, page, page_count, vehicle_class, top_y):
+    # Paging and class filter buttons under the vehicle buttons, only shown for catalogs with more than one page
+    controls_font = pygame.font.Font(None, 28)
+    buttons = {
+        "previous": pygame.Rect(WIDTH // 2 - 200, top_y, 90, 40),
+        "class": pygame.Rect(WIDTH // 2 - 100, top_y, 200, 40),
+        "next": pygame.Rect(WIDTH // 2 + 110, top_y, 90, 40),
+    }
+    labels = {"previous": "< Prev", "class": f"Class: {vehicle_class or 'All'}", "next": "Next >"}
+    for key, rect in buttons.items():
+        pygame.draw.rect(screen, COLORS['LIGHT_BLUE'], rect)
+        pygame.draw.rect(screen, COLORS['BLUE'], rect, 2)
+        draw_text(screen, labels[key], controls_font, COLORS['BLACK'],
+                  rect.centerx - controls_font.size(labels[key])[0] // 2, rect.centery - controls_font.size(labels[key])[1] // 2)
+    page_text = f"Page {page + 1} of {page_count}"
+    draw_text(screen, page_text, controls_font, COLORS['WHITE'], WIDTH // 2 - controls_font.size(page_text)[0] // 2, top_y + 50)
+    return buttons
+
+def draw_vehicle_menu(screen, font, use_metric, results_cache=None, catalog=None, page=0, vehicle_class=None):
+    # With a catalog (see vehicle_catalog.py) the menu shows one page of it, else the vehicles of VEHICLE_CONFIGS
     vehicle_buttons = {}
-    for index, vehicle_name in enumerate(VEHICLE_CONFIGS.keys()):
+    catalog_buttons = {}
+    if catalog is None:
+        names, total = list(VEHICLE_CONFIGS.keys()), len(VEHICLE_CONFIGS)
+    else:
+        names, total = catalog.query(vehicle_class=vehicle_class, page=page, page_size=CATALOG_PAGE_SIZE)
+    for index, vehicle_name in enumerate(names):
         button_x = WIDTH // 2 - 200
         button_y = HEIGHT // 2 - 150 + index * 60
         button = draw_button(screen, button_x, button_y, 400, 50, (200, 200, 200), vehicle_name)
         vehicle_buttons[vehicle_name] = button
+        # The semi truck card depends on the trailer load, so it is shown in the trailer menu instead
+        if results_cache is not None and vehicle_name in VEHICLE_CONFIGS and vehicle_name != "Semi truck":
+            draw_spec_card(screen, results_cache.get(vehicle_name), button_x + 410, button_y, use_metric)
+        elif catalog is not None and vehicle_name not in VEHICLE_CONFIGS:
+            draw_index_card(screen, catalog.info(vehicle_name), button_x + 410, button_y, use_metric)
+    if catalog is not None and catalog.file_entries:
+        catalog_buttons = draw_catalog_controls(screen, page, max(1, -(-total // CATALOG_PAGE_SIZE)), vehicle_class,
+                                                HEIGHT // 2 - 150 + CATALOG_PAGE_SIZE * 60 + 10)
     
     instruction_text = "Please select a vehicle to begin."
     if use_metric:
@@ -96,14 +184,24 @@ def draw_vehicle_menu(screen, font, use_metric):
     version_y = HEIGHT - 30
     draw_text(screen, f"Version: {VERSION}", font, (255, 255, 255), version_x, version_y)
     
-    return vehicle_buttons  # Return the vehicle buttons for event handling
+    return vehicle_buttons, catalog_buttons  # Return the buttons for event handling
 
-def draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric):
+def draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric, results_cache=None, trailer_count=1):
     weight_buttons = {}
     button_height = 60
     button_width = 300
     start_y = HEIGHT // 2 - (len(TRAILER_WEIGHT_OPTIONS) * button_height) // 2
 
+    # Number of trailers (road trains), click to change. The weights below are for each trailer.
+    count_label = dict(TRAILER_COUNT_OPTIONS).get(trailer_count, f"{trailer_count} trailers")
+    count_text = f"Trailers: {trailer_count} ({count_label})"
+    count_button = pygame.Rect(WIDTH // 2 - button_width // 2, start_y - button_height - 10, button_width, button_height - 10)
+    pygame.draw.rect(screen, COLORS['LIGHT_BLUE'], count_button)
+    pygame.draw.rect(screen, COLORS['BLUE'], count_button, 2)
+    count_font = pygame.font.Font(None, 28)
+    draw_text(screen, count_text, count_font, COLORS['BLACK'],
+              count_button.centerx - count_font.size(count_text)[0] // 2, count_button.centery - count_font.size(count_text)[1] // 2)
+
     for index, (weight, label) in enumerate(TRAILER_WEIGHT_OPTIONS):
         if weight != "Custom":
             weight_value = float(weight.split()[0].replace(',', ''))
@@ -127,6 +225,10 @@ def draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric):
         weight_x = button_rect.centerx - weight_font.size(f"({display_weight})")[0] // 2
         weight_y = button_rect.centery + 5
         draw_text(screen, f"({display_weight})", weight_font, COLORS['WHITE'], weight_x, weight_y)  # Draw weight text
+
+        if results_cache is not None and weight != "Custom":
+            # The physics only cares about the total mass, so a road train uses the card for all its trailers together
+            draw_spec_card(screen, results_cache.get("Semi truck", weight_value * trailer_count), button_rect.right + 10, button_rect.y, use_metric)
         
         weight_buttons[weight] = button_rect
 
@@ -146,7 +248,7 @@ def draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric):
     version_y = HEIGHT - 30
     draw_text(screen, f"Version: {VERSION}", font, COLORS['WHITE'], version_x, version_y)
 
-    return weight_buttons, back_button  # Return the weight buttons and back button for event handling
+    return weight_buttons, back_button, count_button  # Return the buttons for event handling
 
 def check_vehicle_click(event, vehicle_buttons):
     if event.type == pygame.MOUSEBUTTONDOWN:
@@ -171,47 +273,74 @@ def check_trailer_click(event, weight_buttons, back_button, screen, font, use_me
                     return str(weight_value)  # Return the selected weight
     return None
 
-def main_menu(screen, font, WIDTH, HEIGHT):
+def trailer_runs(trailer_count):
+    # Semi truck runs (vehicle type, total trailer mass) for every load in the trailer menu
+    return [("Semi truck", float(weight.split()[0].replace(',', '')) * trailer_count)
+            for weight, label in TRAILER_WEIGHT_OPTIONS if weight != "Custom"]
+
+def next_catalog_view(catalog, button, page, vehicle_class):
+    # (page, class) after a click on one of the catalog controls
+    if button == "class":
+        classes = [None] + catalog.vehicle_classes()
+        return 0, classes[(classes.index(vehicle_class) + 1) % len(classes)]
+    page_count = max(1, -(-catalog.query(vehicle_class=vehicle_class, page_size=0)[1] // CATALOG_PAGE_SIZE))
+    step = 1 if button == "next" else -1
+    return (page + step) % page_count, vehicle_class
+
+def main_menu(screen, font, WIDTH, HEIGHT, results_cache=None, catalog=None):
     current_menu = "intro"
     selected_vehicle = None
     use_metric = True
     vehicle_buttons = None
+    catalog_buttons = {}
+    catalog_page = 0
+    catalog_class = None  # None shows every class
     weight_buttons = None
     back_button = None
     start_button = None
+    count_button = None
+    trailer_count = 1
 
     running = True
-    clock = pygame.time.Clock()
-    FPS = 30
+    needs_redraw = True
 
     while running:
-        clock.tick(FPS)
-        screen.fill(COLORS['BLACK'])
-        
-        if current_menu == "intro":
-            start_button = draw_intro_page(screen, font)
-        elif current_menu == "vehicle":
-            vehicle_buttons = draw_vehicle_menu(screen, font, use_metric)    
-            weight_buttons = None
-            back_button = None
-            # Unit conversion button
-            unit_button_x = WIDTH // 2 - 70
-            unit_button_y = HEIGHT // 10
-            unit_button = pygame.Rect(unit_button_x, unit_button_y, 140, 40)
-            pygame.draw.rect(screen, COLORS['LIGHT_BLUE'], unit_button)
-            pygame.draw.rect(screen, COLORS['BLUE'], unit_button, 2)
-            if use_metric:
-                unit_text = "Units: kg"
-            else:
-                unit_text = "Units: lbs"
-            unit_text_x = unit_button.centerx - font.size(unit_text)[0] // 2
-            unit_text_y = unit_button.centery - font.size(unit_text)[1] // 2
-            draw_text(screen, unit_text, font, COLORS['BLACK'], unit_text_x, unit_text_y)
-        elif current_menu == "trailer":
-            vehicle_buttons = None
-            weight_buttons, back_button = draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric)
-
-        for event in pygame.event.get():
+        if needs_redraw:
+            needs_redraw = False
+            screen.fill(COLORS['BLACK'])
+            if current_menu == "intro":
+                start_button = draw_intro_page(screen, font)
+            elif current_menu == "vehicle":
+                vehicle_buttons, catalog_buttons = draw_vehicle_menu(screen, font, use_metric, results_cache, catalog, catalog_page, catalog_class)
+                weight_buttons = None
+                back_button = None
+                # Unit conversion button
+                unit_button_x = WIDTH // 2 - 70
+                unit_button_y = HEIGHT // 10
+                unit_button = pygame.Rect(unit_button_x, unit_button_y, 140, 40)
+                pygame.draw.rect(screen, COLORS['LIGHT_BLUE'], unit_button)
+                pygame.draw.rect(screen, COLORS['BLUE'], unit_button, 2)
+                if use_metric:
+                    unit_text = "Units: kg"
+                else:
+                    unit_text = "Units: lbs"
+                unit_text_x = unit_button.centerx - font.size(unit_text)[0] // 2
+                unit_text_y = unit_button.centery - font.size(unit_text)[1] // 2
+                draw_text(screen, unit_text, font, COLORS['BLACK'], unit_text_x, unit_text_y)
+            elif current_menu == "trailer":
+                vehicle_buttons = None
+                weight_buttons, back_button, count_button = draw_trailer_menu(screen, font, WIDTH, HEIGHT, use_metric, results_cache, trailer_count)
+            pygame.display.flip()
+
+        # Sleep until the user does something, the menu only changes on input
+        events = wait_for_events(IDLE_TIMEOUT_MS)
+        if needs_redraw_for(events):
+            needs_redraw = True
+        # New performance cards from the background simulations
+        if results_cache is not None and results_cache.poll():
+            needs_redraw = True
+
+        for index, event in enumerate(events):
             if event.type == pygame.QUIT:
                 return "quit"
             
@@ -219,9 +348,27 @@ def main_menu(screen, font, WIDTH, HEIGHT):
                 if current_menu == "vehicle":
                     if unit_button.collidepoint(event.pos):
                         use_metric = not use_metric  # Toggle between metric and imperial units
+                        post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                        break
+                    clicked = [key for key, rect in catalog_buttons.items() if rect.collidepoint(event.pos)]
+                    if clicked:
+                        catalog_page, catalog_class = next_catalog_view(catalog, clicked[0], catalog_page, catalog_class)
+                        post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                        break
                 elif current_menu == "intro":
                     if start_button and start_button.collidepoint(event.pos):
                         current_menu = "vehicle"  # Move to vehicle selection menu
+                        post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                        break
+                elif current_menu == "trailer":
+                    if count_button and count_button.collidepoint(event.pos):
+                        counts = [count for count, label in TRAILER_COUNT_OPTIONS]
+                        trailer_count = counts[(counts.index(trailer_count) + 1) % len(counts)]
+                        if results_cache is not None:
+                            # Simulate the performance cards for this many trailers (cached ones are skipped)
+                            results_cache.start_background_fill(trailer_runs(trailer_count))
+                        post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                        break
             
             if current_menu == "vehicle":
                 result = check_vehicle_click(event, vehicle_buttons)
@@ -229,22 +376,26 @@ def main_menu(screen, font, WIDTH, HEIGHT):
                     if result == "Semi truck":
                         selected_vehicle = "Semi truck"
                         current_menu = "trailer"  # Move to trailer selection for semi truck
+                        post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                        break
                     else:
-                        return result, None, use_metric  # Return selected vehicle (not semi truck)
+                        return result, None, use_metric, 1  # Return selected vehicle (not semi truck)
             elif current_menu == "trailer":
                 if weight_buttons is not None and back_button is not None:
                     result = check_trailer_click(event, weight_buttons, back_button, screen, font, use_metric)
                     if result is not None:
                         if result == "back":
                             current_menu = "vehicle"  # Go back to vehicle selection
+                            post_events(events[index + 1:])  # Redraw first, then handle the rest with the new buttons
+                            break
                         elif result == "custom":
                             custom_weight = get_custom_weight(screen, font, use_metric)
                             if custom_weight:
-                                return selected_vehicle, custom_weight, use_metric
+                                return selected_vehicle, custom_weight, use_metric, trailer_count
+                            needs_redraw = True  # The custom weight screen was drawn over the menu
+                            break  # The dialog read the input itself, the events from before it are old
                         else:
-                            return selected_vehicle, result, use_metric  # Return selected vehicle and trailer weight
-        
-        pygame.display.flip()
+                            return selected_vehicle, result, use_metric, trailer_count  # Return selected vehicle, trailer weight and count
 
     return "quit"
 
@@ -252,22 +403,42 @@ def get_custom_weight(screen, font, use_metric):
     input_text = ""
     input_rect = pygame.Rect(WIDTH // 2 - 150, HEIGHT // 2, 250, 40)
     cursor_visible = True
-    cursor_timer = 0
     
     confirm_button = pygame.Rect(WIDTH // 2 - 200, HEIGHT // 2 + 60, 400, 40)
     cancel_button = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 + 110, 200, 40)
 
-    clock = pygame.time.Clock()
-    blink_speed = 0.5  # Cursor blink speed
-    FPS = 30
+    blink_speed = 500  # Cursor blink speed in milliseconds
+    next_blink_time = pygame.time.get_ticks() + blink_speed
 
     warning_text = ""
-    warning_timer = 0
+    warning_end_time = 0
+    needs_redraw = True
 
     while True:
-        clock.tick(FPS)
-        dt = clock.get_time() / 1000.0  # Convert milliseconds to seconds
-        for event in pygame.event.get():
+        # Cursor blink and warning timeout are the only things that change without input
+        current_time = pygame.time.get_ticks()
+        if current_time >= next_blink_time:
+            cursor_visible = not cursor_visible
+            next_blink_time = current_time + blink_speed
+            needs_redraw = True
+        if warning_text and current_time >= warning_end_time:
+            warning_text = ""
+            needs_redraw = True
+
+        if needs_redraw:
+            needs_redraw = False
+            draw_custom_weight_screen(screen, font, use_metric, input_text, input_rect, cursor_visible,
+                                      confirm_button, cancel_button, warning_text)
+
+        # Sleep until the next timer or user input
+        timeout = next_blink_time - current_time
+        if warning_text:
+            timeout = min(timeout, warning_end_time - current_time)
+        events = wait_for_events(timeout)
+        if needs_redraw_for(events):
+            needs_redraw = True
+
+        for event in events:
             if event.type == pygame.QUIT:
                 return None  # Exit the function if user closes the window
             if event.type == pygame.KEYDOWN:
@@ -287,67 +458,63 @@ def get_custom_weight(screen, font, use_metric):
                             return str(weight)  # Return valid weight
                         else:
                             warning_text = "Weight out of range!"
-                            warning_timer = 2  # Set warning message for 2 seconds
+                            warning_end_time = pygame.time.get_ticks() + 2000  # Show warning message for 2 seconds
                     except ValueError:
                         warning_text = "Invalid input!"
-                        warning_timer = 2  # Set warning message for 2 seconds
+                        warning_end_time = pygame.time.get_ticks() + 2000  # Show warning message for 2 seconds
                 elif cancel_button.collidepoint(event.pos):
                     return None  # Cancel input and return to previous menu
 
-        screen.fill(COLORS['BLACK'])  # Clear screen with black color
-        if use_metric:
-            unit = "kg"
-            min_weight = "1,000"
-            max_weight = "100,000"
-        else:
-            unit = "lbs"
-            min_weight = f"{int(kg_to_lbs(1000)):,}"
-            max_weight = f"{int(kg_to_lbs(100000)):,}"
-        prompt_text = f"Enter weight ({min_weight}-{max_weight} {unit}):"
-        prompt_x = WIDTH // 2 - font.size(prompt_text)[0] // 2
-        prompt_y = HEIGHT // 2 - 50
-        draw_text(screen, prompt_text, font, COLORS['WHITE'], prompt_x, prompt_y)
-
-        # Draw input box and text
-        pygame.draw.rect(screen, COLORS['WHITE'], input_rect, 2)
-        if input_text:
-            display_text = f"{int(input_text):,},000"
-        else:
-            display_text = "0,000"
-        txt_surface = font.render(display_text, True, COLORS['WHITE'])
-        text_x = input_rect.right - txt_surface.get_width() - 5
-        screen.blit(txt_surface, (text_x, input_rect.y + 5))
-        
-        # Draw unit outside the box
-        unit_x = input_rect.right + 10
-        unit_y = input_rect.centery - font.size(unit)[1] // 2
-        draw_text(screen, unit, font, COLORS['WHITE'], unit_x, unit_y)
-
-        # Draw cursor
-        cursor_timer += dt
-        if cursor_timer >= blink_speed:
-            cursor_visible = not cursor_visible
-            cursor_timer = 0
-        if cursor_visible:
-            cursor_pos = text_x + txt_surface.get_width()
-            pygame.draw.line(screen, COLORS['WHITE'], (cursor_pos, input_rect.y + 5), (cursor_pos, input_rect.bottom - 5), 2)
-
-        # Draw buttons
-        pygame.draw.rect(screen, COLORS['GREEN'], confirm_button)
-        pygame.draw.rect(screen, COLORS['RED'], cancel_button)
-        draw_text(screen, "Confirm and Start Simulation", font, COLORS['BLACK'], confirm_button.centerx - font.size("Confirm and Start Simulation")[0] // 2, confirm_button.centery - font.size("Confirm and Start Simulation")[1] // 2)
-        draw_text(screen, "Cancel", font, COLORS['BLACK'], cancel_button.centerx - font.size("Cancel")[0] // 2, cancel_button.centery - font.size("Cancel")[1] // 2)
-
-        # Help text
-        help_text = f"Enter weight in {'tonnes' if use_metric else 'thousands of lbs'} (1-100). This affects the vehicle's performance."
-        draw_text(screen, help_text, font, COLORS['LIGHT_GRAY'], WIDTH // 2 - font.size(help_text)[0] // 2, HEIGHT // 2 + 160)
-
-        # Draw warning text
-        if warning_timer > 0:
-            draw_text(screen, warning_text, font, COLORS['RED'], WIDTH // 2 - font.size(warning_text)[0] // 2, HEIGHT // 2 + 200)
-            warning_timer -= dt
-
-        # Draw version number
-        draw_text(screen, f"Version: {VERSION}", font, COLORS['WHITE'], 10, HEIGHT - 30)
-
-        pygame.display.flip()
\ No newline at end of file
+def draw_custom_weight_screen(screen, font, use_metric, input_text, input_rect, cursor_visible, confirm_button, cancel_button, warning_text):
+    screen.fill(COLORS['BLACK'])  # Clear screen with black color
+    if use_metric:
+        unit = "kg"
+        min_weight = "1,000"
+        max_weight = "100,000"
+    else:
+        unit = "lbs"
+        min_weight = f"{int(kg_to_lbs(1000)):,}"
+        max_weight = f"{int(kg_to_lbs(100000)):,}"
+    prompt_text = f"Enter weight ({min_weight}-{max_weight} {unit}):"
+    prompt_x = WIDTH // 2 - font.size(prompt_text)[0] // 2
+    prompt_y = HEIGHT // 2 - 50
+    draw_text(screen, prompt_text, font, COLORS['WHITE'], prompt_x, prompt_y)
+
+    # Draw input box and text
+    pygame.draw.rect(screen, COLORS['WHITE'], input_rect, 2)
+    if input_text:
+        display_text = f"{int(input_text):,},000"
+    else:
+        display_text = "0,000"
+    txt_surface = font.render(display_text, True, COLORS['WHITE'])
+    text_x = input_rect.right - txt_surface.get_width() - 5
+    screen.blit(txt_surface, (text_x, input_rect.y + 5))
+    
+    # Draw unit outside the box
+    unit_x = input_rect.right + 10
+    unit_y = input_rect.centery - font.size(unit)[1] // 2
+    draw_text(screen, unit, font, COLORS['WHITE'], unit_x, unit_y)
+
+    # Draw cursor
+    if cursor_visible:
+        cursor_pos = text_x + txt_surface.get_width()
+        pygame.draw.line(screen, COLORS['WHITE'], (cursor_pos, input_rect.y + 5), (cursor_pos, input_rect.bottom - 5), 2)
+
+    # Draw buttons
+    pygame.draw.rect(screen, COLORS['GREEN'], confirm_button)
+    pygame.draw.rect(screen, COLORS['RED'], cancel_button)
+    draw_text(screen, "Confirm and Start Simulation", font, COLORS['BLACK'], confirm_button.centerx - font.size("Confirm and Start Simulation")[0] // 2, confirm_button.centery - font.size("Confirm and Start Simulation")[1] // 2)
+    draw_text(screen, "Cancel", font, COLORS['BLACK'], cancel_button.centerx - font.size("Cancel")[0] // 2, cancel_button.centery - font.size("Cancel")[1] // 2)
+
+    # Help text
+    help_text = f"Enter weight in {'tonnes' if use_metric else 'thousands of lbs'} (1-100). This affects the vehicle's performance."
+    draw_text(screen, help_text, font, COLORS['LIGHT_GRAY'], WIDTH // 2 - font.size(help_text)[0] // 2, HEIGHT // 2 + 160)
+
+    # Draw warning text
+    if warning_text:
+        draw_text(screen, warning_text, font, COLORS['RED'], WIDTH // 2 - font.size(warning_text)[0] // 2, HEIGHT // 2 + 200)
+
+    # Draw version number
+    draw_text(screen, f"Version: {VERSION}", font, COLORS['WHITE'], 10, HEIGHT - 30)
+
+    pygame.display.flip()
\ No newline at end of file
@@ -0,0 +1,207 @@
+# monte_carlo.py
+# This file answers "how much do the 0-100 time, the top speed and the CO2 change when the real world
+# doesn't match the config?". Trailer loads, tire rolling resistance and drag vary in the field, so instead of
+# one run per vehicle we run thousands, each with parameters drawn from a distribution, and report the
+# mean with its 95% confidence interval and the range 95% of the runs fall in.
+# - Distributions are given per config key (any number in VEHICLE_CONFIGS, and trailer_mass for the semi truck):
+#   ("uniform", low, high) draws the value itself, ("normal", sigma) multiplies the config value by a
+#   normal random factor around 1 (sigma 0.1 means about +-10%).
+# - The samples are split into chunks of CHUNK_SIZE. Every chunk is one Fleet (see fleet.py) and runs in a
+#   pool of worker processes, one chunk per task.
+# - Every chunk gets its own random streams, made from the master seed with NumPy's SeedSequence: one for
+#   drawing its parameters and one for the electric motor RPM drops (see Fleet.step). The chunks don't
+#   depend on the number of workers, on the order they finish in or on the other vehicles in the run, so the
+#   same master seed always gives exactly the same results.
+#
+# Run it from the src folder with:  python monte_carlo.py --samples 10000 --seed 42
+# or with your own distributions:  python monte_carlo.py --vary frontal_area=normal:0.05 --vary trailer_mass=uniform:0:40000
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS, TRAILER_WEIGHT_OPTIONS
+from fleet import Fleet
+
+MONTE_CARLO_SAMPLES = 10000  # runs per vehicle
+MONTE_CARLO_SEED = 1
+CHUNK_SIZE = 1000  # runs per Fleet (and per worker task)
+MONTE_CARLO_DURATION = 180.0  # Same as the headless runs
+MONTE_CARLO_TIME_STEP = 1 / 60
+METRICS = ["zero_to_hundred_time", "top_speed_kmh", "co2_g_per_km"]
+
+# The trailer loads of the menu, from the lightest to the heaviest
+MENU_TRAILER_MASSES = [float(weight.split()[0].replace(',', '')) for weight, _ in TRAILER_WEIGHT_OPTIONS if weight != "Custom"]
+
+DEFAULT_DISTRIBUTIONS = {
+    "trailer_mass": ("uniform", min(MENU_TRAILER_MASSES), max(MENU_TRAILER_MASSES)),  # kg, semi truck only
+    "friction_coefficient": ("normal", 0.10),  # tire pressure, road surface, temperature
+    "air_resistance_coefficient": ("normal", 0.05),  # wind, mirrors, roof racks
+}
+
+
+def draw(distribution, count, rng):
+    # count random values (or factors for "normal") from one distribution
+    kind = distribution[0]
+    if kind == "uniform":
+        return rng.uniform(distribution[1], distribution[2], count)
+    if kind == "normal":
+        return np.maximum(0.01, rng.normal(1.0, distribution[1], count))  # A factor, never zero or negative
+    raise ValueError(f"Unknown distribution {kind!r}, use 'uniform' or 'normal'")
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_distribution_keys(distributions, vehicle_types):
+    # Every key must be trailer_mass or a number in the config of every vehicle, otherwise the study would
+    # silently not vary it. Raises ValueError.
+    for key in distributions:
+        if key == "trailer_mass":
+            continue
+        missing = [vehicle_type for vehicle_type in vehicle_types if not is_number(VEHICLE_CONFIGS[vehicle_type].get(key))]
+        if missing:
+            raise ValueError(f"Can't vary {key!r}: it is not a number in the config of {', '.join(missing)}")
+
+
+def sample_configs(vehicle_type, distributions, count, rng):
+    # count copies of the vehicle config with the parameters drawn from distributions.
+    # Returns (configs, trailer masses).
+    base = VEHICLE_CONFIGS[vehicle_type]
+    pulls_trailer = vehicle_type == "Semi truck"  # Same rule as headless.make_headless_vehicle
+    trailer_masses = [float(TRAILER_CONFIGS["Standard trailer"]["mass"]) if pulls_trailer else None] * count
+    columns = {}
+    for key, distribution in distributions.items():
+        if key == "trailer_mass":
+            if pulls_trailer:
+                values = draw(distribution, count, rng)
+                if distribution[0] == "normal":
+                    values = values * trailer_masses[0]
+                trailer_masses = [float(value) for value in values]
+        elif is_number(base.get(key)):
+            values = draw(distribution, count, rng)
+            columns[key] = values if distribution[0] == "uniform" else values * base[key]
+        else:
+            raise ValueError(f"Can't vary {key!r}: it is not a number in the config of {vehicle_type}")
+    configs = [dict(base, **{key: float(values[sample]) for key, values in columns.items()}) for sample in range(count)]
+    return configs, trailer_masses
+
+
+def run_chunk(vehicle_type, distributions, count, seed, backend, duration, delta_time):
+    # Runs in a worker process. seed is the chunk's SeedSequence, split into the sampling and the RPM drop streams.
+    sample_seed, jitter_seed = seed.spawn(2)
+    configs, trailer_masses = sample_configs(vehicle_type, distributions, count, np.random.default_rng(sample_seed))
+    fleet = Fleet(configs, trailer_masses, names=[vehicle_type] * count, seed=jitter_seed, backend=backend)
+    return fleet.launch(duration, delta_time)
+
+
+def summarize(values):
+    # Mean with its 95% confidence interval, and the range the middle 95% of the runs fall in
+    finite = values[np.isfinite(values)]
+    summary = {"runs": int(len(finite)), "share": len(finite) / len(values) if len(values) else 0.0}
+    if len(finite) == 0:
+        return summary
+    mean = float(finite.mean())
+    half_width = 1.96 * float(finite.std(ddof=1)) / math.sqrt(len(finite)) if len(finite) > 1 else 0.0
+    low, high = np.percentile(finite, [2.5, 97.5])
+    summary.update({"mean": mean, "mean_ci_95": [mean - half_width, mean + half_width],
+                    "std": float(finite.std(ddof=1)) if len(finite) > 1 else 0.0, "range_95": [float(low), float(high)]})
+    return summary
+
+
+def run_monte_carlo(vehicle_types=None, samples=MONTE_CARLO_SAMPLES, seed=MONTE_CARLO_SEED, distributions=None,
+                    backend="numpy", workers=None, duration=MONTE_CARLO_DURATION, delta_time=MONTE_CARLO_TIME_STEP):
+    # Returns {vehicle type: {metric: summary}}
+    vehicle_types = list(VEHICLE_CONFIGS) if vehicle_types is None else vehicle_types
+    distributions = DEFAULT_DISTRIBUTIONS if distributions is None else distributions
+    check_distribution_keys(distributions, vehicle_types)  # Before any worker starts
+    # One seed per vehicle (by its place in VEHICLE_CONFIGS, so it doesn't matter which other vehicles run),
+    # then one per chunk, all from the master seed
+    vehicle_seeds = dict(zip(VEHICLE_CONFIGS, np.random.SeedSequence(seed).spawn(len(VEHICLE_CONFIGS))))
+    tasks = []
+    for vehicle_type in vehicle_types:
+        vehicle_seed = vehicle_seeds[vehicle_type]
+        chunk_counts = [min(CHUNK_SIZE, samples - start) for start in range(0, samples, CHUNK_SIZE)]
+        for count, chunk_seed in zip(chunk_counts, vehicle_seed.spawn(len(chunk_counts))):
+            tasks.append((vehicle_type, distributions, count, chunk_seed, backend, duration, delta_time))
+
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunks = list(pool.map(run_chunk, *zip(*tasks)))
+    else:
+        chunks = [run_chunk(*task) for task in tasks]
+    print(f"Simulated {samples * len(vehicle_types)} runs in {len(tasks)} chunks on {workers} process(es) "
+          f"in {time.perf_counter() - start:.1f} s")
+
+    report = {}
+    for vehicle_type in vehicle_types:
+        results = [chunk for task, chunk in zip(tasks, chunks) if task[0] == vehicle_type]
+        report[vehicle_type] = {metric: summarize(np.concatenate([chunk[metric] for chunk in results])) for metric in METRICS}
+    return report
+
+
+def parse_distribution(text):
+    # "friction_coefficient=normal:0.1" or "trailer_mass=uniform:7000:35000" -> (key, distribution)
+    key, _, spec = text.partition("=")
+    parts = spec.split(":")
+    if not key or parts[0] not in ("uniform", "normal") or len(parts) != (3 if parts[0] == "uniform" else 2):
+        raise argparse.ArgumentTypeError(f"Expected KEY=uniform:LOW:HIGH or KEY=normal:SIGMA, got {text!r}")
+    if key != "trailer_mass" and not any(is_number(config.get(key)) for config in VEHICLE_CONFIGS.values()):
+        raise argparse.ArgumentTypeError(f"{key!r} is not a number in any vehicle config (or trailer_mass)")
+    return key, (parts[0], *[float(part) for part in parts[1:]])
+
+
+def print_report(report, distributions):
+    print("Distributions: " + ", ".join(f"{key} {' '.join(str(part) for part in distribution)}"
+                                        for key, distribution in distributions.items()))
+    names = {"zero_to_hundred_time": ("0-100 km/h", "s"), "top_speed_kmh": ("Top speed", "km/h"), "co2_g_per_km": ("CO2", "g/km")}
+    for vehicle_type, metrics in report.items():
+        print(f"\n{vehicle_type}")
+        for metric, summary in metrics.items():
+            name, unit = names[metric]
+            if "mean" not in summary:
+                print(f"    {name:<11} never reached")
+                continue
+            low, high = summary["mean_ci_95"]
+            range_low, range_high = summary["range_95"]
+            line = (f"    {name:<11} mean {summary['mean']:9.2f} {unit:<5} 95% CI [{low:.2f}, {high:.2f}]"
+                    f"   95% of runs in [{range_low:.2f}, {range_high:.2f}]")
+            if summary["share"] < 1:
+                line += f"   (reached in {summary['share']:.0%} of the runs)"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo runs with uncertain vehicle and trailer parameters")
+    parser.add_argument("--samples", type=int, default=MONTE_CARLO_SAMPLES, help="runs per vehicle")
+    parser.add_argument("--seed", type=int, default=MONTE_CARLO_SEED, help="master seed, the same seed gives the same results")
+    parser.add_argument("--vehicle", action="append", choices=list(VEHICLE_CONFIGS), help="only this vehicle (can be repeated)")
+    parser.add_argument("--vary", action="append", type=parse_distribution, metavar="KEY=DIST",
+                        help="replaces the default distributions, e.g. mass=normal:0.03 (can be repeated)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU core)")
+    parser.add_argument("--backend", default="numpy", help="physics backend (see physics_backends.py)")
+    parser.add_argument("--json", metavar="FILE", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    distributions = dict(args.vary) if args.vary else DEFAULT_DISTRIBUTIONS
+    try:
+        report = run_monte_carlo(args.vehicle, args.samples, args.seed, distributions, args.backend, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print_report(report, distributions)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({"seed": args.seed, "samples": args.samples, "distributions": distributions, "results": report},
+                      json_file, indent=1)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
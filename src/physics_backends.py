@@ -0,0 +1,508 @@
+# physics_backends.py
+# This file holds the per-tick vehicle physics behind one small interface, so we can swap the
+# implementation without touching the rest of the simulator. One tick is:
+# - gear shifting and the post-shift throttle ramp (GearShiftingSystem.handle_gear_shifting)
+# - engine or motor force at the wheels (Vehicle.update_ice / Vehicle.update_electric)
+# - rolling and air resistance (Vehicle.calculate_resistance_force)
+# - the tires: wheel spin and the force they put on the road (tire_step, used by Vehicle.update)
+# - the integration of speed and position (Vehicle.update)
+# The Fleet can also brake (fleet.brake_force, in N). The game never brakes, so there it is always 0;
+# the drive cycle runner (drive_cycle.py) uses it to follow a cycle that slows down.
+# Each backend steps all the vehicles of a Fleet (see fleet.py) in place:
+# - "reference": plain Python, one vehicle at a time. Slow, but easy to read and check against the game.
+# - "numpy": vectorized, every vehicle at once. The default.
+# - "numba": the reference code compiled to machine code by Numba. Only available if numba is installed.
+# The scalar functions at the top (resistance_force, tire_step...) are also used by Vehicle,
+# so the game and the reference backend share the same formulas.
+# conformance.py checks every backend against the reference traces before we trust it.
+#
+# The tire slip model: the driven wheels have their own angular speed. The wheel force of the engine (or the
+# motor, minus the brakes) turns them, and the tires push the vehicle with a force that depends on the slip ratio
+# (how much faster the tread moves than the road). The grip curve over the slip ratio (Pacejka's formula, see
+# TIRE_CONFIGS in vehicle_configs.py) needs sin and atan, so it is evaluated once per tire into a table when a
+# Vehicle or a Fleet is made, together with a stiffness table. A tick is then a few table lookups per vehicle.
+# The wheel is light compared with the tire's stiffness, so its speed is integrated implicitly: the tire force is
+# taken as a straight line from zero slip through the current slip (grip / slip, the stiffness table). That line
+# always points the right way, also when the tire slides past its peak, so the step is stable at the 1/60 s of the
+# game and the 1/20 s of the drive cycles.
+
+import functools
+import importlib.util
+import math
+import numpy as np
+
+# numba is optional, only needed for the "numba" backend. Importing it takes about half a second, so it is only
+# imported when that backend is created (tools like scenarios.py start much faster without it).
+NUMBA_INSTALLED = importlib.util.find_spec("numba") is not None
+
+# Physical constants (vehicle.py uses these too)
+GRAVITY = 9.81  # m/s^2
+AIR_DENSITY = 1.225  # kg/m^3
+TRACTION_COEFFICIENT = 0.8  # Typical value for rubber on dry asphalt (drive_cycle.py's first guess of the force per throttle)
+DRIVETRAIN_EFFICIENCY = 0.9
+MIN_SPEED_FOR_AIR_RESISTANCE = 0.1  # m/s, so air resistance is never zero when the car is not moving
+
+# Gear shifting constants (same values as GearShiftingSystem and Vehicle.update_ice)
+SHIFT_COOLDOWN = 0.4  # seconds between two shifts
+SHIFT_RPM_TOLERANCE = 50  # a shift completes when the revs are this close to the target
+SHIFT_RPM_FALL_RATE = 1000  # RPM fall per second while the clutch is open
+ELECTRIC_JITTER_RPM = 19500  # above this motor RPM a random drop simulates aero drag
+ELECTRIC_JITTER_MAX = 500  # biggest random drop in RPM
+
+# Tire slip tables
+SLIP_TABLE_RANGE = 1.0  # Slip ratios from -1 (locked wheel) to +1 (tread twice as fast as the road)
+SLIP_TABLE_SIZE = 2001  # Points per table, a step of 0.001 in slip ratio
+SLIP_TABLE_SCALE = (SLIP_TABLE_SIZE - 1) / (2 * SLIP_TABLE_RANGE)  # Table positions per unit of slip ratio
+SLIP_MIN_SPEED = 1.0  # m/s, the slip ratio is relative to at least this speed, so it stays finite when standing still
+
+
+@functools.lru_cache(maxsize=None)
+def tire_tables(stiffness_factor, shape_factor, peak_grip, curvature_factor):
+    # (grip, stiffness): the grip (force per newton of load) over the slip ratios of the table, and grip / slip.
+    # Made once per kind of tire, vehicles with the same tires share the arrays.
+    slip = np.linspace(-SLIP_TABLE_RANGE, SLIP_TABLE_RANGE, SLIP_TABLE_SIZE)
+    b = stiffness_factor * slip
+    grip = peak_grip * np.sin(shape_factor * np.arctan(b - curvature_factor * (b - np.arctan(b))))
+    center = SLIP_TABLE_SIZE // 2  # Zero slip, where grip / slip is the slope of the curve: B * C * D
+    off_center = np.arange(SLIP_TABLE_SIZE) != center
+    stiffness = np.empty(SLIP_TABLE_SIZE)
+    stiffness[off_center] = grip[off_center] / slip[off_center]
+    stiffness[center] = stiffness_factor * shape_factor * peak_grip
+    grip.flags.writeable = False
+    stiffness.flags.writeable = False
+    return grip, stiffness
+
+
+def tire_table_key(tire):
+    # tire_tables' arguments for a TIRE_CONFIGS entry
+    return tire['stiffness_factor'], tire['shape_factor'], tire['peak_grip'], tire['curvature_factor']
+
+
+# Scalar building blocks, for one vehicle. Plain Python so Numba can compile them as they are.
+
+def resistance_force(total_mass, friction_coefficient, air_resistance_coefficient, frontal_area, speed):
+    # Rolling resistance (with a small speed dependency) plus air resistance 0.5 * rho * Cd * A * v^2
+    rolling_resistance = total_mass * GRAVITY * (friction_coefficient + speed * 0.0001)
+    air_resistance = 0.5 * AIR_DENSITY * air_resistance_coefficient * frontal_area * (max(speed, MIN_SPEED_FOR_AIR_RESISTANCE) ** 2)
+    return rolling_resistance + air_resistance
+
+
+def tire_step(drive_force, speed, wheel_speed, normal_force, wheel_radius, wheel_inertia, grip_table, stiffness_table, delta_time):
+    # One tick of the driven wheels. drive_force is the wheel force of the engine minus the brakes (N),
+    # wheel_speed the wheels' angular speed (rad/s), normal_force the load on the driven wheels (N).
+    # Returns (force of the tires on the road, new wheel speed, slip ratio).
+    reference_speed = max(speed, SLIP_MIN_SPEED)
+    slip = (wheel_speed * wheel_radius - speed) / reference_speed
+    # Linear interpolation in the tables, slip ratios outside them get their first or last value
+    position = (min(max(slip, -SLIP_TABLE_RANGE), SLIP_TABLE_RANGE) + SLIP_TABLE_RANGE) * SLIP_TABLE_SCALE
+    index = min(int(position), SLIP_TABLE_SIZE - 2)
+    fraction = position - index
+    force = normal_force * (grip_table[index] + (grip_table[index + 1] - grip_table[index]) * fraction)
+    stiffness_here = stiffness_table[index] + (stiffness_table[index + 1] - stiffness_table[index]) * fraction
+    stiffness = normal_force * stiffness_here * wheel_radius / reference_speed  # N per rad/s of wheel speed
+    # I * dw/dt = (drive_force - tire force) * r, with the tire force at the end of the tick
+    change = delta_time * (drive_force - force) * wheel_radius / (wheel_inertia + delta_time * wheel_radius * stiffness)
+    # The wheels never turn backwards, and never spin past the table (a rev limiter takes the extra torque)
+    new_wheel_speed = min(max(0.0, wheel_speed + change), (speed + SLIP_TABLE_RANGE * reference_speed) / wheel_radius)
+    # The force is read from the grip curve at the new slip, so it never goes over the peak even when the
+    # straight line overshoots it (the wheel broke loose or gripped again during the tick)
+    slip = (new_wheel_speed * wheel_radius - speed) / reference_speed
+    position = (min(max(slip, -SLIP_TABLE_RANGE), SLIP_TABLE_RANGE) + SLIP_TABLE_RANGE) * SLIP_TABLE_SCALE
+    index = min(int(position), SLIP_TABLE_SIZE - 2)
+    force = normal_force * (grip_table[index] + (grip_table[index + 1] - grip_table[index]) * (position - index))
+    return force, new_wheel_speed, slip
+
+
+def integrate_speed(speed, net_force, total_mass, delta_time):
+    # F = ma, then one explicit Euler step. Returns (acceleration, new speed); speed never goes negative.
+    acceleration = net_force / total_mass
+    return acceleration, max(0.0, speed + acceleration * delta_time)
+
+
+def ice_wheel_force(engine_torque, engine_power, throttle, total_gear_ratio, wheel_circumference, speed):
+    # Engine torque through the gearbox and final drive, limited by the engine power (power is in kW)
+    wheel_torque = engine_torque * throttle * total_gear_ratio * DRIVETRAIN_EFFICIENCY
+    wheel_radius = wheel_circumference / (2 * math.pi)
+    max_force = (engine_power * 1000) / max(speed, 0.1)
+    return min(wheel_torque / wheel_radius, max_force)
+
+
+def electric_motor_force(motor_torque, motor_power, gear_ratio, wheel_circumference, speed, throttle):
+    # Torque-based force at low speed, power-based force above 1 m/s (power is in kW)
+    if speed < 1:
+        force = (motor_torque * gear_ratio) / (wheel_circumference / 2)
+    else:
+        force = (motor_power * 1000) / max(speed, 0.1)
+    return force * throttle
+
+
+def interpolate_row(x, curve_x, curve_y, row):
+    # Vehicle.estimate_engine_output for one row of the padded curve arrays (see fleet.curve_arrays)
+    last = curve_x.shape[1] - 1
+    if x <= curve_x[row, 0]:
+        return curve_y[row, 0]
+    if x >= curve_x[row, last]:
+        return curve_y[row, last]
+    upper = 1
+    while curve_x[row, upper] <= x:
+        upper += 1
+    x0 = curve_x[row, upper - 1]
+    y0 = curve_y[row, upper - 1]
+    return y0 + (curve_y[row, upper] - y0) * (x - x0) / (curve_x[row, upper] - x0)
+
+
+def ramp_throttle(throttle, ramping, ramp_time, duration, delta_time):
+    # Vehicle.update_throttle_ramp: after a shift the throttle goes back up to 1 over the post-shift duration.
+    # Returns the new (throttle, ramping, ramp_time).
+    if not ramping:
+        return throttle, ramping, ramp_time
+    throttle = min(1.0, throttle + (1 / duration) * delta_time)
+    ramp_time += delta_time
+    if ramp_time >= duration:
+        return throttle, False, 0.0
+    return throttle, True, ramp_time
+
+
+def find_optimal_gear_row(wheel_rpm, current_gear, gear_count, gear_ratios, row, final_drive_ratio,
+                          shift_up_rpm, shift_down_rpm, shifting_up):
+    # GearShiftingSystem.find_optimal_gear: the first gear (going up or down) that lands in a good RPM range
+    if shifting_up:
+        for gear in range(current_gear + 1, gear_count + 1):
+            if wheel_rpm * gear_ratios[row, gear - 1] * final_drive_ratio < shift_up_rpm - 500:
+                return gear
+    else:
+        for gear in range(current_gear - 1, 0, -1):
+            if wheel_rpm * gear_ratios[row, gear - 1] * final_drive_ratio > shift_down_rpm + 500:
+                return gear
+    return current_gear
+
+
+# Fleet arrays used by the row-by-row backends, in the order step_rows takes them
+ROW_ARRAYS = (
+    "is_electric", "total_mass", "max_rpm", "wheel_circumference", "friction_coefficient",
+    "air_resistance_coefficient", "frontal_area", "torque_x", "torque_y", "power_x", "power_y",
+    "gear_count", "gear_ratios", "final_drive_ratio", "idle_rpm", "shift_up_rpm", "shift_down_rpm",
+    "rev_drop_rate", "post_shift_duration", "brake_force",
+    "normal_force", "wheel_radius", "wheel_inertia", "tire_index", "grip_table", "stiffness_table",
+    "speed", "position", "acceleration", "wheel_force", "resistance_force", "current_rpm", "throttle",
+    "current_gear", "shifting", "next_gear", "shift_target_rpm", "last_shift_time",
+    "post_shift_adjustment", "post_shift_adjustment_time", "wheel_speed", "slip_ratio",
+)
+
+
+def build_row_stepper(jit):
+    # Builds step_rows from the scalar functions above. With jit=None it is plain Python (the reference
+    # backend); with jit=numba.njit the same code is compiled (the numba backend).
+    if jit is None:
+        jit = lambda function: function
+    interpolate = jit(interpolate_row)
+    resistance = jit(resistance_force)
+    tires = jit(tire_step)
+    integrate = jit(integrate_speed)
+    ice_force = jit(ice_wheel_force)
+    motor_force = jit(electric_motor_force)
+    ramp = jit(ramp_throttle)
+    optimal_gear = jit(find_optimal_gear_row)
+
+    def step_rows(is_electric, total_mass, max_rpm, wheel_circumference, friction_coefficient,
+                  air_resistance_coefficient, frontal_area, torque_x, torque_y, power_x, power_y,
+                  gear_count, gear_ratios, final_drive_ratio, idle_rpm, shift_up_rpm, shift_down_rpm,
+                  rev_drop_rate, post_shift_duration, brake_force,
+                  normal_force, wheel_radius, wheel_inertia, tire_index, grip_table, stiffness_table,
+                  speed, position, acceleration, wheel_force, resistance_force, current_rpm, throttle,
+                  current_gear, shifting, next_gear, shift_target_rpm, last_shift_time,
+                  post_shift_adjustment, post_shift_adjustment_time, wheel_speed, slip_ratio,
+                  current_time, delta_time, jitter):
+        for row in range(len(speed)):
+            wheel_rps = speed[row] / wheel_circumference[row]
+            if is_electric[row]:
+                # Vehicle.calculate_motor_force and Vehicle.update_electric
+                gear_ratio = gear_ratios[row, 0]
+                rpm = wheel_rps * gear_ratio * 60
+                torque = interpolate(rpm, torque_x, torque_y, row)
+                power = interpolate(rpm, power_x, power_y, row)
+                force = motor_force(torque, power, gear_ratio, wheel_circumference[row], speed[row], throttle[row])
+                rpm = min(rpm, max_rpm[row])
+                if rpm >= ELECTRIC_JITTER_RPM:
+                    rpm -= jitter[row]
+                current_rpm[row] = rpm
+            else:
+                # GearShiftingSystem.handle_gear_shifting
+                throttle[row], post_shift_adjustment[row], post_shift_adjustment_time[row] = ramp(
+                    throttle[row], post_shift_adjustment[row], post_shift_adjustment_time[row], post_shift_duration[row], delta_time)
+                if shifting[row]:
+                    current_rpm[row] = max(shift_target_rpm[row], current_rpm[row] - rev_drop_rate[row] * delta_time)
+                    if abs(shift_target_rpm[row] - current_rpm[row]) <= SHIFT_RPM_TOLERANCE:
+                        # GearShiftingSystem.complete_gear_shift
+                        current_gear[row] = next_gear[row]
+                        current_rpm[row] = wheel_rps * gear_ratios[row, current_gear[row] - 1] * final_drive_ratio[row] * 60
+                        shifting[row] = False
+                        last_shift_time[row] = current_time
+                        throttle[row] = 0.1
+                        post_shift_adjustment[row] = True
+                        post_shift_adjustment_time[row] = 0.0
+                elif current_time - last_shift_time[row] >= SHIFT_COOLDOWN:
+                    shifting_up = current_rpm[row] > shift_up_rpm[row]
+                    shifting_down = current_rpm[row] < shift_down_rpm[row]
+                    if shifting_up or shifting_down:
+                        target_gear = optimal_gear(wheel_rps * 60, current_gear[row], gear_count[row], gear_ratios, row,
+                                                   final_drive_ratio[row], shift_up_rpm[row], shift_down_rpm[row], shifting_up)
+                        if target_gear != current_gear[row]:
+                            # GearShiftingSystem.start_shift_up / start_shift_down with calculate_target_rpm
+                            target_rpm = wheel_rps * gear_ratios[row, target_gear - 1] * final_drive_ratio[row] * 60
+                            shifting[row] = True
+                            next_gear[row] = target_gear
+                            shift_target_rpm[row] = max(idle_rpm[row], min(target_rpm, max_rpm[row]))
+
+                # Vehicle.update_ice (which ramps the throttle a second time)
+                throttle[row], post_shift_adjustment[row], post_shift_adjustment_time[row] = ramp(
+                    throttle[row], post_shift_adjustment[row], post_shift_adjustment_time[row], post_shift_duration[row], delta_time)
+                total_gear_ratio = gear_ratios[row, current_gear[row] - 1] * final_drive_ratio[row]
+                if shifting[row]:
+                    current_rpm[row] = max(idle_rpm[row], current_rpm[row] - SHIFT_RPM_FALL_RATE * delta_time)
+                    torque = 0.0
+                    power = 0.0
+                else:
+                    target_rpm = wheel_rps * gear_ratios[row, current_gear[row] - 1] * final_drive_ratio[row] * 60
+                    rpm = current_rpm[row] + (target_rpm - current_rpm[row]) * 0.8
+                    current_rpm[row] = max(idle_rpm[row], min(rpm, max_rpm[row]))
+                    torque = interpolate(current_rpm[row], torque_x, torque_y, row)
+                    power = interpolate(current_rpm[row], power_x, power_y, row)
+                force = ice_force(torque, power, throttle[row], total_gear_ratio, wheel_circumference[row], speed[row])
+
+            # Vehicle.update: resistance, tires, integration
+            resistance_force[row] = resistance(total_mass[row], friction_coefficient[row], air_resistance_coefficient[row],
+                                               frontal_area[row], speed[row])
+            tire = tire_index[row]
+            tire_force, wheel_speed[row], slip_ratio[row] = tires(
+                force - brake_force[row], speed[row], wheel_speed[row], normal_force[row], wheel_radius[row],
+                wheel_inertia[row], grip_table[tire], stiffness_table[tire], delta_time)
+            net_force = tire_force - resistance_force[row]
+            acceleration[row], speed[row] = integrate(speed[row], net_force, total_mass[row], delta_time)
+            wheel_force[row] = force
+            position[row] += speed[row] * delta_time
+
+    return jit(step_rows)
+
+
+class PhysicsBackend:
+    # Base class. A backend advances every vehicle of the fleet by one tick, writing into the fleet arrays.
+    # jitter holds one random RPM drop per vehicle for the electric motors (drawn by the Fleet, so every
+    # backend uses the same random numbers).
+    name = None
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def step(self, fleet, delta_time, jitter):
+        raise NotImplementedError
+
+
+class ReferenceBackend(PhysicsBackend):
+    name = "reference"
+
+    def __init__(self):
+        self.step_rows = build_row_stepper(None)
+
+    def step(self, fleet, delta_time, jitter):
+        self.step_rows(*[getattr(fleet, name) for name in ROW_ARRAYS], fleet.time_elapsed, delta_time, jitter)
+
+
+class NumbaBackend(ReferenceBackend):
+    name = "numba"
+    compiled_step_rows = None  # Compiled once per process, the first time the backend is created
+
+    @classmethod
+    def is_available(cls):
+        return NUMBA_INSTALLED
+
+    def __init__(self):
+        if NumbaBackend.compiled_step_rows is None:
+            import numba
+            NumbaBackend.compiled_step_rows = build_row_stepper(numba.njit)
+        self.step_rows = NumbaBackend.compiled_step_rows
+
+
+def interpolate_curves(x, curve_x, curve_y):
+    # Vectorized version of Vehicle.estimate_engine_output: linear interpolation, one curve per vehicle
+    rows = np.arange(len(x))
+    upper = np.clip((curve_x <= x[:, None]).sum(axis=1), 1, curve_x.shape[1] - 1)
+    x0 = curve_x[rows, upper - 1]
+    x1 = curve_x[rows, upper]
+    y0 = curve_y[rows, upper - 1]
+    y1 = curve_y[rows, upper]
+    span = np.where(x1 > x0, x1 - x0, 1.0)
+    value = y0 + (y1 - y0) * (x - x0) / span
+    value = np.where(x <= curve_x[:, 0], curve_y[:, 0], value)
+    return np.where(x >= curve_x[rows, -1], curve_y[rows, -1], value)
+
+
+class NumpyBackend(PhysicsBackend):
+    # Same steps as step_rows, but each one is done for the whole fleet with array operations
+    name = "numpy"
+
+    def step(self, fleet, delta_time, jitter):
+        ice_force = self.update_ice(fleet, delta_time) if not fleet.is_electric.all() else 0.0
+        electric_force = self.update_electric(fleet, jitter) if fleet.is_electric.any() else 0.0
+        fleet.wheel_force[:] = np.where(fleet.is_electric, electric_force, ice_force)
+
+        fleet.resistance_force[:] = self.calculate_resistance_force(fleet)
+        net_force = self.tire_step(fleet, fleet.wheel_force - fleet.brake_force, delta_time) - fleet.resistance_force
+        fleet.acceleration[:] = net_force / fleet.total_mass
+        fleet.speed[:] = np.maximum(0.0, fleet.speed + fleet.acceleration * delta_time)
+        fleet.position += fleet.speed * delta_time
+
+    def update_throttle_ramp(self, fleet, delta_time):
+        ramping = fleet.post_shift_adjustment
+        ramped = np.minimum(1.0, fleet.throttle + (1 / fleet.post_shift_duration) * delta_time)
+        fleet.throttle[:] = np.where(ramping, ramped, fleet.throttle)
+        fleet.post_shift_adjustment_time[:] = np.where(ramping, fleet.post_shift_adjustment_time + delta_time,
+                                                       fleet.post_shift_adjustment_time)
+        finished = ramping & (fleet.post_shift_adjustment_time >= fleet.post_shift_duration)
+        fleet.post_shift_adjustment &= ~finished
+        fleet.post_shift_adjustment_time[finished] = 0.0
+
+    def handle_gear_shifting(self, fleet, delta_time):
+        ice = ~fleet.is_electric
+        current_time = fleet.time_elapsed
+        self.update_throttle_ramp(fleet, delta_time)
+        was_shifting = ice & fleet.shifting
+        wheel_rps = fleet.speed / fleet.wheel_circumference
+
+        # Shifting: let the revs fall to the target RPM, then complete the shift
+        falling_rpm = np.maximum(fleet.shift_target_rpm, fleet.current_rpm - fleet.rev_drop_rate * delta_time)
+        fleet.current_rpm[:] = np.where(was_shifting, falling_rpm, fleet.current_rpm)
+        complete = was_shifting & (np.abs(fleet.shift_target_rpm - fleet.current_rpm) <= SHIFT_RPM_TOLERANCE)
+        if complete.any():
+            fleet.current_gear[:] = np.where(complete, fleet.next_gear, fleet.current_gear)
+            new_rpm = wheel_rps * fleet.gear_ratio(fleet.current_gear) * fleet.final_drive_ratio * 60
+            fleet.current_rpm[:] = np.where(complete, new_rpm, fleet.current_rpm)
+            fleet.shifting &= ~complete
+            fleet.last_shift_time[complete] = current_time
+            fleet.throttle[complete] = 0.1
+            fleet.post_shift_adjustment |= complete
+            fleet.post_shift_adjustment_time[complete] = 0.0
+
+        # Not shifting: check if we should start a shift (after the cooldown)
+        can_shift = ice & ~was_shifting & (current_time - fleet.last_shift_time >= SHIFT_COOLDOWN)
+        shifting_up = can_shift & (fleet.current_rpm > fleet.shift_up_rpm)
+        shifting_down = can_shift & ~shifting_up & (fleet.current_rpm < fleet.shift_down_rpm)
+        if not (shifting_up.any() or shifting_down.any()):
+            return
+        target_gear = self.find_optimal_gear(fleet, shifting_up, shifting_down)
+        start = (shifting_up | shifting_down) & (target_gear != fleet.current_gear)
+        if start.any():
+            target_rpm = wheel_rps * fleet.gear_ratio(target_gear) * fleet.final_drive_ratio * 60
+            target_rpm = np.maximum(fleet.idle_rpm, np.minimum(target_rpm, fleet.max_rpm))
+            fleet.shifting |= start
+            fleet.next_gear[:] = np.where(start, target_gear, fleet.next_gear)
+            fleet.shift_target_rpm[:] = np.where(start, target_rpm, fleet.shift_target_rpm)
+
+    def find_optimal_gear(self, fleet, shifting_up, shifting_down):
+        wheel_rpm = (fleet.speed / fleet.wheel_circumference) * 60
+        gear_rpm = wheel_rpm[:, None] * fleet.gear_ratios * fleet.final_drive_ratio[:, None]
+        gear_numbers = np.arange(1, fleet.gear_ratios.shape[1] + 1)[None, :]
+        existing_gear = gear_numbers <= fleet.gear_count[:, None]
+        current = fleet.current_gear[:, None]
+
+        up_ok = existing_gear & (gear_numbers > current) & (gear_rpm < (fleet.shift_up_rpm - 500)[:, None])
+        first_up = np.argmax(up_ok, axis=1) + 1
+        up_gear = np.where(up_ok.any(axis=1), first_up, fleet.current_gear)
+
+        down_ok = existing_gear & (gear_numbers < current) & (gear_rpm > (fleet.shift_down_rpm + 500)[:, None])
+        last_down = down_ok.shape[1] - np.argmax(down_ok[:, ::-1], axis=1)  # Highest suitable gear below the current one
+        down_gear = np.where(down_ok.any(axis=1), last_down, fleet.current_gear)
+
+        return np.where(shifting_up, up_gear, np.where(shifting_down, down_gear, fleet.current_gear))
+
+    def update_ice(self, fleet, delta_time):
+        ice = ~fleet.is_electric
+        self.handle_gear_shifting(fleet, delta_time)
+        self.update_throttle_ramp(fleet, delta_time)  # Vehicle.update_ice ramps the throttle a second time
+
+        total_gear_ratio = fleet.gear_ratio(fleet.current_gear) * fleet.final_drive_ratio
+        target_rpm = fleet.speed / fleet.wheel_circumference * fleet.gear_ratio(fleet.current_gear) * fleet.final_drive_ratio * 60
+        clutch_open = fleet.shifting
+        falling_rpm = np.maximum(fleet.idle_rpm, fleet.current_rpm - SHIFT_RPM_FALL_RATE * delta_time)
+        following_rpm = np.maximum(fleet.idle_rpm, np.minimum(fleet.current_rpm + (target_rpm - fleet.current_rpm) * 0.8, fleet.max_rpm))
+        fleet.current_rpm[:] = np.where(ice, np.where(clutch_open, falling_rpm, following_rpm), fleet.current_rpm)
+
+        engine_torque = np.where(clutch_open, 0.0, interpolate_curves(fleet.current_rpm, fleet.torque_x, fleet.torque_y))
+        engine_power = np.where(clutch_open, 0.0, interpolate_curves(fleet.current_rpm, fleet.power_x, fleet.power_y))
+        wheel_torque = engine_torque * fleet.throttle * total_gear_ratio * DRIVETRAIN_EFFICIENCY
+        wheel_force = wheel_torque / (fleet.wheel_circumference / (2 * math.pi))
+        max_force = (engine_power * 1000) / np.maximum(fleet.speed, 0.1)
+        return np.minimum(wheel_force, max_force)
+
+    def update_electric(self, fleet, jitter):
+        gear_ratio = fleet.gear_ratios[:, 0]
+        motor_rpm = fleet.speed / fleet.wheel_circumference * gear_ratio * 60
+        torque = interpolate_curves(motor_rpm, fleet.torque_x, fleet.torque_y)
+        power = interpolate_curves(motor_rpm, fleet.power_x, fleet.power_y)
+        low_speed_force = (torque * gear_ratio) / (fleet.wheel_circumference / 2)
+        high_speed_force = (power * 1000) / np.maximum(fleet.speed, 0.1)
+        force = np.where(fleet.speed < 1, low_speed_force, high_speed_force) * fleet.throttle
+
+        motor_rpm = np.minimum(motor_rpm, fleet.max_rpm)
+        motor_rpm = np.where(motor_rpm >= ELECTRIC_JITTER_RPM, motor_rpm - jitter, motor_rpm)
+        fleet.current_rpm[:] = np.where(fleet.is_electric, motor_rpm, fleet.current_rpm)
+        return force
+
+    def tire_step(self, fleet, drive_force, delta_time):
+        # tire_step for the whole fleet. Returns the tire forces and updates the wheel speeds and slip ratios.
+        radius = fleet.wheel_radius
+        reference_speed = np.maximum(fleet.speed, SLIP_MIN_SPEED)
+        slip = (fleet.wheel_speed * radius - fleet.speed) / reference_speed
+        # The tables are read as flat arrays (row * SLIP_TABLE_SIZE + position), np.take is the fastest gather
+        grip, table, first = fleet.grip_table.ravel(), fleet.stiffness_table.ravel(), fleet.tire_index * SLIP_TABLE_SIZE
+        position = (np.clip(slip, -SLIP_TABLE_RANGE, SLIP_TABLE_RANGE) + SLIP_TABLE_RANGE) * SLIP_TABLE_SCALE
+        index = np.minimum(position.astype(int), SLIP_TABLE_SIZE - 2)
+        fraction = position - index
+        low = np.take(grip, first + index)
+        force = fleet.normal_force * (low + (np.take(grip, first + index + 1) - low) * fraction)
+        low = np.take(table, first + index)
+        stiffness = fleet.normal_force * (low + (np.take(table, first + index + 1) - low) * fraction) * radius / reference_speed
+        change = delta_time * (drive_force - force) * radius / (fleet.wheel_inertia + delta_time * radius * stiffness)
+        new_wheel_speed = np.minimum(np.maximum(0.0, fleet.wheel_speed + change),
+                                     (fleet.speed + SLIP_TABLE_RANGE * reference_speed) / radius)
+        slip = (new_wheel_speed * radius - fleet.speed) / reference_speed
+        position = (np.clip(slip, -SLIP_TABLE_RANGE, SLIP_TABLE_RANGE) + SLIP_TABLE_RANGE) * SLIP_TABLE_SCALE
+        index = first + np.minimum(position.astype(int), SLIP_TABLE_SIZE - 2)
+        fleet.wheel_speed[:] = new_wheel_speed
+        fleet.slip_ratio[:] = slip
+        low = np.take(grip, index)
+        return fleet.normal_force * (low + (np.take(grip, index + 1) - low) * (position - (index - first)))
+
+    def calculate_resistance_force(self, fleet):
+        rolling_resistance = fleet.total_mass * GRAVITY * (fleet.friction_coefficient + fleet.speed * 0.0001)
+        air_resistance = 0.5 * AIR_DENSITY * fleet.air_resistance_coefficient * fleet.frontal_area * np.maximum(fleet.speed, MIN_SPEED_FOR_AIR_RESISTANCE) ** 2
+        return rolling_resistance + air_resistance
+
+
+BACKENDS = {}  # name -> backend class
+
+
+def register_backend(backend_class):
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+for backend_class in (ReferenceBackend, NumpyBackend, NumbaBackend):
+    register_backend(backend_class)
+
+
+def available_backends():
+    # Names of the backends that can run on this machine
+    return [name for name, backend_class in BACKENDS.items() if backend_class.is_available()]
+
+
+def get_backend(backend):
+    # Accepts a backend name or an already created backend
+    if isinstance(backend, PhysicsBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown physics backend {backend!r}. Choose from: {', '.join(BACKENDS)}")
+    if not BACKENDS[backend].is_available():
+        raise ValueError(f"The {backend!r} physics backend is not available on this machine (is numba installed?)")
+    return BACKENDS[backend]()
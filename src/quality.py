@@ -0,0 +1,107 @@
+# quality.py
+# This file defines the QualityGovernor, which keeps the simulation running smoothly on slow machines.
+# It watches how long each frame takes to render and steps the render quality down when we go over
+# the frame budget, then steps it back up once there is enough headroom again.
+# The quality knobs are:
+# - tree_count: how many trees the Background draws
+# - arc_points: how many points get_arc_points uses for the RPM gauge arcs
+# - smooth_wheels: smoothscale (nicer) or scale (faster) for the wheel sprites
+# - render_scale: internal resolution of the scenery layer, upscaled to the window at the end
+# - full_detail_radius and min_sprite_length: levels of detail when many vehicles are drawn (level_of_detail.py):
+#   vehicles up to full_detail_radius pixels from the followed one get turning wheels, and vehicles shorter on
+#   screen than min_sprite_length pixels are drawn as flat rectangles
+# To avoid flickering between two levels (oscillation) the governor uses a smoothed frame time,
+# different thresholds for going down and going up (hysteresis) and a hold time after every change.
+
+# Quality levels from best to worst. The governor starts at the first one.
+QUALITY_LEVELS = [
+    {"name": "High", "tree_count": 50, "arc_points": 50, "smooth_wheels": True, "render_scale": 1.0,
+     "full_detail_radius": 400, "min_sprite_length": 8},
+    {"name": "Medium", "tree_count": 30, "arc_points": 30, "smooth_wheels": True, "render_scale": 1.0,
+     "full_detail_radius": 200, "min_sprite_length": 12},
+    {"name": "Low", "tree_count": 15, "arc_points": 20, "smooth_wheels": False, "render_scale": 0.75,
+     "full_detail_radius": 60, "min_sprite_length": 20},
+    {"name": "Lowest", "tree_count": 5, "arc_points": 12, "smooth_wheels": False, "render_scale": 0.5,
+     "full_detail_radius": 0, "min_sprite_length": 32},
+]
+
+
+class QualityGovernor:
+    def __init__(self, target_fps=60, levels=None):
+        self.levels = levels if levels is not None else QUALITY_LEVELS
+        self.frame_budget = 1.0 / target_fps  # seconds we are allowed to spend on one frame
+        self.level_index = 0
+        self.smoothed_frame_time = None
+        self.smoothing_factor = 0.1  # Exponential moving average, so a single slow frame doesn't trigger a change
+
+        # Hysteresis: we step down when we are clearly over budget, but only step up when we are well under it
+        self.step_down_threshold = 1.10  # 110% of the budget
+        self.step_up_threshold = 0.70  # 70% of the budget
+        self.frames_needed_to_step_down = 30  # about half a second at 60 FPS
+        self.frames_needed_to_step_up = 120  # about two seconds at 60 FPS
+        self.hold_frames_after_change = 60  # wait for the new level to settle before judging it
+
+        self.frames_over_budget = 0
+        self.frames_under_budget = 0
+        self.hold_frames = 0
+        # If stepping up makes us step straight back down, we wait longer before trying again
+        self.step_up_backoff = 1
+        self.frames_since_step_up = None
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def record_frame(self, frame_time):
+        # frame_time is the time spent updating and drawing (without the clock's sleep), in seconds.
+        # Returns True if the quality level changed, so the caller knows to apply it.
+        if self.smoothed_frame_time is None:
+            self.smoothed_frame_time = frame_time
+        else:
+            self.smoothed_frame_time += (frame_time - self.smoothed_frame_time) * self.smoothing_factor
+
+        if self.frames_since_step_up is not None:
+            self.frames_since_step_up += 1
+
+        if self.hold_frames > 0:
+            self.hold_frames -= 1
+            return False
+
+        if self.smoothed_frame_time > self.frame_budget * self.step_down_threshold:
+            self.frames_over_budget += 1
+            self.frames_under_budget = 0
+        elif self.smoothed_frame_time < self.frame_budget * self.step_up_threshold:
+            self.frames_under_budget += 1
+            self.frames_over_budget = 0
+        else:
+            # Inside the comfort band, nothing to do
+            self.frames_over_budget = 0
+            self.frames_under_budget = 0
+
+        if self.frames_over_budget >= self.frames_needed_to_step_down and self.level_index < len(self.levels) - 1:
+            # Stepping down right after a step up means the higher level was too expensive
+            if self.frames_since_step_up is not None and self.frames_since_step_up < self.frames_needed_to_step_up * 2:
+                self.step_up_backoff = min(self.step_up_backoff * 2, 16)
+            return self.change_level(self.level_index + 1)
+
+        if self.frames_under_budget >= self.frames_needed_to_step_up * self.step_up_backoff and self.level_index > 0:
+            self.frames_since_step_up = 0
+            return self.change_level(self.level_index - 1)
+
+        return False
+
+    def change_level(self, new_index):
+        old_name = self.level["name"]
+        self.level_index = new_index
+        self.frames_over_budget = 0
+        self.frames_under_budget = 0
+        self.hold_frames = self.hold_frames_after_change
+        print(f"Render quality changed from {old_name} to {self.level['name']} (frame time {self.smoothed_frame_time * 1000:.1f} ms, budget {self.frame_budget * 1000:.1f} ms)")
+        return True
+
+    def apply_to_background(self, background):
+        background.set_tree_count(self.level["tree_count"])
+        background.set_render_scale(self.level["render_scale"])
+
+    def get_hud_text(self):
+        return f"Quality: {self.level['name']}"
@@ -0,0 +1,271 @@
+# replay.py
+# This file records runs and renders them to videos later, many at once, without a window.
+# - record: a full-throttle launch like the game's (one physics step per frame at 60 FPS, until the vehicle drives
+#   off the screen), run headless. Everything the screen shows is stored per frame (speed, RPM, gear, position,
+#   wheel angles, totals, per-gear stats) together with the vehicle config, in a compressed .npz file.
+# - render: draws the stored frames with the game's own Background, Vehicle.draw and draw_screen on the SDL dummy
+#   driver (no window, no physics) and writes them with frame_capture.py (PNG frames or raw video).
+# The frames are rendered in a pool of worker processes. Every worker loads the pictures once and keeps its
+# vehicles between jobs (only the stored state changes from frame to frame). PNG replays are cut into segments of
+# RENDER_SEGMENT_FRAMES frames, so even one long replay spreads over all the cores: a worker that starts in the
+# middle moves the scenery forward without drawing it, which is only a few additions per frame.
+# Each job is independent and the workers share nothing, so adding cores adds throughput almost linearly.
+#
+# Run it from the src folder with:  python replay.py record                  (every vehicle and menu trailer load)
+#                                   python replay.py render ../replays/*.npz --workers 8
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLAY_FOLDER = os.path.join(PROJECT_FOLDER, "replays")
+RENDER_FOLDER = os.path.join(PROJECT_FOLDER, "renders")
+REPLAY_FPS = 60  # One physics step per frame, like the game without time warp
+REPLAY_MAX_DURATION = 180.0  # seconds, a loaded truck may need long to leave the screen
+RENDER_SEGMENT_FRAMES = 600  # PNG frames per job (10 seconds of video)
+SCENERY_SEED = 1  # Trees and clouds are placed randomly, the same seed gives the same scenery in every worker
+FRAME_CHANNELS = ["time", "speed", "current_rpm", "current_gear", "throttle", "distance_traveled", "co2_emissions",
+                  "position_x", "wheel_rotation", "trailer_wheel_rotation", "acceleration_timer", "zero_to_hundred_time"]
+
+
+def replay_name(vehicle_type, trailer_mass=None, trailer_count=1):
+    name = vehicle_type.lower().replace(" ", "_")
+    if trailer_mass is not None:
+        name += f"_{trailer_count}x{trailer_mass:.0f}kg"
+    return name
+
+
+def record_run(vehicle_type, trailer_mass=None, trailer_count=1, max_duration=REPLAY_MAX_DURATION, width=None):
+    # Runs the launch headless and returns (frames, meta): frames is {channel: array}, one value per frame
+    import contextlib
+    import io
+    from headless import make_headless_vehicle
+    from config import WIDTH
+    width = WIDTH if width is None else width
+    delta_time = 1 / REPLAY_FPS
+    with contextlib.redirect_stdout(io.StringIO()):  # Vehicle prints a lot of debug messages
+        vehicle = make_headless_vehicle(vehicle_type, trailer_mass, seed=0, trailer_count=trailer_count)
+        vehicle.start()
+        rows = []
+        gear_rows = []
+        # The first frame shows the vehicle before it moves, then one step per frame until it leaves the screen
+        while True:
+            zero_to_hundred = vehicle.zero_to_hundred_time
+            rows.append([vehicle.time_elapsed, vehicle.speed, vehicle.current_rpm, vehicle.current_gear, vehicle.throttle,
+                         vehicle.distance_traveled, vehicle.co2_emissions, vehicle.position[0], vehicle.wheel_rotation,
+                         vehicle.trailers.wheel_rotation, vehicle.acceleration_timer,
+                         zero_to_hundred if zero_to_hundred is not None else math.nan])
+            stats = vehicle.gear_stats
+            # Copies: the rows are views of arrays the vehicle keeps adding to
+            gear_rows.append([stats.time[0].copy(), stats.entry_speed[0].copy(), stats.exit_speed[0].copy()])
+            if vehicle.position[0] > width or vehicle.time_elapsed >= max_duration:
+                break
+            vehicle.update(delta_time)
+    columns = np.array(rows).T
+    frames = dict(zip(FRAME_CHANNELS, columns))
+    gear_columns = np.array(gear_rows)  # (frames, 3, gears)
+    frames["gear_time"], frames["gear_entry_speed"], frames["gear_exit_speed"] = gear_columns.transpose(1, 0, 2)
+    check_gear_frames(frames)
+    meta = {"vehicle_type": vehicle_type, "trailer_mass": trailer_mass, "trailer_count": trailer_count,
+            "fps": REPLAY_FPS, "config": VEHICLE_CONFIGS[vehicle_type]}
+    return frames, meta
+
+
+def check_gear_frames(frames):
+    # The per-gear stats of every frame must be the ones of that moment: the time in the gears keeps growing during
+    # the run, and no frame has time in a gear the vehicle hasn't reached yet. Raises RuntimeError if not.
+    gear_time = frames["gear_time"]
+    totals = gear_time.sum(axis=1)
+    if len(totals) > 1 and (totals[-1] <= totals[0] or np.any(np.diff(totals) < -1e-9)):
+        raise RuntimeError("The per-gear times don't grow over the replay")
+    highest_gear = np.maximum.accumulate(frames["current_gear"].astype(int))
+    future_gears = np.arange(1, gear_time.shape[1] + 1) > highest_gear[:, None]
+    if np.any(gear_time[future_gears] > 0):
+        raise RuntimeError("A frame has time in a gear the vehicle hasn't reached yet")
+
+
+def save_replay(path, frames, meta):
+    np.savez_compressed(path, meta=np.array(json.dumps(meta)), **frames)
+
+
+def load_replay(path):
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        frames = {key: data[key] for key in data.files if key != "meta"}
+    return frames, meta
+
+
+# Everything below runs in the render workers
+worker_state = {}
+
+
+def init_render_worker():
+    # No window: the SDL dummy driver gives pygame a display surface in memory
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.chdir(PROJECT_FOLDER)  # The picture paths in the configs start at the project folder
+    sys.stdout = open(os.devnull, "w")  # Vehicle and config.py print a lot
+    import pygame
+    from config import WIDTH, HEIGHT
+    pygame.init()
+    worker_state["screen"] = pygame.display.set_mode((WIDTH, HEIGHT))
+    worker_state["font"] = pygame.font.Font(None, 36)
+    worker_state["vehicles"] = {}
+
+
+def replay_vehicle(meta):
+    # The worker's vehicle for this replay, made once and reused by every job with the same config
+    from vehicle import Vehicle
+    from trailer import Trailer
+    key = json.dumps([meta["vehicle_type"], meta["config"], meta["trailer_count"], meta["trailer_mass"] is not None], sort_keys=True)
+    vehicle = worker_state["vehicles"].get(key)
+    if vehicle is None:
+        VEHICLE_CONFIGS[meta["vehicle_type"]] = meta["config"]  # draw_screen reads the gauge colors from here
+        vehicle_info = dict(meta["config"], name=meta["vehicle_type"])
+        if meta["trailer_mass"] is not None:
+            trailer_info = dict(TRAILER_CONFIGS["Standard trailer"], mass=float(meta["trailer_mass"]))
+            vehicle_info['trailers'] = [Trailer(**trailer_info) for _ in range(meta["trailer_count"])]
+        vehicle = Vehicle(**vehicle_info)
+        worker_state["vehicles"][key] = vehicle
+    return vehicle
+
+
+def apply_frame(vehicle, frames, frame):
+    # Puts the stored state of one frame on the vehicle, so the drawing code sees what the game saw
+    vehicle.time_elapsed = float(frames["time"][frame])
+    vehicle.speed = float(frames["speed"][frame])
+    vehicle.current_rpm = float(frames["current_rpm"][frame])
+    vehicle.current_gear = int(frames["current_gear"][frame])
+    vehicle.throttle = float(frames["throttle"][frame])
+    vehicle.distance_traveled = float(frames["distance_traveled"][frame])
+    vehicle.co2_emissions = float(frames["co2_emissions"][frame])
+    vehicle.acceleration_timer = float(frames["acceleration_timer"][frame])
+    zero_to_hundred = float(frames["zero_to_hundred_time"][frame])
+    vehicle.zero_to_hundred_time = None if math.isnan(zero_to_hundred) else zero_to_hundred
+    vehicle.position[0] = float(frames["position_x"][frame])
+    vehicle.rect.x = int(vehicle.position[0])
+    vehicle.wheel_rotation = float(frames["wheel_rotation"][frame])
+    vehicle.trailers.wheel_rotation = float(frames["trailer_wheel_rotation"][frame])
+    vehicle.trailers.attach(vehicle.rect.x)
+    vehicle.gear_stats.time[0] = frames["gear_time"][frame]
+    vehicle.gear_stats.entry_speed[0] = frames["gear_entry_speed"][frame]
+    vehicle.gear_stats.exit_speed[0] = frames["gear_exit_speed"][frame]
+
+
+def render_job(replay_path, folder, frame_format, start, end, use_metric=True):
+    # Renders frames start..end-1 of a replay. Returns (frames written, seconds).
+    import pygame
+    from config import WIDTH, HEIGHT
+    from background import Background
+    from drawing import draw_screen
+    from frame_capture import FrameCapture
+    job_start = time.perf_counter()
+    frames, meta = load_replay(replay_path)
+    screen, font = worker_state["screen"], worker_state["font"]
+    vehicle = replay_vehicle(meta)
+    delta_time = 1 / meta["fps"]
+    random.seed(SCENERY_SEED)
+    background = Background(WIDTH, HEIGHT, vehicle.METERS_TO_PIXELS, vehicle.VISUAL_SPEED_FACTOR)
+    # The game moves the scenery twice per frame (run_sim and Background.draw both call update), so we do too
+    for frame in range(start):
+        vehicle.speed = float(frames["speed"][frame])
+        background.update(vehicle, delta_time)
+        background.update(vehicle, delta_time)
+
+    capture = FrameCapture((WIDTH, HEIGHT), folder, frame_format, policy="block", buffer_count=4, first_frame=start + 1).start()
+    for frame in range(start, end):
+        apply_frame(vehicle, frames, frame)
+        background.update(vehicle, delta_time)
+        background.draw(screen, vehicle, delta_time)
+        draw_screen(screen, vehicle, font, vehicle.speed, vehicle.current_rpm, vehicle.distance_traveled,
+                    vehicle.co2_emissions, WIDTH, HEIGHT, delta_time, None, None, None, True, False, use_metric)
+        capture.capture(screen)
+    capture.stop(write_info=False)
+    return capture.written, time.perf_counter() - job_start
+
+
+def render_replays(replay_paths, output_folder=RENDER_FOLDER, frame_format="png", workers=None):
+    # Renders every replay into output_folder/<replay name>/. Returns the total number of frames written.
+    from config import WIDTH, HEIGHT
+    from frame_capture import write_capture_info
+    jobs = []
+    frame_counts = {}
+    for path in replay_paths:
+        folder = os.path.join(output_folder, os.path.splitext(os.path.basename(path))[0])
+        os.makedirs(folder, exist_ok=True)
+        with np.load(path) as data:
+            frame_count = len(data["time"])
+        frame_counts[folder] = frame_count
+        # A raw video is one file written in order, so it is one job. PNG frames can be made in any order.
+        segment = RENDER_SEGMENT_FRAMES if frame_format == "png" else frame_count
+        jobs += [(path, folder, frame_format, start, min(start + segment, frame_count)) for start in range(0, frame_count, segment)]
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    start_time = time.perf_counter()
+    # Workers must never open a window, they get the dummy video driver through their environment
+    previous_driver = os.environ.get("SDL_VIDEODRIVER")
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_render_worker) as pool:
+            results = list(pool.map(render_job, *zip(*jobs)))
+    finally:
+        if previous_driver is None:
+            del os.environ["SDL_VIDEODRIVER"]
+        else:
+            os.environ["SDL_VIDEODRIVER"] = previous_driver
+
+    for folder, frame_count in frame_counts.items():
+        write_capture_info(folder, frame_format, (WIDTH, HEIGHT), frame_count, policy="block")
+    written = sum(frames for frames, seconds in results)
+    elapsed = time.perf_counter() - start_time
+    print(f"Rendered {written} frames of {len(replay_paths)} replay(s) in {len(jobs)} jobs on {workers} process(es) "
+          f"in {elapsed:.1f} s ({written / elapsed:.0f} frames/s)")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record runs and render them to video frames without a window")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record launches (default: every vehicle and menu trailer load)")
+    record.add_argument("--vehicle", choices=list(VEHICLE_CONFIGS))
+    record.add_argument("--trailer-mass", type=float, help="kg per trailer (semi truck)")
+    record.add_argument("--trailers", type=int, default=1, help="number of trailers (semi truck)")
+    record.add_argument("--folder", default=REPLAY_FOLDER)
+    render = commands.add_parser("render", help="render recorded runs")
+    render.add_argument("replays", nargs="+", help=".npz files made by record")
+    render.add_argument("--out", default=RENDER_FOLDER, help="one folder per replay is made in here")
+    render.add_argument("--format", default="png", choices=["png", "raw"])
+    render.add_argument("--workers", type=int, help="worker processes (default: one per CPU core)")
+    args = parser.parse_args()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Never open a window for this
+
+    if args.command == "record":
+        from results_cache import default_runs
+        if args.vehicle:
+            trailer_mass = args.trailer_mass
+            if args.vehicle == "Semi truck" and trailer_mass is None:
+                trailer_mass = float(TRAILER_CONFIGS["Standard trailer"]["mass"])
+            runs = [(args.vehicle, trailer_mass)]
+        else:
+            runs = default_runs()
+        os.makedirs(args.folder, exist_ok=True)
+        for vehicle_type, trailer_mass in runs:
+            frames, meta = record_run(vehicle_type, trailer_mass, args.trailers if trailer_mass is not None else 1)
+            path = os.path.join(args.folder, replay_name(vehicle_type, trailer_mass, meta["trailer_count"]) + ".npz")
+            save_replay(path, frames, meta)
+            print(f"Recorded {len(frames['time'])} frames of {vehicle_type} to {path}")
+    else:
+        render_replays(args.replays, args.out, args.format, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# results_cache.py
+# This file keeps the results of headless runs (see headless.py) on disk, so the menu can show
+# a performance card (0-100 km/h time, top speed, CO2, time in each gear) for every vehicle right away.
+# Each result is stored under a key made from a hash of the vehicle config, the trailer mass and the
+# simulator version. If you change a vehicle in vehicle_configs.py only that vehicle gets a new key and is simulated
+# again; all the other results are reused.
+# The missing results are computed at startup in a pool of worker processes, so the menu stays responsive.
+
+import hashlib
+import json
+import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_WEIGHT_OPTIONS
+
+# Change this whenever the physics changes, so old cached results are not used anymore
+SIMULATOR_VERSION = "1.1.0"  # 1.1: tire slip model
+CACHE_FILE = "results_cache.json"  # Saved in the project folder (main.py changes the working directory there)
+
+
+def make_cache_key(vehicle_type, trailer_mass=None):
+    key_data = {
+        "vehicle_config": VEHICLE_CONFIGS[vehicle_type],
+        "trailer_mass": float(trailer_mass) if trailer_mass is not None else None,
+        "simulator_version": SIMULATOR_VERSION,
+    }
+    key_text = json.dumps(key_data, sort_keys=True)
+    return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+
+def default_runs():
+    # Every vehicle once, and the semi truck with each of the trailer loads from the menu
+    runs = []
+    for vehicle_type in VEHICLE_CONFIGS:
+        if vehicle_type == "Semi truck":
+            for weight, label in TRAILER_WEIGHT_OPTIONS:
+                if weight != "Custom":
+                    runs.append((vehicle_type, float(weight.split()[0].replace(',', ''))))
+        else:
+            runs.append((vehicle_type, None))
+    return runs
+
+
+def init_worker():
+    # The workers print a lot of debug messages from Vehicle; nobody is reading them
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_worker(vehicle_type, trailer_mass, vehicle_config):
+    # vehicle_config is the config the key was made from, so a vehicle tuned in the game (see vehicle_tuning.py)
+    # is simulated with its tuned values and not with the ones the worker imported
+    from headless import run_headless  # Imported here so the main process doesn't need it
+    VEHICLE_CONFIGS[vehicle_type] = vehicle_config
+    return run_headless(vehicle_type, trailer_mass)
+
+
+class ResultsCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.results = {}
+        self.pool = None
+        self.pending = {}  # future -> cache key
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as cache_file:
+                data = json.load(cache_file)
+            if data.get("simulator_version") == SIMULATOR_VERSION:
+                self.results = data.get("results", {})
+                print(f"Loaded {len(self.results)} cached results from {self.path}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            print(f"Couldn't read the results cache, starting with an empty one: {e}")
+
+    def save(self):
+        # Write to a temporary file first so a crash never leaves a half-written cache behind
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump({"simulator_version": SIMULATOR_VERSION, "results": self.results}, cache_file, indent=1)
+        os.replace(temp_path, self.path)
+
+    def get(self, vehicle_type, trailer_mass=None):
+        return self.results.get(make_cache_key(vehicle_type, trailer_mass))
+
+    def start_background_fill(self, runs=None, max_workers=None):
+        # Start simulating every run that is not cached (or already running) yet. Call poll() regularly to
+        # collect the results. Can be called again later with more runs, the worker pool is reused.
+        runs = default_runs() if runs is None else runs
+        pending_keys = set(self.pending.values())
+        missing = [(vehicle_type, trailer_mass) for vehicle_type, trailer_mass in runs
+                   if make_cache_key(vehicle_type, trailer_mass) not in self.results
+                   and make_cache_key(vehicle_type, trailer_mass) not in pending_keys]
+        if not missing:
+            print("All these performance cards are cached")
+            return
+        print(f"Simulating {len(missing)} performance cards in the background")
+        max_workers = max_workers or min(len(missing), os.cpu_count() or 1)
+
+        # Worker processes must never open a window. With the "spawn" start method they import main.py again,
+        # which sets up the display, so they get the dummy video driver through their environment.
+        previous_driver = os.environ.get("SDL_VIDEODRIVER")
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        try:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                                                initializer=init_worker)
+            for vehicle_type, trailer_mass in missing:
+                future = self.pool.submit(run_worker, vehicle_type, trailer_mass, VEHICLE_CONFIGS[vehicle_type])
+                self.pending[future] = make_cache_key(vehicle_type, trailer_mass)
+        finally:
+            if previous_driver is None:
+                del os.environ["SDL_VIDEODRIVER"]
+            else:
+                os.environ["SDL_VIDEODRIVER"] = previous_driver
+
+    def poll(self):
+        # Collect finished runs. Returns True if there are new results (so the menu should redraw).
+        finished = [future for future in self.pending if future.done()]
+        for future in finished:
+            key = self.pending.pop(future)
+            try:
+                self.results[key] = future.result()
+            except Exception as e:
+                print(f"Background simulation failed: {e}")
+        if finished:
+            self.save()
+            if not self.pending:
+                print("All performance cards are ready")
+                self.shutdown()
+        return bool(finished)
+
+    def is_busy(self):
+        return bool(self.pending)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        self.pending = {}
@@ -0,0 +1,232 @@
+# scenarios.py
+# This file runs simulation scenarios without a window, for scripts and nightly pipelines.
+# A scenario is a JSON or TOML file with these keys (only vehicle is needed):
+#   name = "Semi, full load"        the file name without .toml/.json if missing
+#   vehicle = "Semi truck"          a name from VEHICLE_CONFIGS, or a whole vehicle config (same keys, see vehicle_configs.py)
+#   trailer_mass = 25000            kg, or a name from TRAILER_CONFIGS. Semi truck (or own config) only.
+#                                   The semi truck gets the "Standard trailer" without it, like in the game.
+#   duration = 120                  seconds of simulated time. Launch: 180 if missing, cycle: the whole cycle
+#   dt = 0.02                       physics step in seconds. Launch: 1/60 like the game, cycle: 0.05
+#   controller = "launch"           "launch" is the full-throttle launch of the game, "cycle" follows a drive cycle
+#   integrator = "euler"            launch only: "euler" steps like the game, "rk4" or "rk45" use integrators.py
+#   cycle = "urban"                 cycle only: a cycle from assets/cycles, or a CSV file (relative to the scenario file)
+#   speed_unit = "kmh"              cycle only: unit of the speed column of the CSV file
+#   seed = 0                        random seed of the electric motor RPM jitter, so runs repeat exactly
+#   backend = "reference"           physics backend of the Euler launch and the cycle (see physics_backends.py)
+#   outputs = ["co2_g_per_km"]      result keys to keep, all of them if missing
+# A file can also hold several scenarios in a "scenarios" list (in TOML: [[scenarios]] tables). The other keys of
+# such a file are defaults for every scenario in it.
+#
+# The results are a JSON list with one entry per scenario, in the order of the files. A scenario that fails gets
+# an "error" instead of "results" and the exit code is 1, so a pipeline notices. Broken scenario files are reported
+# before anything runs (exit code 2).
+# - Starting is fast: this file only imports the standard library and vehicle_configs.py. NumPy and the physics
+#   (fleet.py, integrators.py, drive_cycle.py) are imported when the first scenario runs, pygame never is.
+# - With --jobs the scenarios are spread over worker processes, --jobs 0 starts one per core.
+#
+# Run it from the src folder with:  python -m scenarios ../assets/scenarios/*.toml --output results.json
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+try:
+    import tomllib  # Python 3.11 and newer. Without it only JSON scenarios can be read
+except ImportError:
+    tomllib = None
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS
+
+CONTROLLERS = ("launch", "cycle")
+INTEGRATORS = ("euler", "rk4", "rk45")  # rk4 and rk45 are integrators.INTEGRATORS, not imported here to start fast
+DEFAULT_LAUNCH_DURATION = 180.0  # Same defaults as headless.py
+DEFAULT_LAUNCH_TIME_STEP = 1 / 60
+DEFAULT_CYCLE_TIME_STEP = 0.05  # drive_cycle.CYCLE_TIME_STEP
+DEFAULT_SEED = 0
+DEFAULT_BACKEND = "reference"  # A scenario is one vehicle, the plain Python rows are about 3x faster than NumPy for that
+SCENARIO_KEYS = {"name", "vehicle", "trailer_mass", "duration", "dt", "controller", "integrator", "cycle",
+                 "speed_unit", "seed", "backend", "outputs"}
+
+
+def read_scenario_file(path):
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML scenarios need Python 3.11 or newer")
+        with open(path, "rb") as scenario_file:
+            return tomllib.load(scenario_file)
+    with open(path) as scenario_file:
+        return json.load(scenario_file)
+
+
+def check_scenario(data, path):
+    # Fills in the defaults and returns the scenario as a dictionary, or raises ValueError with what is wrong
+    unknown = sorted(set(data) - SCENARIO_KEYS)
+    if unknown:
+        raise ValueError(f"unknown keys {', '.join(unknown)}")
+    scenario = {"name": data.get("name", os.path.splitext(os.path.basename(path))[0]), "file": path}
+
+    vehicle = data.get("vehicle")
+    if isinstance(vehicle, dict):
+        from sim_server import validate_request  # Same checks as the HTTP service
+        validate_request({"config": vehicle})
+    elif vehicle not in VEHICLE_CONFIGS:
+        raise ValueError(f"vehicle must be a vehicle config or one of: {', '.join(VEHICLE_CONFIGS)}")
+    scenario["vehicle"] = vehicle
+
+    trailer_mass = data.get("trailer_mass")
+    if isinstance(trailer_mass, str):
+        if trailer_mass not in TRAILER_CONFIGS:
+            raise ValueError(f"trailer_mass must be in kg or one of: {', '.join(TRAILER_CONFIGS)}")
+        trailer_mass = TRAILER_CONFIGS[trailer_mass]["mass"]
+    if trailer_mass is not None:
+        if not isinstance(trailer_mass, (int, float)) or trailer_mass < 0:
+            raise ValueError("trailer_mass can't be negative")
+        if vehicle in VEHICLE_CONFIGS and vehicle != "Semi truck":
+            raise ValueError(f"only the Semi truck pulls a trailer, not the {vehicle}")
+    elif vehicle == "Semi truck":
+        trailer_mass = TRAILER_CONFIGS["Standard trailer"]["mass"]  # Same rule as headless.make_headless_vehicle
+    scenario["trailer_mass"] = float(trailer_mass) if trailer_mass is not None else None
+
+    controller = data.get("controller", "launch")
+    if controller not in CONTROLLERS:
+        raise ValueError(f"controller must be one of: {', '.join(CONTROLLERS)}")
+    scenario["controller"] = controller
+    scenario["integrator"] = data.get("integrator", "euler")
+    if scenario["integrator"] not in INTEGRATORS:
+        raise ValueError(f"integrator must be one of: {', '.join(INTEGRATORS)}")
+    if scenario["integrator"] != "euler" and (controller != "launch" or isinstance(vehicle, dict)):
+        raise ValueError("rk4 and rk45 only run the launch of a vehicle from VEHICLE_CONFIGS")
+    if controller == "cycle":
+        if "cycle" not in data:
+            raise ValueError("a cycle scenario needs a cycle (a name from assets/cycles or a CSV file)")
+        cycle_path = os.path.join(os.path.dirname(path), data["cycle"])
+        scenario["cycle"] = cycle_path if os.path.isfile(cycle_path) else data["cycle"]
+        scenario["speed_unit"] = data.get("speed_unit", "kmh")
+
+    default_duration = DEFAULT_LAUNCH_DURATION if controller == "launch" else None
+    default_time_step = DEFAULT_LAUNCH_TIME_STEP if controller == "launch" else DEFAULT_CYCLE_TIME_STEP
+    scenario["duration"] = data.get("duration", default_duration)
+    scenario["dt"] = data.get("dt", default_time_step)
+    if scenario["duration"] is not None and not scenario["duration"] > 0:
+        raise ValueError("duration must be greater than zero")
+    if not 0 < scenario["dt"] <= 1:
+        raise ValueError("dt must be in (0, 1] seconds")
+    scenario["seed"] = data.get("seed", DEFAULT_SEED)
+    scenario["backend"] = data.get("backend", DEFAULT_BACKEND)
+    outputs = data.get("outputs")
+    if outputs is not None and (not isinstance(outputs, list) or not all(isinstance(key, str) for key in outputs)):
+        raise ValueError("outputs must be a list of result keys")
+    scenario["outputs"] = outputs
+    return scenario
+
+
+def load_scenarios(path):
+    # All scenarios of one file (a single scenario, or a "scenarios" list with shared defaults)
+    data = read_scenario_file(path)
+    if not isinstance(data, dict):
+        raise ValueError("a scenario file must hold a JSON object or TOML table")
+    if "scenarios" not in data:
+        entries = [data]
+    else:
+        if not isinstance(data["scenarios"], list) or not all(isinstance(entry, dict) for entry in data["scenarios"]):
+            raise ValueError("scenarios must be a list of tables")
+        defaults = {key: value for key, value in data.items() if key != "scenarios"}
+        entries = [{**defaults, **entry} for entry in data["scenarios"]]
+    scenarios = []
+    for index, entry in enumerate(entries):
+        try:
+            scenario = check_scenario(entry, path)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"scenario {index + 1}: {e}" if "scenarios" in data else str(e)) from None
+        if "scenarios" in data and "name" not in data["scenarios"][index]:
+            scenario["name"] += f"[{index + 1}]"
+        scenarios.append(scenario)
+    return scenarios
+
+
+def simulate(scenario):
+    # The results dictionary of one scenario. The physics are imported here, not when the program starts.
+    vehicle = scenario["vehicle"]
+    config = vehicle if isinstance(vehicle, dict) else VEHICLE_CONFIGS[vehicle]
+    name = config.get("name", scenario["name"]) if isinstance(vehicle, dict) else vehicle
+    if scenario["controller"] == "cycle":
+        import itertools
+        from drive_cycle import DriveCycleRunner, find_cycle, read_cycle_csv
+        runner = DriveCycleRunner([(name, scenario["trailer_mass"])], scenario["backend"], scenario["dt"],
+                                  scenario["seed"], configs=[config])
+        points = read_cycle_csv(find_cycle(scenario["cycle"]))
+        if scenario["duration"] is not None:
+            points = itertools.takewhile(lambda point: point[0] <= scenario["duration"], points)
+        return runner.run(points, scenario["speed_unit"])[0]
+    if scenario["integrator"] != "euler":
+        from integrators import run_launch
+        step = scenario["dt"] if scenario["integrator"] == "rk4" else None
+        return run_launch(vehicle, scenario["trailer_mass"], scenario["duration"], scenario["integrator"], step)
+    from fleet import Fleet
+    fleet = Fleet([config], [scenario["trailer_mass"]], names=[name], seed=scenario["seed"], backend=scenario["backend"])
+    return fleet.run(scenario["duration"], scenario["dt"])[0]
+
+
+def run_scenario(scenario):
+    # Runs in a worker process with --jobs. Returns the entry for the results list, errors included.
+    entry = {"name": scenario["name"], "file": scenario["file"]}
+    start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):  # Progress lines of the runners must not end up in the JSON
+            results = simulate(scenario)
+        if scenario["outputs"] is not None:
+            missing = [key for key in scenario["outputs"] if key not in results]
+            if missing:
+                raise ValueError(f"unknown outputs {', '.join(missing)}. Choose from: {', '.join(results)}")
+            results = {key: results[key] for key in scenario["outputs"]}
+        entry["results"] = results
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["wall_time"] = time.perf_counter() - start_time
+    return entry
+
+
+def run_scenarios(scenarios, jobs=1):
+    # Entries in the order of scenarios. jobs > 1 spreads them over that many worker processes, 0 means one per core.
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(scenarios) == 1:
+        return [run_scenario(scenario) for scenario in scenarios]
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(jobs, len(scenarios)), mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(run_scenario, scenarios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run simulation scenarios (JSON or TOML files) without a window")
+    parser.add_argument("files", nargs="+", help="scenario files")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes, 0 for one per core (default 1)")
+    parser.add_argument("--output", metavar="FILE", help="write the JSON results to this file instead of printing them")
+    args = parser.parse_args()
+
+    scenarios = []
+    for path in args.files:
+        try:
+            scenarios += load_scenarios(path)
+        except (OSError, ValueError) as e:  # json.JSONDecodeError and tomllib.TOMLDecodeError are ValueErrors
+            print(f"Can't load {path}: {e}", file=sys.stderr)
+            sys.exit(2)
+
+    start_time = time.perf_counter()
+    entries = run_scenarios(scenarios, args.jobs)
+    failed = [entry for entry in entries if "error" in entry]
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(entries, output_file, indent=1)
+    else:
+        json.dump(entries, sys.stdout, indent=1)
+        print()
+    for entry in failed:
+        print(f"{entry['name']} failed: {entry['error']}", file=sys.stderr)
+    print(f"Ran {len(entries)} scenarios in {time.perf_counter() - start_time:.2f} s, {len(failed)} failed", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# sensitivity.py
+# This file measures how sensitive the 0-100 km/h time and the CO2 per km of a full-throttle launch are to
+# the vehicle parameters: mass, air_resistance_coefficient, frontal_area, final_drive_ratio and every gear ratio
+# (the single gear ratio for electric cars).
+# Every parameter of every vehicle is changed a little up and a little down, and the changed configs run
+# together as one Fleet (see fleet.py): a vectorized batch instead of hundreds of separate runs.
+# With one CPU core everything is a single batch. With more cores every vehicle (and trailer load) gets its
+# own batch in a pool of worker processes, so a slow loaded semi truck doesn't keep the fast cars' rows running.
+# The result is an elasticity for each parameter: the % change of the result for a 1% change of the parameter.
+# An elasticity of 0.9 for mass and 0-100 means 10% more mass gives about 9% more 0-100 time.
+# Shifting is discrete, so changing a gear ratio can move a shift point and give a bigger jump than expected.
+#
+# Run it from the src folder with:  python sensitivity.py
+# or for one vehicle:               python sensitivity.py --vehicle "Sports car" --step 0.02
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from vehicle_configs import VEHICLE_CONFIGS
+from results_cache import default_runs
+from fleet import Fleet
+
+SENSITIVITY_STEP = 0.05  # Relative change of each parameter (5% up and 5% down)
+SENSITIVITY_DURATION = 180.0  # Same as the headless runs
+SENSITIVITY_TIME_STEP = 1 / 60  # Same as the game. The 0-100 time is interpolated between ticks, so small changes still show
+COMMON_PARAMETERS = ['mass', 'air_resistance_coefficient', 'frontal_area']
+
+
+def sensitivity_parameters(config):
+    # (label, key, index) for every parameter we change. index is the gear number - 1 for gear ratios, else None
+    parameters = [(key, key, None) for key in COMMON_PARAMETERS]
+    if config.get('is_electric', False):
+        parameters.append(('single_gear_ratio', 'single_gear_ratio', None))
+    else:
+        parameters.append(('final_drive_ratio', 'final_drive_ratio', None))
+        parameters += [(f"gear {gear} ratio", 'gear_ratios', gear - 1) for gear in range(1, len(config['gear_ratios']) + 1)]
+    return parameters
+
+
+def perturb(config, key, index, factor):
+    # A copy of the config with one parameter multiplied by factor
+    changed = dict(config)
+    if index is None:
+        changed[key] = config[key] * factor
+    else:
+        changed[key] = list(config[key])
+        changed[key][index] *= factor
+    return changed
+
+
+def run_launches(configs, trailer_masses, backend="numpy", duration=SENSITIVITY_DURATION, delta_time=SENSITIVITY_TIME_STEP):
+    # Full-throttle launch of all configs at once (see Fleet.launch). Returns (0-100 time in s, CO2 in g/km) arrays.
+    # The 0-100 time is interpolated inside the tick, so tiny changes still show up; it is nan if 100 km/h is never reached.
+    results = Fleet(configs, trailer_masses, backend=backend).launch(duration, delta_time)
+    return results["zero_to_hundred_time"], results["co2_g_per_km"]
+
+
+def elasticity(up, down, base, step):
+    # Central difference: (% change of the result) / (% change of the parameter). None if it can't be computed
+    # (an electric car has no CO2, a loaded truck may never reach 100 km/h)
+    if not (math.isfinite(up) and math.isfinite(down) and math.isfinite(base)) or not base:
+        return None
+    return float((up - down) / (2 * step * base))
+
+
+def analyze_batch(runs, step, backend, duration, delta_time):
+    # One batch for a list of runs. For each run: its config, then every parameter changed up and down.
+    configs, trailer_masses, layout = [], [], []
+    for vehicle_type, trailer_mass in runs:
+        config = VEHICLE_CONFIGS[vehicle_type]
+        parameters = sensitivity_parameters(config)
+        layout.append((len(configs), parameters))  # Row of the base config; parameter i is up at +2i+1, down at +2i+2
+        configs.append(config)
+        for _, key, index in parameters:
+            configs += [perturb(config, key, index, 1 + step), perturb(config, key, index, 1 - step)]
+        trailer_masses += [trailer_mass] * (1 + 2 * len(parameters))
+    zero_to_hundred, co2_per_km = run_launches(configs, trailer_masses, backend, duration, delta_time)
+
+    results = []
+    for base, parameters in layout:
+        rows = []
+        for number, (label, _, _) in enumerate(parameters):
+            up, down = base + 2 * number + 1, base + 2 * number + 2
+            rows.append({
+                "parameter": label,
+                "zero_to_hundred_elasticity": elasticity(zero_to_hundred[up], zero_to_hundred[down], zero_to_hundred[base], step),
+                "co2_per_km_elasticity": elasticity(co2_per_km[up], co2_per_km[down], co2_per_km[base], step),
+            })
+        # Most sensitive first (by the bigger of the two elasticities, unknown values count as 0)
+        rows.sort(key=lambda row: -max(abs(row["zero_to_hundred_elasticity"] or 0), abs(row["co2_per_km_elasticity"] or 0)))
+        results.append({
+            "zero_to_hundred_time": float(zero_to_hundred[base]) if math.isfinite(zero_to_hundred[base]) else None,
+            "co2_g_per_km": float(co2_per_km[base]),
+            "parameters": rows,
+        })
+    return results
+
+
+def analyze(runs=None, step=SENSITIVITY_STEP, backend="numpy", duration=SENSITIVITY_DURATION,
+            delta_time=SENSITIVITY_TIME_STEP, workers=None):
+    # Returns {run label: result} with one row per parameter, ranked from the most to the least sensitive.
+    # workers: number of worker processes (1 runs everything in this process)
+    runs = default_runs() if runs is None else runs
+    workers = workers or min(len(runs), os.cpu_count() or 1)
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(analyze_batch, [run], step, backend, duration, delta_time) for run in runs]
+            results = [future.result()[0] for future in futures]
+    else:
+        results = analyze_batch(runs, step, backend, duration, delta_time)
+    print(f"Simulated {len(runs)} runs with every parameter changed on {workers} process(es) in {time.perf_counter() - start:.2f} s")
+
+    report = {}
+    for (vehicle_type, trailer_mass), result in zip(runs, results):
+        label = vehicle_type if trailer_mass is None else f"{vehicle_type} + {trailer_mass:.0f} kg"
+        report[label] = result
+    return report
+
+
+def print_report(report):
+    def number(value):
+        return f"{value:+8.3f}" if value is not None else "       -"
+
+    for label, result in report.items():
+        zero_to_hundred = f"{result['zero_to_hundred_time']:.2f} s" if result['zero_to_hundred_time'] is not None else "not reached"
+        print(f"\n{label}: 0-100 km/h {zero_to_hundred}, CO2 {result['co2_g_per_km']:.0f} g/km")
+        print(f"    {'Parameter':<28} {'0-100':>8} {'CO2/km':>8}")
+        for row in result["parameters"]:
+            print(f"    {row['parameter']:<28} {number(row['zero_to_hundred_elasticity'])} {number(row['co2_per_km_elasticity'])}")
+    print("\n(elasticity: % change of the result for a 1% change of the parameter, - means not available)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank how sensitive 0-100 and CO2/km are to each vehicle parameter")
+    parser.add_argument("--vehicle", action="append", choices=list(VEHICLE_CONFIGS), help="only this vehicle (can be repeated)")
+    parser.add_argument("--step", type=float, default=SENSITIVITY_STEP, help="relative parameter change, e.g. 0.05 for 5%%")
+    parser.add_argument("--backend", default="numpy", help="physics backend (see physics_backends.py)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU core)")
+    parser.add_argument("--json", metavar="FILE", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    runs = default_runs()
+    if args.vehicle:
+        runs = [run for run in runs if run[0] in args.vehicle]
+    report = analyze(runs, args.step, args.backend, workers=args.workers)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(report, json_file, indent=1)
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
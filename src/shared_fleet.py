@@ -0,0 +1,273 @@
+# shared_fleet.py
+# This file steps very big fleets (hundreds of thousands to millions of vehicles, for Monte Carlo runs) on all
+# CPU cores at once, without sending the fleet state from one process to another.
+# - Every array of a Fleet (see fleet.py): the vehicle properties, the state (speed, RPM, gear, throttle, shift
+#   timers...) and the per-gear stats, is moved into one block of multiprocessing.shared_memory. The parent's
+#   Fleet then reads its arrays straight from that block, so the results are there without copying.
+# - The vehicles are split into shards (a range of rows each), one per worker process. The workers are started
+#   once and stay alive. Each one makes a ShardFleet whose arrays are views of its rows in the same block, and
+#   steps it in place.
+# - The parent only sends small commands through a pipe ("step 60 ticks of 1/60 s") and waits until every worker
+#   answers, so all shards are at the same time after every call: per tick with step(dt), or per block of ticks
+#   with step(dt, ticks), which costs much less waiting. No state is ever pickled, only the layout of the block
+#   (names, types, shapes and offsets of the arrays) is sent once when a worker starts.
+# - Every shard has its own random stream for the electric motor RPM drops, made from the seed with NumPy's
+#   SeedSequence. The same seed and number of workers give the same results. The drops only change the RPM,
+#   so with another number of workers only the RPM of the electric cars is different.
+#
+# Run it from the src folder with:  python shared_fleet.py --vehicles 200000 --workers 4
+# (it times a shared fleet against a normal Fleet in one process, and checks that they give the same speeds)
+
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from physics_backends import get_backend
+from fleet import Fleet
+from gear_stats import GearStats
+
+ALIGNMENT = 64  # bytes, every array in the block starts on a cache line
+TABLE_ARRAYS = ("grip_table", "stiffness_table")  # One row per kind of tire, not per vehicle: every shard needs all of them
+LOCAL_ARRAYS = ("rows",)  # Row numbers 0 to count - 1, every shard makes its own
+LAUNCH_RESULTS = ("zero_to_hundred_time", "top_speed_kmh", "co2_g_per_km")  # Fleet.launch results, also in the block
+
+
+def array_layout(fleet):
+    # Where every array goes in the shared block: [(owner, name, dtype, shape, offset, one row per vehicle)]
+    # and the size of the block in bytes. The owner is "fleet", "gear_stats" or "launch" (results of launch).
+    arrays = [("fleet", name, value) for name, value in vars(fleet).items()]
+    arrays += [("gear_stats", name, value) for name, value in vars(fleet.gear_stats).items()]
+    arrays += [("launch", name, np.zeros(fleet.count)) for name in LAUNCH_RESULTS]
+    layout = []
+    offset = 0
+    for owner, name, value in arrays:
+        if isinstance(value, np.ndarray) and name not in LOCAL_ARRAYS:
+            layout.append((owner, name, value.dtype.str, value.shape, offset, name not in TABLE_ARRAYS))
+            offset += -(-value.nbytes // ALIGNMENT) * ALIGNMENT
+    return layout, offset
+
+
+def shared_views(buffer, layout, start=None, end=None):
+    # {(owner, name): NumPy view of the array in buffer}. With start and end only those rows of the per-vehicle arrays.
+    # np.frombuffer keeps the buffer exported, so the block can't be unmapped while a view of it is still in use.
+    block = np.frombuffer(buffer, dtype=np.uint8)
+    views = {}
+    for owner, name, dtype, shape, offset, per_vehicle in layout:
+        dtype = np.dtype(dtype)
+        view = block[offset:offset + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+        views[owner, name] = view[start:end] if per_vehicle and start is not None else view
+    return views
+
+
+def bind(fleet, views):
+    # Makes the fleet use the shared views. Arrays that are not a view yet (Fleet.reset makes new ones) are copied in.
+    for (owner, name), view in views.items():
+        if owner == "launch":
+            continue
+        target = fleet if owner == "fleet" else fleet.gear_stats
+        value = getattr(target, name)
+        if value is not view:
+            view[...] = value
+            setattr(target, name, view)
+
+
+class ShardFleet(Fleet):
+    # The rows start:end of a shared fleet, in a worker process. All its arrays are views of the shared block,
+    # so it is made from the block, not from vehicle configs.
+    def __init__(self, views, count, seed, backend, fuel_cut_off, fuel_from_work):
+        self.views = views
+        self.count = count
+        self.names = None
+        self.rows = np.arange(count)
+        self.rng = np.random.default_rng(seed)
+        self.backend = get_backend(backend)
+        self.fuel_cut_off = fuel_cut_off
+        self.fuel_from_work = fuel_from_work
+        self.gear_stats = GearStats(views["fleet", "gear_ratios"].shape[1], count)
+        self.time_elapsed = 0.0
+        for (owner, name), view in views.items():
+            if owner != "launch":
+                setattr(self if owner == "fleet" else self.gear_stats, name, view)
+        self.has_electric = bool(self.is_electric.any())
+
+    def reset(self):
+        super().reset()  # Makes new arrays,
+        bind(self, self.views)  # their values go into the block and the fleet keeps using the block
+
+
+def shard_worker(connection, memory_name, layout, start, end, seed, backend, fuel_cut_off, fuel_from_work):
+    # A worker process: steps the rows start:end of the shared fleet whenever the parent asks.
+    # Commands are (name, arguments...), the answer is ("done", time elapsed) or ("error", message).
+    memory = shared_memory.SharedMemory(name=memory_name)
+    views = shared_views(memory.buf, layout, start, end)
+    try:
+        fleet = ShardFleet(views, end - start, seed, backend, fuel_cut_off, fuel_from_work)
+    except Exception as e:
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    connection.send(("done", fleet.time_elapsed))
+    while True:
+        command, *arguments = connection.recv()
+        if command == "stop":
+            break
+        try:
+            if command == "step":
+                delta_time, ticks = arguments
+                for _ in range(ticks):
+                    fleet.step(delta_time)
+            elif command == "reset":
+                fleet.reset()
+            elif command == "start":
+                fleet.start()
+            elif command == "launch":
+                for name, values in fleet.launch(*arguments).items():
+                    views["launch", name][...] = values
+            bind(fleet, views)  # In case a step made a new array instead of writing into the old one
+            connection.send(("done", fleet.time_elapsed))
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+    connection.close()
+    del fleet, views  # The block can only be closed when no view of it is left
+    memory.close()
+
+
+class SharedFleet:
+    # A Fleet stepped by worker processes. Read its arrays like a Fleet's (shared_fleet.speed, .current_gear...),
+    # they are the shared block itself. Call close() (or use "with") to stop the workers and free the block.
+    def __init__(self, configs, trailer_masses=None, names=None, seed=None, backend="numpy", workers=None,
+                 fuel_cut_off=False, fuel_from_work=False):
+        self.fleet = Fleet(configs, trailer_masses, names=names, backend=backend)  # Read by the parent, never stepped
+        self.fleet.fuel_cut_off = fuel_cut_off
+        self.fleet.fuel_from_work = fuel_from_work
+        layout, size = array_layout(self.fleet)
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.views = shared_views(self.memory.buf, layout)
+        bind(self.fleet, self.views)
+
+        workers = min(workers or os.cpu_count() or 1, self.fleet.count)
+        bounds = np.linspace(0, self.fleet.count, workers + 1).astype(int)
+        self.shards = list(zip(bounds[:-1], bounds[1:]))
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        for (start, end), shard_seed in zip(self.shards, np.random.SeedSequence(seed).spawn(workers)):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=shard_worker, daemon=True, name=f"fleet-shard-{start}",
+                                      args=(worker_connection, self.memory.name, layout, int(start), int(end),
+                                            shard_seed, backend, fuel_cut_off, fuel_from_work))
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+        self.wait()
+
+    def __getattr__(self, name):
+        # Everything else (speed, current_gear, gear_stats, results...) comes from the parent's Fleet
+        if name == "fleet":
+            raise AttributeError(name)
+        return getattr(self.fleet, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def command(self, *command):
+        for connection in self.connections:
+            connection.send(command)
+        self.wait()
+
+    def wait(self):
+        # Until every worker has answered. The shards are then all at the same time.
+        errors = []
+        for (start, end), connection in zip(self.shards, self.connections):
+            status, value = connection.recv()
+            if status == "error":
+                errors.append(f"vehicles {start} to {end - 1}: {value}")
+            else:
+                self.fleet.time_elapsed = value
+        if errors:
+            raise RuntimeError("A fleet shard failed: " + "; ".join(errors))
+
+    def reset(self):
+        self.command("reset")
+
+    def start(self):
+        self.command("start")
+
+    def step(self, delta_time, ticks=1):
+        # ticks steps of delta_time on every shard. More ticks per call means less waiting for the slowest shard.
+        self.command("step", delta_time, int(ticks))
+
+    def launch(self, duration, delta_time):
+        # Fleet.launch on every shard at once. The workers write the results into the block, the parent copies
+        # them out (three numbers per vehicle), so they can be kept after close.
+        self.command("launch", duration, delta_time)
+        return {name: self.views["launch", name].copy() for name in LAUNCH_RESULTS}
+
+    def close(self):
+        if self.memory is None:
+            return
+        for connection in self.connections:
+            try:
+                connection.send(("stop",))
+            except OSError:
+                pass  # The worker is gone already
+        for process in self.processes:
+            process.join(timeout=5)
+        self.memory.unlink()
+        # The parent's Fleet gets its own copies of the arrays, so it can still be read after close
+        bind(self.fleet, {key: view.copy() for key, view in self.views.items()})
+        self.views = None
+        try:
+            self.memory.close()
+        except BufferError:
+            pass  # Someone still holds a view of the block (shared.speed from before close), it is freed with it
+        self.memory = None
+
+
+def benchmark(vehicles, workers, ticks=300, block=60, backend="numpy", delta_time=1 / 60):
+    from vehicle_configs import VEHICLE_CONFIGS
+    from results_cache import default_runs
+    runs = default_runs()
+    runs = [runs[row % len(runs)] for row in range(vehicles)]
+    configs = [VEHICLE_CONFIGS[vehicle_type] for vehicle_type, _ in runs]
+    trailer_masses = [mass for _, mass in runs]
+
+    fleet = Fleet(configs, trailer_masses, seed=1, backend=backend)
+    fleet.start()
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        fleet.step(delta_time)
+    single = time.perf_counter() - start_time
+    print(f"One process:  {ticks * vehicles / single / 1e6:6.2f} million vehicle ticks per second")
+
+    with SharedFleet(configs, trailer_masses, seed=1, backend=backend, workers=workers) as shared:
+        for ticks_per_call in (1, block):
+            shared.reset()
+            shared.start()
+            start_time = time.perf_counter()
+            for _ in range(ticks // ticks_per_call):
+                shared.step(delta_time, ticks_per_call)
+            elapsed = time.perf_counter() - start_time
+            print(f"{len(shared.shards)} shards, {ticks_per_call:3d} ticks per sync: "
+                  f"{ticks * vehicles / elapsed / 1e6:6.2f} million vehicle ticks per second")
+        print(f"Largest speed difference to the one-process fleet: {np.abs(shared.speed - fleet.speed).max():.3g} m/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a fleet stepped by worker processes in shared memory")
+    parser.add_argument("--vehicles", type=int, default=200000)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU core)")
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--block", type=int, default=60, help="ticks per sync for the second timing")
+    parser.add_argument("--backend", default="numpy", help="physics backend (see physics_backends.py)")
+    args = parser.parse_args()
+    benchmark(args.vehicles, args.workers, args.ticks, args.block, args.backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# sim_server.py
+# A small local HTTP service that answers "what is the 0-100 time and CO2 for this vehicle config?".
+# It only uses the Python standard library and NumPy, and only listens on localhost, so it works offline.
+#
+# How it works:
+# - Clients POST a vehicle config (same schema as VEHICLE_CONFIGS in config.py) to /simulate
+# - Requests that arrive at about the same time are collected into one batch and simulated together
+#   as a Fleet (see fleet.py), which is much faster than simulating them one by one
+# - Batches run on a pool of worker processes, so several batches can run in parallel
+# - Recent results are kept in memory, so asking the same question twice is instant
+# - GET /metrics returns OpenMetrics counters (requests, batch sizes, latency) for monitoring
+#
+# Run it from the src folder with:  python sim_server.py --port 8765
+# Then for example:  curl -X POST localhost:8765/simulate -d '{"config": {...}, "trailer_mass": 25000}'
+
+import argparse
+import collections
+import hashlib
+import json
+import math
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from vehicle_configs import tire_for
+
+# Keys every vehicle config needs (the rest have defaults in Fleet)
+REQUIRED_KEYS = ['mass', 'max_rpm', 'max_speed', 'wheel_circumference', 'friction_coefficient',
+                 'air_resistance_coefficient', 'frontal_area', 'power_curve', 'torque_curve']
+REQUIRED_ICE_KEYS = ['gear_ratios', 'final_drive_ratio', 'idle_rpm', 'shift_up_rpm', 'shift_down_rpm',
+                     'fuel_efficiency', 'emission_factor']
+REQUIRED_ELECTRIC_KEYS = ['single_gear_ratio']
+CURVE_KEYS = ['power_curve', 'torque_curve']
+# Keys Fleet reads as numbers when a config has them (see Fleet.__init__)
+OPTIONAL_NUMBER_KEYS = ['rev_drop_rate', 'post_shift_adjustment_factor', 'speed_emission_coefficient',
+                        'base_engine_efficiency', 'driven_wheels', 'driven_load_share']
+
+DEFAULT_DURATION = 180.0  # Same defaults as headless.py
+DEFAULT_TIME_STEP = 1 / 60
+MAX_DURATION = 3600.0
+REQUEST_TIMEOUT = 120.0  # seconds a client waits for its result
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_request(data):
+    # Checks the request body and returns (config, trailer_mass, duration, time_step).
+    # Raises ValueError with a message for the client if something is wrong.
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    config = data.get('config', data)  # Accept {"config": {...}} or the config itself
+    if not isinstance(config, dict):
+        raise ValueError("'config' must be a JSON object")
+    required = REQUIRED_KEYS + (REQUIRED_ELECTRIC_KEYS if config.get('is_electric', False) else REQUIRED_ICE_KEYS)
+    missing = [key for key in required if key not in config]
+    if missing:
+        raise ValueError(f"Vehicle config is missing: {', '.join(missing)}")
+    # Everything Fleet builds its arrays from must be a number, or one bad config fails its whole batch
+    number_keys = [key for key in required if key not in CURVE_KEYS and key != 'gear_ratios']
+    number_keys += [key for key in OPTIONAL_NUMBER_KEYS if key in config]
+    not_numbers = [key for key in number_keys if not is_number(config[key])]
+    if not_numbers:
+        raise ValueError(f"These vehicle config values must be numbers: {', '.join(not_numbers)}")
+    for key in CURVE_KEYS:
+        curve = config[key]
+        if not isinstance(curve, (list, tuple)) or len(curve) < 2:
+            raise ValueError("Power and torque curves must have at least two points each")
+        if not all(isinstance(point, (list, tuple)) and len(point) == 2 and all(is_number(value) for value in point) for point in curve):
+            raise ValueError(f"{key} must be a list of [rpm, value] number pairs")
+    if not config.get('is_electric', False):
+        gear_ratios = config['gear_ratios']
+        if not isinstance(gear_ratios, (list, tuple)) or not gear_ratios or not all(is_number(ratio) and ratio > 0 for ratio in gear_ratios):
+            raise ValueError("gear_ratios must be a non-empty list of numbers greater than zero")
+    if config['mass'] <= 0:
+        raise ValueError("Vehicle mass must be greater than zero")
+    tire_for(config)  # Raises ValueError for an unknown tire
+    if config.get('driven_wheels', 1) <= 0 or not 0 < config.get('driven_load_share', 0.5) <= 1:
+        raise ValueError("driven_wheels must be greater than zero and driven_load_share in (0, 1]")
+    trailer_mass = data.get('trailer_mass')
+    if trailer_mass is not None and (not is_number(trailer_mass) or trailer_mass < 0):
+        raise ValueError("trailer_mass must be a number and can't be negative")
+    duration = float(data.get('duration', DEFAULT_DURATION))
+    time_step = float(data.get('time_step', DEFAULT_TIME_STEP))
+    if not 0 < duration <= MAX_DURATION or not 0 < time_step <= 1:
+        raise ValueError(f"duration must be in (0, {MAX_DURATION}] and time_step in (0, 1]")
+    return config, trailer_mass, duration, time_step
+
+
+def request_key(config, trailer_mass, duration, time_step):
+    key_text = json.dumps([config, trailer_mass, duration, time_step], sort_keys=True)
+    return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+
+def run_batch(configs, trailer_masses, duration, time_step, backend="numpy"):
+    # Runs in a worker process: one Fleet for the whole batch
+    from fleet import Fleet
+    names = [config.get('name', 'custom') for config in configs]
+    return Fleet(configs, trailer_masses, names=names, backend=backend).run(duration, time_step)
+
+
+class Metrics:
+    # Counters for the /metrics endpoint. All methods are called from several threads, hence the lock.
+    BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+
+    def __init__(self, latency_window=1000):
+        self.lock = threading.Lock()
+        self.requests_total = 0
+        self.errors_total = 0
+        self.cache_hits_total = 0
+        self.batches_total = 0
+        self.batched_vehicles_total = 0
+        self.batch_size_counts = [0] * len(self.BATCH_SIZE_BUCKETS)
+        self.latencies = collections.deque(maxlen=latency_window)  # Most recent request latencies in seconds
+
+    def record_request(self, latency, cache_hit=False, error=False):
+        with self.lock:
+            self.requests_total += 1
+            self.cache_hits_total += cache_hit
+            self.errors_total += error
+            self.latencies.append(latency)
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches_total += 1
+            self.batched_vehicles_total += size
+            for index, bucket in enumerate(self.BATCH_SIZE_BUCKETS):
+                if size <= bucket:
+                    self.batch_size_counts[index] += 1
+
+    def latency_quantile(self, quantile):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(math.ceil(quantile * len(ordered))) - 1)]
+
+    def render(self):
+        # OpenMetrics text format
+        with self.lock:
+            lines = [
+                "# TYPE sim_requests counter",
+                f"sim_requests_total {self.requests_total}",
+                "# TYPE sim_request_errors counter",
+                f"sim_request_errors_total {self.errors_total}",
+                "# TYPE sim_cache_hits counter",
+                f"sim_cache_hits_total {self.cache_hits_total}",
+                "# TYPE sim_batch_size histogram",
+            ]
+            for bucket, count in zip(self.BATCH_SIZE_BUCKETS, self.batch_size_counts):
+                lines.append(f'sim_batch_size_bucket{{le="{bucket}"}} {count}')
+            lines += [
+                f'sim_batch_size_bucket{{le="+Inf"}} {self.batches_total}',
+                f"sim_batch_size_count {self.batches_total}",
+                f"sim_batch_size_sum {self.batched_vehicles_total}",
+                "# TYPE sim_request_latency_seconds summary",
+                "# UNIT sim_request_latency_seconds seconds",
+            ]
+            for quantile in (0.5, 0.9, 0.99):
+                lines.append(f'sim_request_latency_seconds{{quantile="{quantile}"}} {self.latency_quantile(quantile):.6f}')
+            lines += [
+                f"sim_request_latency_seconds_count {len(self.latencies)}",
+                f"sim_request_latency_seconds_sum {sum(self.latencies):.6f}",
+                "# EOF",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class SimulationService:
+    def __init__(self, workers=None, batch_window=0.01, max_batch_size=256, cache_size=1024, backend="numpy"):
+        self.backend = backend  # physics backend name, see physics_backends.py
+        self.batch_window = batch_window  # seconds to wait for more requests before running a batch
+        self.max_batch_size = max_batch_size
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()  # Least recently used results get dropped first
+        self.cache_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.metrics = Metrics()
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.batcher = threading.Thread(target=self.batch_loop, daemon=True)
+        self.batcher.start()
+
+    def get_cached(self, key):
+        with self.cache_lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+            return result
+
+    def store_cached(self, key, result):
+        with self.cache_lock:
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def submit(self, config, trailer_mass, duration, time_step):
+        # Returns a Future with the result dictionary (see Fleet.results)
+        key = request_key(config, trailer_mass, duration, time_step)
+        future = Future()
+        cached = self.get_cached(key)
+        if cached is not None:
+            future.set_result(cached)
+            future.cache_hit = True
+            return future
+        future.cache_hit = False
+        self.queue.put((key, config, trailer_mass, duration, time_step, future))
+        return future
+
+    def batch_loop(self):
+        while True:
+            batch = [self.queue.get()]  # Wait for the first request
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.run_batches(batch)
+
+    def run_batches(self, batch):
+        # A Fleet runs with one duration and time step, so group by those. Identical requests run once.
+        groups = collections.defaultdict(dict)
+        for key, config, trailer_mass, duration, time_step, future in batch:
+            group = groups[(duration, time_step)]
+            if key in group:
+                group[key][2].append(future)
+            else:
+                group[key] = (config, trailer_mass, [future])
+        for (duration, time_step), group in groups.items():
+            self.metrics.record_batch(len(group))
+            self.submit_group(list(group), group, duration, time_step)
+
+    def submit_group(self, keys, group, duration, time_step):
+        configs = [group[key][0] for key in keys]
+        trailer_masses = [group[key][1] for key in keys]
+        batch_future = self.pool.submit(run_batch, configs, trailer_masses, duration, time_step, self.backend)
+        batch_future.add_done_callback(lambda done: self.finish_batch(done, keys, group, duration, time_step))
+
+    def finish_batch(self, batch_future, keys, group, duration, time_step):
+        try:
+            results = batch_future.result()
+        except Exception as e:
+            if len(keys) > 1:
+                # Don't let one bad config fail the requests batched with it: run every one on its own,
+                # so only the bad one gets the error
+                for key in keys:
+                    self.submit_group([key], {key: group[key]}, duration, time_step)
+                return
+            for key in keys:
+                for future in group[key][2]:
+                    future.set_exception(e)
+            return
+        for key, result in zip(keys, results):
+            self.store_cached(key, result)
+            for future in group[key][2]:
+                future.set_result(result)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SimulationRequestHandler(BaseHTTPRequestHandler):
+    service = None  # Set by make_server
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = self.service.metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        else:
+            self.send_json(404, {"error": "Not found. Use POST /simulate, GET /metrics or GET /health"})
+
+    def do_POST(self):
+        if self.path != "/simulate":
+            self.send_json(404, {"error": "Not found. Use POST /simulate"})
+            return
+        start_time = time.monotonic()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = validate_request(json.loads(self.rfile.read(length) or b"null"))
+        except (ValueError, TypeError) as e:
+            self.service.metrics.record_request(time.monotonic() - start_time, error=True)
+            self.send_json(400, {"error": str(e)})
+            return
+        future = self.service.submit(*request)
+        try:
+            result = future.result(timeout=REQUEST_TIMEOUT)
+        except Exception as e:
+            self.service.metrics.record_request(time.monotonic() - start_time, error=True)
+            self.send_json(500, {"error": f"Simulation failed: {e}"})
+            return
+        self.service.metrics.record_request(time.monotonic() - start_time, cache_hit=future.cache_hit)
+        self.send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet, /metrics has the numbers
+
+
+def make_server(port=8765, service=None):
+    # Only listens on localhost, this is not meant to be reachable from other machines
+    handler = type("Handler", (SimulationRequestHandler,), {"service": service or SimulationService()})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vehicle simulation service")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch-window", type=float, default=0.01, help="seconds to collect requests into a batch")
+    parser.add_argument("--backend", default="numpy",
+                        help="physics backend (reference, numpy, numba) or 'auto' for the fastest one that passes conformance.py")
+    args = parser.parse_args()
+
+    backend = args.backend
+    if backend == "auto":
+        from conformance import choose_backend
+        backend = choose_backend(fleet_size=256)
+        print(f"Using the {backend} physics backend")
+    service = SimulationService(workers=args.workers, batch_window=args.batch_window, backend=backend)
+    server = make_server(args.port, service)
+    print(f"Simulation service listening on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping simulation service")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# sprite_cache.py
+# This file keeps pictures that many objects share, so each one is loaded, scaled and rotated only once.
+# - load_image: every trailer of a road train uses the same picture, so it is loaded from disk once
+# - WheelSprites: wheels that use the same picture and size all spin at the same angle (they roll at the
+#   vehicle's speed), so one scaled and rotated wheel can be drawn for all of them. Rotations are rounded
+#   to a few degrees and kept, which turns the per-wheel smoothscale + rotate of every frame into a lookup.
+
+import pygame
+
+WHEEL_ANGLE_STEP = 3  # degrees. Rotated wheels are cached in steps of this size (120 pictures per wheel type at most)
+
+loaded_images = {}  # path -> surface
+
+
+def load_image(path):
+    # Loads a picture once and gives everybody the same surface. Don't draw on the returned surface!
+    image = loaded_images.get(path)
+    if image is None:
+        image = pygame.image.load(path).convert_alpha()
+        loaded_images[path] = image
+    return image
+
+
+class WheelSprites:
+    def __init__(self, angle_step=WHEEL_ANGLE_STEP):
+        self.angle_step = angle_step
+        self.scaled = {}  # (image, size, smooth) -> scaled surface
+        self.rotated = {}  # (image, size, smooth, angle) -> rotated surface
+
+    def get(self, image, size, angle, smooth=True):
+        # The wheel picture scaled to size and rotated clockwise by angle degrees.
+        # smooth picks smoothscale (nicer) or scale (faster), like the render quality governor does.
+        key = (image, tuple(size), smooth)
+        scaled = self.scaled.get(key)
+        if scaled is None:
+            scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+            scaled = scale(image, key[1])
+            self.scaled[key] = scaled
+        angle = int(round(angle / self.angle_step)) * self.angle_step % 360
+        rotated = self.rotated.get(key + (angle,))
+        if rotated is None:
+            rotated = pygame.transform.rotate(scaled, -angle)
+            self.rotated[key + (angle,)] = rotated
+        return rotated
+
+    def draw(self, screen, image, size, angle, origin, positions, smooth=True):
+        # Draws the same wheel centered on every position (relative to origin)
+        wheel = self.get(image, size, angle, smooth)
+        half_width = wheel.get_width() // 2
+        half_height = wheel.get_height() // 2
+        origin_x, origin_y = origin
+        screen.blits([(wheel, (origin_x + x - half_width, origin_y + y - half_height)) for x, y in positions], False)
+
+
+# One cache for the whole game
+wheel_sprites = WheelSprites()
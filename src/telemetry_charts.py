@@ -0,0 +1,173 @@
+# telemetry_charts.py
+# This file draws live strip charts next to the gauges: speed, RPM, gear, the wheel force against the resistance,
+# and the CO2 emitted so far.
+# - Every chart keeps its last CHART_WIDTH samples in ring buffers (NumPy arrays with a write position), so the
+#   memory and the drawing cost stay the same however long the run is.
+# - The chart is a surface that is kept between frames. For new samples it is scrolled to the left (Surface.scroll
+#   only moves memory) and only the newest columns are drawn, one vertical line per series and sample.
+# - A sample is taken every CHART_SAMPLE_STEPS physics steps, so the charts show simulated time and look the same
+#   at every time warp. The chart is drawn again from its ring buffers only when a frame brings more samples than
+#   fit in it (high time warp) or a value goes over the top of the chart (the range then grows by half, so that
+#   happens only a few times per run).
+# Press C in the simulation to show or hide the charts.
+
+import numpy as np
+import pygame
+from utils import kmh_to_mph, mps_to_kmh, mps_to_mph
+
+CHART_WIDTH = 400  # pixels, one sample per pixel column
+CHART_HEIGHT = 44
+CHART_GAP = 4
+CHART_SAMPLE_STEPS = 3  # physics steps per sample: 20 samples per simulated second, 20 seconds of history
+CHART_BACKGROUND = (0, 0, 0, 140)  # See-through, so the scenery still shows
+CHART_RANGE_GROWTH = 1.5
+CHART_COLORS = {
+    "speed": (80, 200, 255),
+    "rpm": (255, 90, 90),
+    "gear": (255, 220, 80),
+    "wheel_force": (90, 230, 90),
+    "resistance": (255, 150, 60),
+    "co2": (200, 200, 200),
+}
+
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.values = np.zeros(capacity)
+        self.capacity = capacity
+        self.count = 0  # Samples added since the start, the oldest ones are overwritten
+
+    def append(self, value):
+        self.values[self.count % self.capacity] = value
+        self.count += 1
+
+    def latest(self, n=None):
+        # The last n samples (all that are kept if n is None), oldest first
+        kept = min(self.count, self.capacity)
+        n = kept if n is None else min(n, kept)
+        end = self.count % self.capacity
+        return np.take(self.values, np.arange(end - n, end), mode="wrap")
+
+    def last(self):
+        return self.values[(self.count - 1) % self.capacity] if self.count else 0.0
+
+    def clear(self):
+        self.count = 0
+
+
+class StripChart:
+    def __init__(self, title, colors, high, width=CHART_WIDTH, height=CHART_HEIGHT):
+        # title is a format string for the latest values, e.g. "Speed {0:.0f} km/h". One color per series.
+        # high is the top of the chart at the start (the bottom is always 0).
+        self.title = title
+        self.colors = colors
+        self.buffers = [RingBuffer(width) for _ in colors]
+        self.high = max(high, 1e-6)
+        self.width = width
+        self.height = height
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.surface.fill(CHART_BACKGROUND)
+        self.drawn = 0  # Samples that are already on the surface
+        self.needs_full_redraw = False
+        self.last_y = [height - 1] * len(colors)  # Where the line of each series ended
+
+    def add(self, *values):
+        for buffer, value in zip(self.buffers, values):
+            buffer.append(value)
+        if max(values) > self.high:
+            self.high = max(values) * CHART_RANGE_GROWTH
+            self.needs_full_redraw = True
+
+    def value_to_y(self, value):
+        y = self.height - 1 - int(value / self.high * (self.height - 2))
+        return min(self.height - 1, max(0, y))
+
+    def draw_column(self, x, values):
+        for series, value in enumerate(values):
+            y = self.value_to_y(value)
+            pygame.draw.line(self.surface, self.colors[series], (x, self.last_y[series]), (x, y))
+            self.last_y[series] = y
+
+    def update(self):
+        # Brings the surface up to date with the ring buffers. Returns the number of columns drawn.
+        new = self.buffers[0].count - self.drawn
+        if self.needs_full_redraw or new >= self.width:
+            return self.redraw()
+        if new == 0:
+            return 0
+        self.surface.scroll(-new, 0)
+        self.surface.fill(CHART_BACKGROUND, (self.width - new, 0, new, self.height))
+        columns = zip(*[buffer.latest(new) for buffer in self.buffers])
+        for column, values in enumerate(columns):
+            self.draw_column(self.width - new + column, values)
+        self.drawn += new
+        return new
+
+    def redraw(self):
+        # Draws every kept sample again (after the range changed, or when the surface is too far behind)
+        self.surface.fill(CHART_BACKGROUND)
+        series = [buffer.latest() for buffer in self.buffers]
+        kept = len(series[0])
+        self.last_y = [self.value_to_y(values[0]) if kept else self.height - 1 for values in series]
+        for column, values in enumerate(zip(*series)):
+            self.draw_column(self.width - kept + column, values)
+        self.drawn = self.buffers[0].count
+        self.needs_full_redraw = False
+        return kept
+
+    def get_title(self):
+        return self.title.format(*[buffer.last() for buffer in self.buffers])
+
+
+class TelemetryCharts:
+    def __init__(self, vehicle, use_metric=True, sample_steps=CHART_SAMPLE_STEPS):
+        self.use_metric = use_metric
+        self.sample_steps = sample_steps
+        self.visible = True
+        self.font = None
+        self.reset(vehicle)
+
+    def reset(self, vehicle):
+        # Empty charts for a new run (restart, or the vehicle drove off the screen)
+        self.steps = 0
+        speed_unit = "km/h" if self.use_metric else "mph"
+        co2_unit = "kg" if self.use_metric else "lbs"
+        max_speed = vehicle.max_speed if self.use_metric else kmh_to_mph(vehicle.max_speed)
+        self.speed = StripChart("Speed {0:.0f} " + speed_unit, [CHART_COLORS["speed"]], max_speed * 1.1)
+        self.rpm = StripChart("RPM {0:.0f}", [CHART_COLORS["rpm"]], vehicle.max_rpm * 1.05)
+        self.gear = None if vehicle.is_electric else StripChart("Gear {0:.0f}", [CHART_COLORS["gear"]], len(vehicle.gear_ratios) + 0.5)
+        # The force range starts at about what the tires can grip and grows if needed
+        self.forces = StripChart("Wheel force {0:.1f} kN, resistance {1:.1f} kN",
+                                 [CHART_COLORS["wheel_force"], CHART_COLORS["resistance"]], vehicle.total_mass * 9.81 * 0.5 / 1000)
+        self.co2 = StripChart("CO2 {0:.2f} " + co2_unit, [CHART_COLORS["co2"]], 0.05)
+        self.charts = [chart for chart in (self.speed, self.rpm, self.gear, self.forces, self.co2) if chart is not None]
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def sample(self, vehicle):
+        # Call after every physics step, it only records every sample_steps steps
+        self.steps += 1
+        if self.steps % self.sample_steps:
+            return
+        speed = mps_to_kmh(vehicle.speed) if self.use_metric else mps_to_mph(vehicle.speed)
+        self.speed.add(speed)
+        self.rpm.add(vehicle.current_rpm)
+        if self.gear is not None:
+            self.gear.add(vehicle.current_gear)
+        self.forces.add(vehicle.wheel_force / 1000, vehicle.calculate_resistance_force() / 1000)
+        self.co2.add(vehicle.co2_emissions if self.use_metric else vehicle.co2_emissions * 2.20462)  # kg to lbs
+
+    def draw(self, screen):
+        # Stacked on the left of the speed gauge, above the bottom edge
+        if not self.visible:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        x = screen.get_width() - 390 - CHART_WIDTH
+        y = screen.get_height() - 10 - len(self.charts) * (CHART_HEIGHT + CHART_GAP)
+        for chart in self.charts:
+            chart.update()
+            screen.blit(chart.surface, (x, y))
+            screen.blit(self.font.render(chart.get_title(), True, (255, 255, 255)), (x + 4, y + 3))
+            y += CHART_HEIGHT + CHART_GAP
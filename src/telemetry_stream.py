@@ -0,0 +1,283 @@
+# telemetry_stream.py
+# This file sends live telemetry (speed, RPM, gear, throttle, CO2) of the running simulation over UDP, so
+# dashboards on the same machine can show it. It only sends to localhost.
+# - Every tick of every vehicle becomes one record of RECORD_SIZE bytes with a fixed layout (RECORD_DTYPE,
+#   little-endian). Records are collected into a datagram: a DATAGRAM_HEADER and as many records as fit in
+#   DATAGRAM_SIZE bytes. A datagram is sent when it is full or FLUSH_INTERVAL seconds after its first record,
+#   so one vehicle at 60 ticks per second sends a few ticks per datagram and a big fleet fills them at once.
+# - The game loop only copies the values into a NumPy array and hands full datagrams to a sender thread through
+#   a bounded queue. If the queue is full the datagram is dropped and counted, the game never waits.
+# - A fleet (see fleet.py) is published with one call, all its vehicles at once.
+# - The header has a sequence number, so a receiver can count the datagrams it lost, and the number of
+#   datagrams the publisher had to drop.
+# Press U in the simulation to start or stop sending, or start the game with: python main.py --telemetry-port 47800
+#
+# The reference receiver prints what arrives. Run it from the src folder with:  python telemetry_stream.py receive
+# To try it with many vehicles without the game:                                python telemetry_stream.py send --vehicles 1000
+
+import argparse
+import queue
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+TELEMETRY_HOST = "127.0.0.1"
+TELEMETRY_PORT = 47800
+DATAGRAM_SIZE = 8192  # bytes. Localhost has no 1500-byte network limit, this is well inside the socket buffers
+FLUSH_INTERVAL = 0.05  # seconds, the longest a record waits for its datagram to fill up
+SEND_QUEUE_SIZE = 256  # datagrams waiting for the sender thread
+DATAGRAM_MAGIC = b"VDT1"
+DATAGRAM_HEADER = struct.Struct("<4sIHHI")  # magic, sequence number, record count, record size, datagrams dropped so far
+FLAG_SHIFTING = 1
+FLAG_ELECTRIC = 2
+
+# One record per vehicle and tick, 32 bytes
+RECORD_DTYPE = np.dtype([
+    ("vehicle", "<u4"),  # vehicle number (the row in a fleet, 0 in the game)
+    ("flags", "<u2"),  # FLAG_SHIFTING, FLAG_ELECTRIC
+    ("gear", "<i2"),
+    ("time", "<f8"),  # s of simulated time
+    ("speed", "<f4"),  # m/s
+    ("rpm", "<f4"),
+    ("throttle", "<f4"),  # 0 to 1
+    ("co2", "<f4"),  # kg emitted since the start
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+class TelemetryPublisher:
+    def __init__(self, port=TELEMETRY_PORT, host=TELEMETRY_HOST, datagram_size=DATAGRAM_SIZE,
+                 flush_interval=FLUSH_INTERVAL, queue_size=SEND_QUEUE_SIZE):
+        self.address = (host, port)
+        self.capacity = (datagram_size - DATAGRAM_HEADER.size) // RECORD_SIZE  # records per datagram
+        self.flush_interval = flush_interval
+        self.pending = np.zeros(self.capacity, dtype=RECORD_DTYPE)  # The datagram being filled
+        self.count = 0  # Records in pending
+        self.first_record_time = 0.0
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sequence = 0
+        self.sent = 0
+        self.dropped = 0  # Datagrams dropped because the sender thread was behind
+        self.errors = 0
+        self.socket = None
+        self.sender = None
+
+    def start(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender = threading.Thread(target=self.send_datagrams, name="telemetry-sender", daemon=True)
+        self.sender.start()
+        print(f"Sending telemetry to udp://{self.address[0]}:{self.address[1]}")
+        return self
+
+    def publish_record(self, time_s, speed, rpm, gear, throttle, co2, vehicle=0, flags=0):
+        # One tick of one vehicle (a tuple into the record array is much faster than publish for a single record)
+        if self.sender is None:
+            return
+        if self.count == 0:
+            self.first_record_time = time.perf_counter()
+        self.pending[self.count] = (vehicle, flags, gear, time_s, speed, rpm, throttle, co2)
+        self.count += 1
+        if self.count == self.capacity or time.perf_counter() - self.first_record_time >= self.flush_interval:
+            self.flush()
+
+    def publish(self, time_s, speed, rpm, gear, throttle, co2, vehicle=0, flags=0):
+        # One tick of many vehicles. Every value can be a number or an array (one value per vehicle).
+        if self.sender is None:
+            return
+        columns = np.broadcast_arrays(vehicle, flags, gear, time_s, speed, rpm, throttle, co2)
+        total = columns[0].size
+        done = 0
+        while done < total:
+            if self.count == 0:
+                self.first_record_time = time.perf_counter()
+            take = min(total - done, self.capacity - self.count)
+            records = self.pending[self.count:self.count + take]
+            for name, values in zip(RECORD_DTYPE.names, columns):
+                records[name] = values.reshape(-1)[done:done + take]
+            self.count += take
+            done += take
+            if self.count == self.capacity:
+                self.flush()
+        if self.count and time.perf_counter() - self.first_record_time >= self.flush_interval:
+            self.flush()
+
+    def publish_vehicle(self, vehicle, vehicle_number=0):
+        # The game's Vehicle, call after every physics step
+        shifting = vehicle.gear_system and vehicle.gear_system.shifting
+        flags = (FLAG_SHIFTING if shifting else 0) | (FLAG_ELECTRIC if vehicle.is_electric else 0)
+        self.publish_record(vehicle.time_elapsed, vehicle.speed, vehicle.current_rpm, vehicle.current_gear, vehicle.throttle,
+                            vehicle.co2_emissions, vehicle_number, flags)
+
+    def publish_fleet(self, fleet):
+        # Every vehicle of a Fleet, call after every fleet.step
+        flags = np.where(fleet.shifting, FLAG_SHIFTING, 0) | np.where(fleet.is_electric, FLAG_ELECTRIC, 0)
+        self.publish(fleet.time_elapsed, fleet.speed, fleet.current_rpm, fleet.current_gear, fleet.throttle,
+                     fleet.co2_emissions, fleet.rows, flags)
+
+    def flush(self):
+        # Hands the pending records to the sender thread as one datagram (or drops it if the queue is full)
+        if self.count == 0:
+            return
+        header = DATAGRAM_HEADER.pack(DATAGRAM_MAGIC, self.sequence, self.count, RECORD_SIZE, self.dropped)
+        datagram = header + self.pending[:self.count].tobytes()
+        self.sequence = (self.sequence + 1) & 0xffffffff
+        self.count = 0
+        try:
+            self.queue.put_nowait(datagram)
+        except queue.Full:
+            self.dropped += 1
+
+    def send_datagrams(self):
+        # The sender thread. A None in the queue means "stop".
+        while True:
+            datagram = self.queue.get()
+            if datagram is None:
+                break
+            try:
+                self.socket.sendto(datagram, self.address)
+                self.sent += 1
+            except OSError:
+                self.errors += 1  # Nobody listening is fine for UDP, but a full socket buffer can end up here
+
+    def stop(self):
+        # Sends what is still pending, then stops the sender thread
+        if self.sender is None:
+            return
+        self.flush()
+        self.queue.put(None)
+        self.sender.join()
+        self.sender = None
+        self.socket.close()
+        print(f"Telemetry stopped: {self.sent} datagrams sent, {self.dropped} dropped")
+
+    def get_hud_text(self):
+        text = f"UDP :{self.address[1]}  {self.sent} datagrams"
+        if self.dropped:
+            text += f", {self.dropped} dropped"
+        return text
+
+
+class TelemetryToggle:
+    # The U key in the simulation: starts a TelemetryPublisher, or stops the one that is running
+    def __init__(self, port=TELEMETRY_PORT):
+        self.port = port
+        self.publisher = None
+        self.font = None
+
+    def toggle(self):
+        if self.publisher is None:
+            self.publisher = TelemetryPublisher(self.port).start()
+        else:
+            self.stop()
+
+    def publish_vehicle(self, vehicle):
+        if self.publisher is not None:
+            self.publisher.publish_vehicle(vehicle)
+
+    def draw_status(self, screen):
+        # Under the recording status, on the right edge
+        if self.publisher is None:
+            return
+        import pygame  # Only the game draws, the publisher itself works without pygame
+        if self.font is None:
+            self.font = pygame.font.Font(None, 24)
+        text = self.font.render(self.publisher.get_hud_text(), True, (255, 80, 80) if self.publisher.dropped else (255, 255, 255))
+        screen.blit(text, (screen.get_width() - text.get_width() - 10, 306))
+
+    def stop(self):
+        if self.publisher is not None:
+            self.publisher.stop()
+            self.publisher = None
+
+
+def parse_datagram(datagram):
+    # Returns (sequence number, datagrams dropped by the publisher, records array) of a received datagram
+    magic, sequence, count, record_size, dropped = DATAGRAM_HEADER.unpack_from(datagram)
+    if magic != DATAGRAM_MAGIC or record_size != RECORD_SIZE:
+        raise ValueError("Not a telemetry datagram of this version")
+    records = np.frombuffer(datagram, dtype=RECORD_DTYPE, count=count, offset=DATAGRAM_HEADER.size)
+    return sequence, dropped, records
+
+
+def receive(port=TELEMETRY_PORT, host=TELEMETRY_HOST, report_interval=1.0):
+    # The reference receiver: prints the datagram counts and the latest values of vehicles 0 to 4 once per second
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    receiver.bind((host, port))
+    receiver.settimeout(report_interval)
+    print(f"Listening on udp://{host}:{port}, Ctrl+C to stop")
+    latest = {}
+    datagrams = records_received = lost = 0
+    expected = None
+    next_report = time.perf_counter() + report_interval
+    try:
+        while True:
+            try:
+                sequence, dropped, records = parse_datagram(receiver.recv(65536))
+                datagrams += 1
+                records_received += len(records)
+                if expected is not None and sequence != expected:
+                    lost += (sequence - expected) & 0xffffffff
+                expected = (sequence + 1) & 0xffffffff
+                for record in records[records["vehicle"] < 5]:
+                    latest[int(record["vehicle"])] = record
+            except socket.timeout:
+                pass
+            except ValueError as e:
+                print(f"Skipped a datagram: {e}")
+            if time.perf_counter() >= next_report:
+                next_report += report_interval
+                print(f"{datagrams} datagrams, {records_received} records, {lost} lost or dropped")
+                for number in sorted(latest)[:5]:
+                    record = latest[number]
+                    print(f"    vehicle {number}: t {record['time']:.2f} s, {record['speed'] * 3.6:.1f} km/h, "
+                          f"{record['rpm']:.0f} RPM, gear {record['gear']}, CO2 {record['co2']:.3f} kg")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+
+
+def send_fleet(vehicles, port=TELEMETRY_PORT, duration=60.0, delta_time=1 / 60):
+    # Runs a fleet launch in real time and publishes every tick, to try a receiver without the game
+    from vehicle_configs import VEHICLE_CONFIGS
+    from results_cache import default_runs
+    from fleet import Fleet
+    runs = default_runs()
+    runs = [runs[row % len(runs)] for row in range(vehicles)]
+    fleet = Fleet([VEHICLE_CONFIGS[vehicle_type] for vehicle_type, _ in runs], [mass for _, mass in runs],
+                  names=[vehicle_type for vehicle_type, _ in runs])
+    fleet.reset()
+    fleet.start()
+    publisher = TelemetryPublisher(port).start()
+    start_time = time.perf_counter()
+    try:
+        while fleet.time_elapsed < duration:
+            fleet.step(delta_time)
+            publisher.publish_fleet(fleet)
+            wait = start_time + fleet.time_elapsed - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live telemetry over UDP: the reference receiver, or a test sender")
+    parser.add_argument("mode", choices=["receive", "send"])
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT)
+    parser.add_argument("--vehicles", type=int, default=100, help="send: vehicles in the test fleet")
+    parser.add_argument("--duration", type=float, default=60.0, help="send: seconds of simulated (and real) time")
+    args = parser.parse_args()
+    if args.mode == "receive":
+        receive(args.port)
+    else:
+        send_fleet(args.vehicles, args.port, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# time_warp.py
+# This file defines the TimeWarp controller, which lets the physics run faster than real time
+# (2x, 10x, 100x or "as fast as possible") while the screen still renders at 60 FPS.
+# The physics always advances in fixed steps of PHYSICS_TIME_STEP (the same step the headless runs use),
+# no matter how fast we warp. Every frame we add the real frame time times the warp factor to a
+# "time debt" and run as many fixed steps as fit into it. That way the 0-100 km/h time, the time in each
+# gear and the emissions are the same at 1x and 100x, only the wait is shorter.
+# The steps of one frame may only take part of the frame budget, so the window stays responsive.
+# If the machine can't keep up, the warp is limited to what fits and the HUD shows the real speed.
+
+import time
+
+PHYSICS_TIME_STEP = 1 / 60  # seconds of simulated time per physics step (same as headless.py)
+MAX_WARP = None  # "as fast as possible"
+TIME_WARP_FACTORS = [1, 2, 10, 100, MAX_WARP]
+
+
+class TimeWarp:
+    def __init__(self, target_fps=60, factors=None, physics_share=0.6):
+        self.factors = factors if factors is not None else TIME_WARP_FACTORS
+        self.factor_index = 0
+        self.frame_budget = 1.0 / target_fps
+        self.physics_budget = self.frame_budget * physics_share  # wall seconds the physics may use per frame
+        self.time_debt = 0.0  # simulated seconds we still have to catch up on
+        self.achieved_warp = 1.0  # smoothed real warp factor, for the HUD
+        self.smoothing_factor = 0.1
+
+    @property
+    def factor(self):
+        return self.factors[self.factor_index]
+
+    def cycle(self):
+        # Next warp factor (the button and the T key go 1x -> 2x -> 10x -> 100x -> Max -> 1x)
+        self.factor_index = (self.factor_index + 1) % len(self.factors)
+        self.time_debt = 0.0
+        print(f"Time warp set to {self.get_label()}")
+
+    def reset(self):
+        self.time_debt = 0.0
+        self.achieved_warp = 1.0
+
+    def get_label(self):
+        return "Max" if self.factor is MAX_WARP else f"{self.factor}x"
+
+    def advance(self, frame_time, step):
+        # Runs the physics for one rendered frame. frame_time is the real time since the last frame (seconds).
+        # step() does one physics step of PHYSICS_TIME_STEP and returns False to stop early (e.g. after a reset).
+        # Returns the simulated time that was advanced.
+        if self.factor is MAX_WARP:
+            self.time_debt = float("inf")
+        else:
+            self.time_debt += frame_time * self.factor
+
+        start = time.perf_counter()
+        simulated = 0.0
+        while self.time_debt >= PHYSICS_TIME_STEP:
+            keep_going = step()
+            self.time_debt -= PHYSICS_TIME_STEP
+            simulated += PHYSICS_TIME_STEP
+            # Always do at least one step, then stop when this frame's physics budget is used up
+            if not keep_going or time.perf_counter() - start >= self.physics_budget:
+                break
+
+        if self.time_debt >= PHYSICS_TIME_STEP:
+            # We couldn't keep up. Forget the rest instead of trying to catch up later (that would never end).
+            self.time_debt = 0.0
+        if frame_time > 0:
+            self.achieved_warp += (simulated / frame_time - self.achieved_warp) * self.smoothing_factor
+        return simulated
+
+    def get_hud_text(self):
+        text = f"Warp: {self.get_label()}"
+        # Show the real speed when we are well below the requested one (or always for Max)
+        if self.factor is MAX_WARP or self.achieved_warp < self.factor * 0.9:
+            text += f" ({self.achieved_warp:.0f}x)"
+        return text
@@ -0,0 +1,413 @@
+# traffic.py
+# This file simulates traffic on one lane: many vehicles (truck platoons, mixed cars and trucks) that follow
+# each other, instead of the single vehicle of the game.
+# - Every driver follows the vehicle in front with the Intelligent Driver Model (IDM): it wants to drive at its
+#   desired speed, but keeps a gap of at least MINIMUM_GAP plus DESIRED_TIME_GAP seconds of driving, and brakes
+#   harder the faster it closes in on the leader. The IDM gives a wanted acceleration, the same throttle and brake
+#   driver as the drive cycles (SpeedController in drive_cycle.py) turns it into throttle or brakes, so the engines,
+#   gears and tires are the ones of the game. The fuel and CO2 come from the work done at the wheels, like in the
+#   drive cycles (Fleet.calculate_fuel_from_work).
+# - All the vehicles are one Fleet (see fleet.py), so a tick is a few array operations for the whole lane.
+#   Traffic steps at TRAFFIC_TIME_STEP (20 Hz, like the drive cycles), so 10,000 vehicles run faster than real time
+#   with the numpy backend, and much faster with numba.
+# - Who follows whom comes from an index of the vehicles sorted by position (order, from the back to the front).
+#   On one lane nobody passes, so the order almost never changes: every tick one array comparison checks that it is
+#   still sorted, and only if it isn't (after a crash) the nearly sorted order is sorted again, which is quick.
+#   The leader of every vehicle is kept in an array and only changes when the order does.
+# - The road is a ring (the front vehicle follows the last one, like a test track) or an open road (the front
+#   vehicle has a free road). Positions are the front bumpers in meters, and keep growing around the ring.
+# - The viewer draws the lane from the side and follows one vehicle. It finds the vehicles inside the window with
+#   two binary searches on the sorted positions, and only draws those, so 10,000 vehicles cost the same to draw as 20.
+#   The vehicles it draws get a level of detail (see level_of_detail.py): turning wheels near the followed vehicle,
+#   one still picture further away and flat rectangles when zoomed far out. The QualityGovernor (quality.py) lowers
+#   the detail when the frames take too long.
+#
+# Run it from the src folder with:  python traffic.py --vehicles 200 --mix "Semi truck=1,Compact car=3" --platoon-size 4
+# or without a window:             python traffic.py --vehicles 10000 --headless --duration 120 --backend numba
+
+import argparse
+import functools
+import math
+import os
+import struct
+import time
+import numpy as np
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS, PICTURE_PIXELS_PER_METER
+from fleet import Fleet
+from drive_cycle import SpeedController
+
+PROJECT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAFFIC_TIME_STEP = 0.05  # seconds. The drivers react much slower than that, 20 Hz is plenty
+
+# Intelligent Driver Model settings
+DESIRED_TIME_GAP = 1.5  # s, the gap a driver keeps, in seconds of driving at its speed
+PLATOON_TIME_GAP = 0.6  # s, trucks in a platoon (a truck behind a truck, with --platoon-size) follow closer
+MINIMUM_GAP = 2.0  # m, bumper to bumper when standing in a queue
+MAX_ACCELERATION = 1.5  # m/s^2, the most a driver asks for (less for heavy vehicles, see max_acceleration)
+COMFORT_DECELERATION = 2.0  # m/s^2, how hard a driver likes to brake
+EMERGENCY_DECELERATION = 9.0  # m/s^2, the most a driver asks for in an emergency (the tires decide what it gets)
+ACCELERATION_EXPONENT = 4  # How quickly a driver stops accelerating near its desired speed
+SPEED_LIMIT = 100  # km/h
+DESIRED_SPEED_SPREAD = 0.08  # Drivers want the speed limit +- this part of it (normal distribution)
+
+DEFAULT_LENGTH = 4.5  # m, for vehicles whose picture can't be read
+DEFAULT_MIX = "Compact car=4,Electric car=2,Pickup truck=2,Sports car=1,Semi truck=1"
+
+
+@functools.lru_cache(maxsize=None)
+def picture_width(path):
+    # Width in pixels of a PNG picture, read from its header so no pygame is needed. None if it can't be read.
+    try:
+        with open(os.path.join(PROJECT_FOLDER, path), "rb") as picture:
+            header = picture.read(24)
+    except OSError:
+        return None
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    return struct.unpack(">I", header[16:20])[0]
+
+
+def vehicle_length(config, trailer_mass=None):
+    # Length in meters of a vehicle (and its trailer), from its picture at the game's scale, like the game shows it.
+    # A config may also give its length in meters as "length".
+    if "length" in config:
+        return float(config["length"])
+    width = picture_width(config.get("image_path", ""))
+    if width is None:
+        return DEFAULT_LENGTH
+    left, right = 0, width
+    if trailer_mass is not None:
+        trailer = TRAILER_CONFIGS["Standard trailer"]
+        trailer_left = trailer["initial_position"][0]
+        left = min(left, trailer_left)
+        right = max(right, trailer_left + (picture_width(trailer["image_path"]) or 0))
+    return (right - left) / PICTURE_PIXELS_PER_METER
+
+
+def parse_mix(text):
+    # "Semi truck=1,Compact car=3" -> {"Semi truck": 1.0, "Compact car": 3.0}
+    mix = {}
+    for part in text.split(","):
+        name, _, share = part.partition("=")
+        name = name.strip()
+        if name not in VEHICLE_CONFIGS:
+            raise ValueError(f"Unknown vehicle {name!r}, choose from {', '.join(VEHICLE_CONFIGS)}")
+        try:
+            mix[name] = float(share) if share else 1.0
+        except ValueError:
+            raise ValueError(f"The share of {name} must be a number, not {share!r}")
+        if mix[name] < 0:
+            raise ValueError(f"The share of {name} can't be negative")
+    if sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one vehicle with a share above 0")
+    return mix
+
+
+def make_runs(mix, count, platoon_size=1, trailer_mass=None, seed=None):
+    # count runs [(vehicle type, trailer mass or None)] in the shares of mix, in a random order from the back to the
+    # front. With platoon_size above 1 the trucks drive in groups of that many, one right behind the other.
+    # Trucks pull the "Standard trailer" with trailer_mass (kg), its own mass if None.
+    total = sum(mix.values())
+    exact = {name: count * share / total for name, share in mix.items()}
+    counts = {name: int(value) for name, value in exact.items()}
+    # The vehicles left over by rounding down go to the biggest remainders
+    for name in sorted(exact, key=lambda name: counts[name] - exact[name])[:count - sum(counts.values())]:
+        counts[name] += 1
+    units = []
+    for name, number in counts.items():
+        group = platoon_size if VEHICLE_CONFIGS[name].get("is_truck", False) else 1
+        units += [[name] * min(group, number - start) for start in range(0, number, group)]
+    np.random.default_rng(seed).shuffle(units)
+    if trailer_mass is None:
+        trailer_mass = TRAILER_CONFIGS["Standard trailer"]["mass"]  # Same rule as headless.make_headless_vehicle
+    return [(name, trailer_mass if VEHICLE_CONFIGS[name].get("is_truck", False) else None)
+            for unit in units for name in unit]
+
+
+class Traffic:
+    # One lane of runs [(vehicle type, trailer mass or None), ...], listed from the back to the front.
+    # road_length is the length of the ring road in meters, None for an open road.
+    def __init__(self, runs, road_length=None, speed_limit=SPEED_LIMIT, platoon_time_gap=None, seed=None,
+                 backend="numpy", configs=None):
+        if configs is None:
+            configs = [VEHICLE_CONFIGS[vehicle_type] for vehicle_type, _ in runs]
+        self.runs = runs
+        self.fleet = Fleet(configs, [trailer_mass for _, trailer_mass in runs], names=[name for name, _ in runs],
+                           seed=seed, backend=backend)
+        self.fleet.fuel_cut_off = True
+        self.fleet.fuel_from_work = True  # The driver sets the throttle, so the fuel comes from the work done, like in drive cycles
+        fleet = self.fleet
+        self.count = fleet.count
+        self.road_length = road_length
+        self.length = np.array([vehicle_length(config, trailer_mass) for config, (_, trailer_mass) in zip(configs, runs)])
+        self.is_truck = np.array([bool(config.get("is_truck", False)) for config in configs])
+        if road_length is not None and road_length < (self.length + MINIMUM_GAP).sum():
+            raise ValueError(f"{self.count} vehicles need a ring road of at least "
+                             f"{(self.length + MINIMUM_GAP).sum():.0f} m, not {road_length:.0f} m")
+
+        # The drivers. Heavy vehicles ask for less acceleration: about what their peak power gives at 20 m/s
+        rng = np.random.default_rng(seed)
+        spread = np.clip(rng.normal(1.0, DESIRED_SPEED_SPREAD, self.count), 0.7, 1.3)
+        self.desired_speed = np.minimum(speed_limit / 3.6 * spread, fleet.max_speed * 0.95)  # m/s
+        peak_power = fleet.power_y.max(axis=1) * 1000  # W
+        self.max_acceleration = np.clip(peak_power / (fleet.total_mass * 20.0), 0.3, MAX_ACCELERATION)
+        self.time_gap = np.full(self.count, DESIRED_TIME_GAP)
+        self.platoon_time_gap = platoon_time_gap
+        self.reset()
+
+    def reset(self):
+        # On a ring road the vehicles stand evenly spread around it, on an open road they wait in a queue
+        # MINIMUM_GAP apart (like at a traffic light). The back vehicle's front bumper is at its length.
+        fleet = self.fleet
+        fleet.reset()
+        spare = 0.0 if self.road_length is None else (self.road_length - (self.length + MINIMUM_GAP).sum()) / self.count
+        fleet.position[:] = np.cumsum(self.length + MINIMUM_GAP + spare) - MINIMUM_GAP - spare
+        self.driver = SpeedController(fleet)
+        self.order = np.argsort(fleet.position, kind="stable")  # Rows from the back to the front
+        self.leader = np.zeros(self.count, dtype=int)
+        self.link_leaders()
+        self.gap = np.zeros(self.count)
+        self.update_gaps()
+        self.reorders = 0  # How often the order had to be sorted again
+        self.collisions = 0  # Ticks in which some gap was below zero
+        self.smallest_gap = math.inf  # m, over the whole run
+
+    def link_leaders(self):
+        self.leader[self.order[:-1]] = self.order[1:]
+        self.leader[self.order[-1]] = self.order[0]  # Only used on a ring road: the front follows the back
+        # A platoon truck only keeps the short gap behind another truck
+        if self.platoon_time_gap is not None:
+            platoon = self.is_truck & self.is_truck[self.leader]
+            self.time_gap = np.where(platoon, self.platoon_time_gap, DESIRED_TIME_GAP)
+
+    def update_order(self):
+        # The sorted index only has to change if somebody got in front of the vehicle ahead of it
+        positions = self.fleet.position[self.order]
+        if (positions[1:] < positions[:-1]).any():
+            self.order = self.order[np.argsort(positions, kind="stable")]  # Nearly sorted, so this is fast
+            self.link_leaders()
+            self.reorders += 1
+
+    def update_gaps(self):
+        # Bumper to bumper distance to the leader, in meters
+        position = self.fleet.position
+        self.gap[:] = position[self.leader] - self.length[self.leader] - position
+        front = self.order[-1]
+        self.gap[front] = self.gap[front] + self.road_length if self.road_length is not None else math.inf
+
+    def idm_acceleration(self):
+        # The Intelligent Driver Model, for every driver at once
+        speed = self.fleet.speed
+        closing_speed = speed - speed[self.leader]
+        if self.road_length is None:
+            closing_speed[self.order[-1]] = 0.0  # Free road in front
+        wanted_gap = MINIMUM_GAP + np.maximum(0.0, speed * self.time_gap + speed * closing_speed /
+                                              (2 * np.sqrt(self.max_acceleration * COMFORT_DECELERATION)))
+        gap = np.maximum(self.gap, 0.1)
+        acceleration = self.max_acceleration * (1 - (speed / self.desired_speed) ** ACCELERATION_EXPONENT
+                                                - (wanted_gap / gap) ** 2)
+        return np.maximum(acceleration, -EMERGENCY_DECELERATION)
+
+    def start(self):
+        self.fleet.start()
+
+    def step(self, delta_time=TRAFFIC_TIME_STEP):
+        self.driver.accelerate(self.idm_acceleration())
+        self.fleet.step(delta_time)
+        self.driver.learn()
+        self.update_order()
+        self.update_gaps()
+        smallest = self.gap.min()
+        self.smallest_gap = min(self.smallest_gap, smallest)
+        if smallest < 0:
+            self.collisions += 1
+
+    def visible(self, left, right):
+        # Rows and positions (front bumpers, m) of the vehicles that are at least partly between left and right.
+        # On a ring road every vehicle is also at its position +- the road length, so those copies are searched too.
+        positions = self.fleet.position[self.order]
+        longest = self.length.max()
+        shifts = [0.0] if self.road_length is None else [-self.road_length, 0.0, self.road_length]
+        rows = []
+        fronts = []
+        for shift in shifts:
+            start = np.searchsorted(positions, left - shift, side="left")
+            end = np.searchsorted(positions, right - shift + longest, side="right")
+            if start < end:
+                found = self.order[start:end]
+                found_fronts = positions[start:end] + shift
+                inside = found_fronts - self.length[found] < right
+                rows.append(found[inside])
+                fronts.append(found_fronts[inside])
+        if not rows:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        return np.concatenate(rows), np.concatenate(fronts)
+
+    def statistics(self):
+        fleet = self.fleet
+        mean_speed = float(fleet.speed.mean())
+        distance_km = fleet.distance_traveled.sum() / 1000
+        stats = {
+            "vehicles": self.count,
+            "time_simulated": fleet.time_elapsed,
+            "mean_speed_kmh": mean_speed * 3.6,
+            "smallest_gap_m": float(self.smallest_gap),
+            "collision_ticks": self.collisions,
+            "reorders": self.reorders,
+            "co2_g_per_km": float(fleet.co2_emissions.sum() * 1000 / distance_km) if distance_km > 0 else 0.0,
+        }
+        if self.road_length is not None:
+            density = self.count / (self.road_length / 1000)  # vehicles per km
+            stats["density_per_km"] = density
+            stats["flow_per_hour"] = density * mean_speed * 3.6
+        return stats
+
+
+def print_statistics(stats):
+    print(f"{stats['vehicles']} vehicles, {stats['time_simulated']:.0f} s simulated")
+    print(f"  mean speed    {stats['mean_speed_kmh']:8.1f} km/h")
+    if "flow_per_hour" in stats:
+        print(f"  density       {stats['density_per_km']:8.1f} vehicles/km")
+        print(f"  flow          {stats['flow_per_hour']:8.0f} vehicles/h")
+    print(f"  smallest gap  {stats['smallest_gap_m']:8.2f} m ({stats['collision_ticks']} ticks with a collision)")
+    print(f"  CO2           {stats['co2_g_per_km']:8.1f} g/km (all vehicles)")
+
+
+def run_headless(traffic, duration, delta_time=TRAFFIC_TIME_STEP):
+    traffic.start()
+    start_time = time.perf_counter()
+    while traffic.fleet.time_elapsed < duration:
+        traffic.step(delta_time)
+    wall_time = time.perf_counter() - start_time
+    print(f"Stepped {traffic.count} vehicles for {traffic.fleet.time_elapsed:.0f} s in {wall_time:.2f} s "
+          f"({traffic.fleet.time_elapsed / max(wall_time, 1e-9):.1f}x real time, "
+          f"{wall_time / max(traffic.fleet.time_elapsed / delta_time, 1) * 1000:.2f} ms per tick)")
+    print_statistics(traffic.statistics())
+
+
+def run_viewer(traffic, width=1200, height=800, pixels_per_meter=8):
+    # A window with the lane seen from the side, following one vehicle (the back of the queue at first).
+    # Left/Right: follow the vehicle behind/in front, +/-: zoom, T: time warp, Space: pause, Esc: quit.
+    import pygame
+    from time_warp import TimeWarp
+    from quality import QualityGovernor
+    from level_of_detail import LevelOfDetail
+
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Vehicle Simulator - Traffic")
+    font = pygame.font.Font(None, 30)
+    clock = pygame.time.Clock()
+    level_of_detail = LevelOfDetail()
+    quality = QualityGovernor(target_fps=60)
+    time_warp = TimeWarp(target_fps=60)
+    # What a vehicle looks like: (vehicle type, has a trailer)
+    kinds = [(vehicle_type, trailer_mass is not None and bool(traffic.is_truck[row]))
+             for row, (vehicle_type, trailer_mass) in enumerate(traffic.runs)]
+    road_y = int(height * 0.6)
+    focus = traffic.order[0]
+    paused = False
+    accumulated = 0.0  # Simulated time still to step, in TRAFFIC_TIME_STEP ticks
+    traffic.start()
+
+    def step():
+        nonlocal accumulated
+        accumulated += 1 / 60  # TimeWarp works in 1/60 s steps, traffic in TRAFFIC_TIME_STEP steps
+        while accumulated >= TRAFFIC_TIME_STEP:
+            traffic.step(TRAFFIC_TIME_STEP)
+            accumulated -= TRAFFIC_TIME_STEP
+        return True
+
+    running = True
+    while running:
+        frame_time = clock.tick(60) / 1000.0
+        quality.record_frame(clock.get_rawtime() / 1000.0)  # Without the waiting done by tick
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                    index = int(np.nonzero(traffic.order == focus)[0][0]) + (1 if event.key == pygame.K_RIGHT else -1)
+                    focus = traffic.order[index % traffic.count]
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    pixels_per_meter = min(PICTURE_PIXELS_PER_METER, pixels_per_meter * 2)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    pixels_per_meter = max(1 / 32, pixels_per_meter / 2)
+                elif event.key == pygame.K_t:
+                    time_warp.cycle()
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+        if not paused:
+            time_warp.advance(frame_time, step)
+
+        # The focus vehicle's front bumper sits at 60% of the window width
+        left = traffic.fleet.position[focus] - width * 0.6 / pixels_per_meter
+        right = left + width / pixels_per_meter
+        rows, fronts = traffic.visible(left, right)
+
+        screen.fill((158, 206, 235))
+        pygame.draw.rect(screen, (95, 141, 78), (0, int(height * 0.4), width, height))
+        pygame.draw.rect(screen, (120, 120, 120), (0, road_y - 10, width, 40))
+        dash_cycle = 12.0  # m, 3 m dash and 9 m gap like the game's road marks
+        if dash_cycle * pixels_per_meter >= 8:  # Zoomed far out the marks would only be a gray blur
+            first_dash = math.floor(left / dash_cycle) * dash_cycle
+            for dash in np.arange(first_dash, right, dash_cycle):
+                x = (dash - left) * pixels_per_meter
+                pygame.draw.line(screen, (255, 255, 255), (x, road_y + 24), (x + 3 * pixels_per_meter, road_y + 24), 2)
+
+        # Wheels turn with the distance driven, the trailer wheels with the truck's
+        wheel_angles = traffic.fleet.position[rows] / traffic.fleet.wheel_circumference[rows] * 360
+        level_of_detail.draw(screen, [kinds[row] for row in rows], (fronts - left) * pixels_per_meter,
+                             traffic.length[rows] * pixels_per_meter, road_y + 20, wheel_angles,
+                             width * 0.6, pixels_per_meter, quality.level)
+
+        gap = traffic.gap[focus]
+        lines = [
+            f"{traffic.count} vehicles, {traffic.fleet.time_elapsed:.0f} s, {time_warp.get_hud_text()}"
+            + (" (paused)" if paused else ""),
+            f"Drawn: {level_of_detail.get_hud_text()}  {quality.get_hud_text()}",
+            f"Following: {traffic.runs[focus][0]}  {traffic.fleet.speed[focus] * 3.6:.0f} km/h  gear {traffic.fleet.current_gear[focus]}"
+            + (f"  gap {gap:.1f} m" if math.isfinite(gap) else "  free road"),
+            "Left/Right: other vehicle  +/-: zoom  T: warp  Space: pause  Esc: quit",
+        ]
+        for line_number, line in enumerate(lines):
+            screen.blit(font.render(line, True, (0, 0, 0)), (10, 10 + 30 * line_number))
+        pygame.display.flip()
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Traffic on one lane: many vehicles following each other")
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="vehicle types and their shares, like \"Semi truck=1,Compact car=3\"")
+    parser.add_argument("--platoon-size", type=int, default=1, help="trucks drive in groups of this many")
+    parser.add_argument("--platoon-gap", type=float, default=PLATOON_TIME_GAP, help="time gap in s of a truck behind a truck in a platoon")
+    parser.add_argument("--trailer-mass", type=float, help="kg, trailer mass of every truck")
+    parser.add_argument("--road-length", type=float, help="m, length of the ring road (default: 40 m per vehicle)")
+    parser.add_argument("--open-road", action="store_true", help="an open road instead of a ring road")
+    parser.add_argument("--speed-limit", type=float, default=SPEED_LIMIT, help="km/h")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="numpy", help="physics backend (see physics_backends.py)")
+    parser.add_argument("--headless", action="store_true", help="no window, print the traffic statistics")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of simulated time (--headless)")
+    args = parser.parse_args()
+    if args.vehicles < 1:
+        parser.error("--vehicles must be at least 1")
+    if args.platoon_size < 1:
+        parser.error("--platoon-size must be at least 1 (1 means no platoons)")
+
+    try:
+        runs = make_runs(parse_mix(args.mix), args.vehicles, args.platoon_size, args.trailer_mass, args.seed)
+        road_length = None if args.open_road else args.road_length or 40.0 * args.vehicles
+        traffic = Traffic(runs, road_length, args.speed_limit, args.platoon_gap if args.platoon_size > 1 else None,
+                          args.seed, args.backend)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.headless:
+        run_headless(traffic, args.duration)
+    else:
+        run_viewer(traffic)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import pygame
+from sprite_cache import load_image, wheel_sprites
 
 class Trailer:
     def __init__(self, **config):
@@ -15,15 +16,22 @@ class Trailer:
         print(f"Making trailer with: {config}")
         
         self.initial_position = config['initial_position']
-        # Load trailer picture
-        self.image = pygame.image.load(self.image_path).convert_alpha()
-        self.rect = self.image.get_rect()
+        # Distance from this trailer's left edge to the left edge of a trailer coupled behind it (road trains)
+        self.coupling_offset = config.get('coupling_offset', -361)
+        # Headless runs (see headless.py) don't have a window, so they skip loading pictures
+        if config.get('load_visuals', True):
+            # Load trailer picture (shared by all the trailers of a road train, see sprite_cache.py)
+            self.image = load_image(self.image_path)
+            self.rect = self.image.get_rect()
+            # Load wheel picture
+            self.wheel_image = load_image(self.wheel_image_path)
+        else:
+            self.image = None
+            self.rect = pygame.Rect(0, 0, 0, 0)
+            self.wheel_image = None
         self.rect.topleft = self.initial_position
         print(f"Trailer starts at: {self.initial_position}")
         print(f"Trailer is at: {self.rect.topleft}")
-        
-        # Load wheel picture
-        self.wheel_image = pygame.image.load(self.wheel_image_path).convert_alpha()
 
         # Start wheel rotation at 0
         self.wheel_rotation = 0
@@ -40,19 +48,13 @@ class Trailer:
         self.wheel_rotation += rotation_amount
         self.wheel_rotation = self.wheel_rotation % 360  # Keep rotation between 0 and 360
        
-    def draw(self, screen):
+    def draw(self, screen, smooth_wheels=True, camera=None):
+        # camera is the Camera from camera.py, None draws the trailer where it is
+        if camera is not None and not camera.sees(self.rect):
+            return  # Off screen
+        topleft = camera.to_screen(self.rect.topleft) if camera is not None else self.rect.topleft
         # Draw trailer
-        screen.blit(self.image, self.rect.topleft)
-        
-        # Draw wheels
-        for pos in self.wheel_positions:
-            # Make wheel the right size
-            scaled_wheel = pygame.transform.smoothscale(self.wheel_image, self.wheel_size)
-            # Rotate wheel
-            rotated_wheel = pygame.transform.rotate(scaled_wheel, -self.wheel_rotation)
-            # Find where to put wheel
-            wheel_x = self.rect.x + pos[0]
-            wheel_y = self.rect.y + pos[1]
-            wheel_rect = rotated_wheel.get_rect(center=(wheel_x, wheel_y))
-            # Draw wheel
-            screen.blit(rotated_wheel, wheel_rect)
+        screen.blit(self.image, topleft)
+        # Draw wheels, all with the same scaled and rotated picture
+        wheel_sprites.draw(screen, self.wheel_image, self.wheel_size, self.wheel_rotation,
+                           topleft, self.wheel_positions, smooth_wheels)
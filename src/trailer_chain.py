@@ -0,0 +1,88 @@
+# trailer_chain.py
+# This file defines the TrailerChain, the list of trailers a truck pulls (one for a semi, two for a
+# B-double, three or more for a road train).
+# - The masses and the offsets of the trailers are kept in NumPy arrays.
+# - The total mass is summed once when the chain changes, not every tick. Vehicle checks the chain's
+#   version number to know when it has to refresh its own total mass.
+# - All the trailers roll at the same speed, so they share one wheel rotation and the same scaled and
+#   rotated wheel pictures (see sprite_cache.py). Trailers that are off screen (outside the camera's view,
+#   see camera.py) are not drawn at all.
+# Always change trailer masses through the chain (set_mass), so the cached total stays right.
+
+import numpy as np
+from sprite_cache import wheel_sprites
+
+
+class TrailerChain:
+    def __init__(self, trailers=None):
+        self.trailers = []
+        self.masses = np.zeros(0)  # kg, one per trailer
+        self.offsets = np.zeros((0, 2))  # x offset from the vehicle and absolute y, one row per trailer
+        self.wheel_rotation = 0  # degrees, shared by every trailer wheel
+        self.total_mass = 0.0
+        self.version = 0  # Goes up every time the chain changes
+        for trailer in trailers or []:
+            self.append(trailer)
+
+    def __len__(self):
+        return len(self.trailers)
+
+    def __iter__(self):
+        return iter(self.trailers)
+
+    def __getitem__(self, index):
+        return self.trailers[index]
+
+    def append(self, trailer):
+        # The first trailer hangs on the truck at its own initial_position offset, every next trailer
+        # is coupled behind the one before it (coupling_offset is the distance between their left edges)
+        if self.trailers:
+            offset_x = self.offsets[-1, 0] + self.trailers[-1].coupling_offset
+        else:
+            offset_x = trailer.initial_position[0]
+        self.trailers.append(trailer)
+        self.masses = np.append(self.masses, trailer.mass)
+        self.offsets = np.vstack([self.offsets, [offset_x, trailer.initial_position[1]]])
+        self.changed()
+
+    def pop(self):
+        trailer = self.trailers.pop()
+        self.masses = self.masses[:-1]
+        self.offsets = self.offsets[:-1]
+        self.changed()
+        return trailer
+
+    def set_mass(self, index, mass):
+        self.masses[index] = mass
+        self.trailers[index].mass = mass
+        self.changed()
+
+    def changed(self):
+        self.total_mass = float(self.masses.sum())
+        self.version += 1
+
+    def attach(self, vehicle_x):
+        # Put every trailer at its place behind the vehicle
+        for trailer, (offset_x, y) in zip(self.trailers, self.offsets):
+            trailer.rect.topleft = (vehicle_x + int(offset_x), int(y))
+
+    def move(self, dx):
+        for trailer in self.trailers:
+            trailer.rect.x += dx
+
+    def update_wheel_rotation(self, delta_time, speed, wheel_circumference, VISUAL_SPEED_FACTOR, METERS_TO_PIXELS):
+        # Same as Trailer.update_wheel_rotation, done once for the whole chain
+        pixels_moved = speed * delta_time * VISUAL_SPEED_FACTOR * METERS_TO_PIXELS
+        rotation_amount = (pixels_moved / (wheel_circumference * METERS_TO_PIXELS)) * 360
+        self.wheel_rotation = (self.wheel_rotation + rotation_amount) % 360
+
+    def draw(self, screen, smooth_wheels=True, camera=None):
+        # camera is the Camera from camera.py (None: the trailers are drawn where they are, the window doesn't scroll)
+        view = camera.rect if camera is not None else screen.get_rect()
+        for trailer in self.trailers:
+            if trailer.image is None or not trailer.rect.colliderect(view):
+                continue  # Off screen (or headless), nothing to draw
+            topleft = camera.to_screen(trailer.rect.topleft) if camera is not None else trailer.rect.topleft
+            screen.blit(trailer.image, topleft)
+            wheel_sprites.draw(screen, trailer.wheel_image, trailer.wheel_size, self.wheel_rotation,
+                               topleft, trailer.wheel_positions, smooth_wheels)
@@ -6,6 +6,11 @@ from datetime import datetime
 from gear_shifting import GearShiftingSystem
 import time #for debug prints
 from config import VEHICLE_CONFIGS
+from vehicle_configs import tire_for, DEFAULT_DRIVEN_WHEELS, DEFAULT_DRIVEN_LOAD_SHARE
+from sprite_cache import load_image, wheel_sprites
+from trailer_chain import TrailerChain
+from gear_stats import GearStats
+from physics_backends import resistance_force, tire_step, tire_tables, tire_table_key, integrate_speed, ice_wheel_force, electric_motor_force, GRAVITY
 
 # vehicle.py is the central module for our vehicle simulation
 # This file defines the Vehicle class, which is the core component of the simulation
@@ -19,8 +24,8 @@ from config import VEHICLE_CONFIGS
 
 # Constants for physical calculations
 
-GRAVITY = 9.81 # These constants are defined to accurately simulate real-world physics in our vehicle model.
-AIR_DENSITY = 1.225 # They are important for calculating vehicle performance specifcially aerodynamic  resistence in the simulation.
+# GRAVITY and AIR_DENSITY are defined in physics_backends.py, together with the force formulas below.
+# They are shared with the fast batch simulations (fleet.py), so the game and the batch runs use the same physics.
 
 class Vehicle(pygame.sprite.Sprite):
     def __init__(self, mass=None, **kwargs):
@@ -48,6 +53,8 @@ class Vehicle(pygame.sprite.Sprite):
         print(f"Vehicle is electric: {self.is_electric}")
         self.name = kwargs.get('name', 'Unknown Vehicle')
         self.gear_system = None 
+        # Random numbers for the electric motor RPM drop. Give a 'seed' to make a run repeatable (Monte Carlo runs do)
+        self.rng = random.Random(kwargs.get('seed'))
         print(f"Vehicle initialized with name: {self.name}")  # Debug print
         self.engine_power = kwargs['engine_power']
         self.max_torque = kwargs['max_torque']
@@ -60,6 +67,8 @@ class Vehicle(pygame.sprite.Sprite):
         self.torque_curve = kwargs['torque_curve']
         if len(self.power_curve) < 2 or len(self.torque_curve) < 2:
             raise ValueError("Power and torque curves must have at least two points each")
+        self.compile_curves()
+        self.setup_tires(kwargs)
         # Initialize vehicle based on type
         if self.is_electric:
             self.setup_electric_vehicle(kwargs)
@@ -128,6 +137,24 @@ class Vehicle(pygame.sprite.Sprite):
         
     def set_up_visuals(self, kwargs):
         self.image_path = kwargs['image_path']
+        # Headless runs (see headless.py) don't have a window, so they skip loading pictures
+        self.load_visuals = kwargs.get('load_visuals', True)
+        if not self.load_visuals:
+            self.image = None
+            self.rect = pygame.Rect(0, 0, 0, 0)
+        else:
+            self.load_image()
+        self.height = self.rect.height  # Use the height of the loaded image
+        self.position = list(kwargs['initial_position'])
+        print(f"Vehicle position set to: {self.position}")
+        self.rect.topleft = self.position
+        print(f"Vehicle rect.topleft set to: {self.rect.topleft}")
+        width, height = self.rect.size
+        self.frontal_area = kwargs.get('frontal_area')
+        self.is_truck = kwargs.get('is_truck', False)
+        self.setup_wheels(kwargs)
+
+    def load_image(self):
         print(f"Loading vehicle image from: {self.image_path}")
         try:
             self.image = pygame.image.load(self.image_path)
@@ -139,21 +166,15 @@ class Vehicle(pygame.sprite.Sprite):
             self.image.fill((255, 0, 0))  # Fill with red color
         self.rect = self.image.get_rect()
         print(f"Vehicle rect created with initial topleft: {self.rect.topleft}")
-        self.height = self.rect.height  # Use the height of the loaded image
-        self.position = list(kwargs['initial_position'])
-        print(f"Vehicle position set to: {self.position}")
-        self.rect.topleft = self.position
-        print(f"Vehicle rect.topleft set to: {self.rect.topleft}")
-        width, height = self.rect.size
-        self.frontal_area = kwargs.get('frontal_area')
-        self.is_truck = kwargs.get('is_truck', False)
-        self.setup_wheels(kwargs)
+
     def setup_wheels(self, kwargs):
-        if self.is_truck:
-            self.front_wheel_image = pygame.image.load(kwargs['front_wheel_image_path']).convert_alpha()
-            self.rear_wheel_image = pygame.image.load(kwargs['rear_wheel_image_path']).convert_alpha()
+        if not self.load_visuals:
+            pass
+        elif self.is_truck:
+            self.front_wheel_image = load_image(kwargs['front_wheel_image_path'])
+            self.rear_wheel_image = load_image(kwargs['rear_wheel_image_path'])
         else:
-            self.wheel_image = pygame.image.load(kwargs['wheel_image_path']).convert_alpha()
+            self.wheel_image = load_image(kwargs['wheel_image_path'])
         self.wheel_positions = kwargs['wheel_positions']
         self.wheel_size = kwargs['wheel_size']
         self.wheel_rotation = 0
@@ -162,6 +183,8 @@ class Vehicle(pygame.sprite.Sprite):
         self.speed = 0  # Current speed in meters per second
         self.visual_speed = 0  # Speed for visual representation (may be different from actual speed for smoother visuals)
         self.VISUAL_SPEED_FACTOR = 0.5
+        self.wheel_speed = 0  # Angular speed of the driven wheels in rad/s, faster than the road when they spin
+        self.slip_ratio = 0  # (tread speed - road speed) / road speed, see tire_step
         self.acceleration = 0  # Current acceleration in meters per second squared it represents the rate of change of velocity over time, this is important for simulating realistic vehicle behavior.
                                 # It is for easy integration with other physics calculations, such as force (F = ma) and kinematic equations.
         self.co2_emissions = 0  # Total CO2 emissions in kg - important for environmental impact
@@ -178,7 +201,9 @@ class Vehicle(pygame.sprite.Sprite):
         # I've set these RPM thresholds for gear shifting to optimize performance and stabilize the engine
         self.yellow_line = self.max_rpm * 0.8  # Threshold for high RPM range, optimal shift point, used to draw 
         self.red_line = self.max_rpm * 0.9  # Red line RPM threshold - danger level , very high RPM
-        self.gear_shift_data = []  # List to store gear shift data - useful for analyzing shifting times and debuging
+        # Per-gear statistics (time, distance, entry/exit speed, fuel, CO2, shifts) - useful for analyzing shifting times and debuging.
+        # ICE vehicles share the one of their gear system, electric cars have a single gear.
+        self.gear_stats = self.gear_system.gear_stats if self.gear_system else GearStats(1)
         self.last_gear_shift_time = 0  # Time of the last gear shift - helps in preventing too frequent shifting
         self.previous_gear = 1  # Previous gear. Very important to detect gear changes
         self.rpm_smoothing_factor = 0.1  # This factor smooths RPM changes,I've chosen it for creating the illusion of a rev drop without simulating mechanical engine parts like the flywheel. It makes RPM changes appear more natural and less abrupt.
@@ -190,43 +215,121 @@ class Vehicle(pygame.sprite.Sprite):
 
     def setup_trailer(self, kwargs):
         print("setup_trailer called")
-        # Setting up trailer if it exists; trailers affect vehicle performance and visuals
-        self.trailer = kwargs.get('trailer', None)
+        # Setting up trailers if they exist; trailers affect vehicle performance and visuals
+        # 'trailers' is a list of Trailer objects (or a TrailerChain) for road trains, 'trailer' a single Trailer
+        trailers = kwargs.get('trailers')
+        if trailers is None:
+            trailers = [kwargs['trailer']] if kwargs.get('trailer') else []
+        self.trailers = trailers if isinstance(trailers, TrailerChain) else TrailerChain(trailers)
+        self.trailer = self.trailers[0] if self.trailers else None  # The first trailer, the one on the fifth wheel
         if self.trailer:
-            print("trailer is passed to the vehicle class successfully")
+            print(f"{len(self.trailers)} trailer(s) passed to the vehicle class successfully")
             # Store the initial offset of the trailer relative to the vehicle, important for positioning, I've had a lot of issues about trailer positioning due to absolute coordinates, setting up a relative position to semitruck was always more reliable
             self.trailer_offset_x = self.trailer.initial_position[0]
             self.trailer_absolute_y = self.trailer.initial_position[1]
-            # Set the trailer's initial position based on the vehicle's position and the offset
-            self.trailer.rect.topleft = (self.rect.topleft[0] + self.trailer_offset_x, 
-                                        self.trailer_absolute_y)
+            # Set the trailers' initial positions based on the vehicle's position and their offsets
+            self.trailers.attach(self.rect.topleft[0])
             print(f"Trailer initial position set to: {self.trailer.rect.topleft}")
         else:
             if self.name == "Semi truck":
                 print("!!!!Error: Trailer not passed to the Vehicle class during initialization.")
         self.update_total_mass()  # Update mass to include trailer too
         print(f"Total mass after trailer setup: {self.total_mass} kg")
+
+    def compile_curves(self):
+        # Sort the power and torque curves by RPM once, so estimate_engine_output doesn't sort them every tick.
+        # The tables are looked up by the curve itself, apply_config makes them again when a curve is tuned.
+        self.curve_tables = {}
+        for curve in (self.power_curve, self.torque_curve):
+            sorted_curve = sorted(curve, key=lambda point: point[0])
+            self.curve_tables[id(curve)] = (curve, sorted_curve, [point[0] for point in sorted_curve], [point[1] for point in sorted_curve])
+
+    def setup_tires(self, config):
+        # The grip and stiffness tables of the tires are made here once (and shared by all vehicles with the same
+        # tires), so a tick only looks them up. See tire_step in physics_backends.py.
+        tire = tire_for(config)
+        self.grip_table, self.stiffness_table = tire_tables(*tire_table_key(tire))
+        self.wheel_radius = self.wheel_circumference / (2 * math.pi)
+        self.wheel_inertia = config.get('driven_wheels', DEFAULT_DRIVEN_WHEELS) * tire['wheel_inertia']  # kg m^2
+        self.driven_load_share = config.get('driven_load_share', DEFAULT_DRIVEN_LOAD_SHARE)
+
+    def apply_config(self, config):
+        # Swap in a tuned config (see vehicle_tuning.py) while the simulation runs. Only what the config
+        # describes is rebuilt: the numbers, the curve tables, the gear table and, if an image path changed,
+        # the pictures. Speed, position, gear, time and the totals are kept.
+        if config.get('is_electric', False) != self.is_electric:
+            raise ValueError("Switching between electric and combustion engine needs a new vehicle")
+        for key in ('mass', 'engine_power', 'max_torque', 'max_rpm', 'max_speed', 'wheel_circumference',
+                    'friction_coefficient', 'air_resistance_coefficient', 'frontal_area', 'power_curve', 'torque_curve'):
+            setattr(self, key, config[key])
+        self.is_truck = config.get('is_truck', False)
+        self.compile_curves()
+        self.setup_tires(config)
+        if self.is_electric:
+            self.max_motor_speed = config['max_rpm']
+            self.single_gear_ratio = config['single_gear_ratio']
+            self.battery_capacity = config['battery_capacity']
+        else:
+            for key in ('shift_up_rpm', 'shift_down_rpm', 'final_drive_ratio', 'idle_rpm', 'fuel_efficiency', 'emission_factor'):
+                setattr(self, key, config[key])
+            self.rev_drop_rate = self.gear_system.rev_drop_rate = config.get('rev_drop_rate', 200)
+            self.post_shift_adjustment_factor = config.get('post_shift_adjustment_factor', 1.0)
+            self.speed_emission_coefficient = config.get('speed_emission_coefficient', 0.2)
+            self.min_gear_efficiency = config.get('min_gear_efficiency', 0.7)
+            self.throttle_efficiency_factor = config.get('throttle_efficiency_factor', 0.4)
+            self.base_engine_efficiency = config.get('base_engine_efficiency', 0.35)
+            self.gear_ratios = self.gear_system.gear_ratios = config['gear_ratios']
+            if len(self.gear_ratios) != self.gear_stats.gear_count:
+                self.gear_stats.resize(len(self.gear_ratios))
+                self.current_gear = min(self.current_gear, len(self.gear_ratios))
+                self.previous_gear = min(self.previous_gear, len(self.gear_ratios))
+        self.yellow_line = self.max_rpm * 0.8
+        self.red_line = self.max_rpm * 0.9
+        self.update_total_mass()
+        if self.load_visuals:
+            self.apply_visual_config(config)
+
+    def apply_visual_config(self, config):
+        if config['image_path'] != self.image_path:
+            topleft = self.rect.topleft
+            self.image_path = config['image_path']
+            self.load_image()
+            self.rect.topleft = topleft
+            self.height = self.rect.height
+        # Wheel pictures come from the sprite cache, so an unchanged path is just a lookup
+        if self.is_truck:
+            self.front_wheel_image = load_image(config['front_wheel_image_path'])
+            self.rear_wheel_image = load_image(config['rear_wheel_image_path'])
+        else:
+            self.wheel_image = load_image(config['wheel_image_path'])
+        self.wheel_positions = config['wheel_positions']
+        self.wheel_size = config['wheel_size']
+
+    def get_simulation_time(self):
+        # Simulated seconds since the start. Timers that affect the physics (like the gear shift cooldown)
+        # use this instead of the wall clock, so headless runs that go faster than real time behave the same.
+        return self.time_elapsed
         
     def update_total_mass(self):
-        self.total_mass = self.mass
-        if self.trailer:
-            self.total_mass += self.trailer.mass
+        # Vehicle plus all trailers. The chain keeps its total mass up to date, and we remember its version
+        # so update() only calls this again when the chain has changed.
+        self.total_mass = self.mass + self.trailers.total_mass
+        self.trailer_mass_version = self.trailers.version
         print(f"Updated total_mass: {self.total_mass}")
         
     def is_debug_print_allowed(self):    # These methods help manage debug print frequency, preventing console spam
-        current_time = pygame.time.get_ticks() / 1000  # Get current time in seconds
+        current_time = self.get_simulation_time()  # Simulated seconds, so time warp doesn't flood the console
         if current_time - self.last_debug_print_time >= self.debug_print_interval:  # Check if debug interval has passed
             return True  # Allow debug print
         return False  # Prevent excessive debug prints
     
     def debug_print(self,message):
-        current_time = time.time()
-        elapsed_time = current_time - self.simulation_start_time
+        elapsed_time = self.get_simulation_time()  # Timestamp in simulated time, like the rest of the physics
         timestamp = f"[{elapsed_time:.3f}s]"
         print(f"{timestamp} {message}")
     
     def reset_debug_print_timer(self):
-        self.last_debug_print_time = pygame.time.get_ticks() / 1000  # Reset timer to control debug print frequency
+        self.last_debug_print_time = self.get_simulation_time()  # Reset timer to control debug print frequency
     
     def start(self):
         if self.is_electric:
@@ -269,13 +372,11 @@ class Vehicle(pygame.sprite.Sprite):
         # Rolling resistance: F_r = u_r * m * g
         # where u_r is the rolling resistance coefficient, m is mass, and g is gravity (9.81)
         # Added speed dependency to rolling resistance for increased realism
-        rolling_resistance = self.total_mass * GRAVITY * (self.friction_coefficient + self.speed * 0.0001)
         # Air resistance: F_a = 0.5 * rho * A * v^2
         # where rho is the density of air (1.225 kg/m^3) A is the frontal area, and v is the velocity
         # Frontal area is calculated using a rough formula for simplicity over realism.
-        min_speed_for_air_resistance = 0.1  # m/s    
-        air_resistance = 0.5 * AIR_DENSITY * self.air_resistance_coefficient * self.frontal_area * (max(self.speed, min_speed_for_air_resistance) ** 2)#prevent that air resistance is never zero when the car is not moving
-        return rolling_resistance + air_resistance
+        # Air resistance uses a minimum speed of 0.1 m/s so it is never zero when the car is not moving
+        return resistance_force(self.total_mass, self.friction_coefficient, self.air_resistance_coefficient, self.frontal_area, self.speed)
     
     def rapid_rpm_adjustment(self, target_rpm, delta_time):
         return self.gear_system.rapid_rpm_adjustment(target_rpm, delta_time)
@@ -337,12 +438,16 @@ class Vehicle(pygame.sprite.Sprite):
         return max(0.1, min(duration, 2.0)) # Clamp the duration between 0.1 and 2.0 seconds
     
     def calculate_emissions(self, delta_time):
+        return self.calculate_fuel_and_emissions(delta_time)[1]  # kg CO2
+
+    def calculate_fuel_and_emissions(self, delta_time):
         # This emissions calculation simulates a worst-case scenario with full-throttle
         # acceleration, not typical driving conditions. It's a simplified educational
         # model demonstrating maximum potential emissions under extreme laboratory-like
         # conditions, resulting in much higher values than normal driving would produce.
+        # Returns the fuel (L) and the CO2 (kg) of this tick, the per-gear stats keep both.
         if self.is_electric:
-            return 0
+            return 0, 0
         else:
             # RPM factor
             rpm_factor = min(1.0, self.current_rpm / self.max_rpm)
@@ -370,7 +475,7 @@ class Vehicle(pygame.sprite.Sprite):
 
             # Emissions
             emissions = adjusted_fuel_consumption * adjusted_emission_factor / 1000  # Convert g to kg
-            return emissions  # kg CO2
+            return adjusted_fuel_consumption, emissions  # L fuel, kg CO2
         
         
     def speed_debug(self): # For electric vehicles, we display some debug info
@@ -419,7 +524,8 @@ class Vehicle(pygame.sprite.Sprite):
         # Update position
         previous_position = self.rect.x
         previous_speed = self.speed
-        self.update_total_mass()
+        if self.trailer_mass_version != self.trailers.version:
+            self.update_total_mass()  # Only when a trailer was added, removed or loaded
         if self.is_electric:
             self.update_electric(delta_time)
         else:
@@ -427,18 +533,17 @@ class Vehicle(pygame.sprite.Sprite):
 
         # Calculate resistance force using the existing method
         resistance_force = self.calculate_resistance_force()
+        # The tires turn the wheel force into a push on the road. Too much force makes the wheels spin,
+        # and a spinning tire grips less (slip model, see tire_step)
+        normal_force = self.total_mass * GRAVITY * self.driven_load_share
+        tire_force, self.wheel_speed, self.slip_ratio = tire_step(
+            self.wheel_force, self.speed, self.wheel_speed, normal_force, self.wheel_radius, self.wheel_inertia,
+            self.grip_table, self.stiffness_table, delta_time)
         # Calculate net force
-        net_force = self.wheel_force - resistance_force
-        # Apply traction limit
-        static_friction_coefficient = 0.8  # Typical value for rubber on dry asphalt
-        max_traction_force = static_friction_coefficient * self.total_mass * 9.81
+        net_force = tire_force - resistance_force
 
-        if abs(net_force) > max_traction_force:
-            
-            net_force = max_traction_force if net_force > 0 else -max_traction_force
-
-        # Calculate acceleration (F = ma)
-        self.acceleration = net_force / self.total_mass
+        # Calculate acceleration (F = ma) and the new speed (in m/s), speed never goes negative
+        self.acceleration, self.speed = integrate_speed(self.speed, net_force, self.total_mass, delta_time)
         print(f"Net force: {net_force:.2f} N / Total mass: {self.total_mass:.2f} kg = Acceleration: {self.acceleration:.2f} m/s^2")
         # User-friendly debug print for incoherent acceleration cases
         if self.acceleration > 0 and self.wheel_force <= resistance_force:
@@ -449,9 +554,6 @@ class Vehicle(pygame.sprite.Sprite):
             print(f"!!! Unusual Acceleration: The vehicle is experiencing very high acceleration ({self.acceleration:.2f} m/s^2). This might be unrealistic for a typical vehicle.")
         # Note for me : Check the values of self.acceleration, self.wheel_force, and resistance_force
         # in the debug prints above to identify any inconsistencies in the physics calculations.
-        # Update speed (in m/s)
-        self.speed += self.acceleration * delta_time        
-        self.speed = max(0, self.speed)  # Ensure speed doesn't go negative
         # Update position
         self.position[0] += self.speed * delta_time
         self.rect.x = int(self.position[0])
@@ -459,9 +561,13 @@ class Vehicle(pygame.sprite.Sprite):
         # Update other metrics
         self.distance_traveled += self.speed * delta_time
         self.time_elapsed += delta_time
+        fuel, emissions = self.calculate_fuel_and_emissions(delta_time)
+        self.co2_emissions += emissions
+        # This tick counts for the gear we were in when it started
+        self.gear_stats.add(self.previous_gear, delta_time, self.speed * delta_time, fuel, emissions)
         if not self.is_electric:
-            self.co2_emissions += self.calculate_emissions(delta_time)
             self.is_idling = self.speed < 0.1 and self.current_rpm <= self.idle_rpm + 50
+            self.gear_system.record_gear_shift_time()  # Records the shift in gear_stats for the gear info display
 
         # Update performance metrics
         self.update_performance_metrics(delta_time)
@@ -472,7 +578,7 @@ class Vehicle(pygame.sprite.Sprite):
             self.debug_print(f"Debug: WheelF: {self.wheel_force:.2f}N - ResistF: {resistance_force:.2f}N = NetF: {net_force:.2f}N, Accel: {self.acceleration:.4f}m/s^2, RPM: {self.current_rpm:.2f}, Speed: {self.speed*3.6:.2f}km/h, Mass: {self.total_mass:}kg")
             self.reset_debug_print_timer()
         print(f"NetF: {net_force:.2f}N,", "speed", f"{self.speed * 3.6:.2f} km/h")
-        if net_force < 0 and not self.gear_system.shifting == True and self.throttle == 1 :
+        if net_force < 0 and not (self.gear_system and self.gear_system.shifting) and self.throttle == 1 :
             print("//////////////////////////////////////////////////////") 
             print ("CRITICAL WARNING , NET FORCE IS NEGATIVE !! ") 
             #The engine force can not be lower than the resistance force in not shifting case
@@ -486,7 +592,7 @@ class Vehicle(pygame.sprite.Sprite):
         self.current_rpm = wheel_rps * self.single_gear_ratio * 60
         self.current_rpm = min(self.current_rpm, self.max_rpm)
         if self.current_rpm >= 19500:
-            self.current_rpm -= random.uniform(0, 500) #random RPM drop to simulate aero drag
+            self.current_rpm -= self.rng.uniform(0, 500) #random RPM drop to simulate aero drag
         
         if self.is_debug_print_allowed():
             self.debug_print(f"Debug Electric: Speed: {self.speed * 3.6:.2f} km/h, Motor RPM: {self.current_rpm:.2f}")
@@ -518,24 +624,12 @@ class Vehicle(pygame.sprite.Sprite):
             engine_power = self.estimate_engine_output(self.current_rpm, self.power_curve)
             print("update ice engine_power is set to", engine_power)
 
-        # Apply throttle directly to engine torque
-        engine_torque *= self.throttle
-        
-        # Calculate wheel torque using gear ratios
+        # Apply throttle to engine torque and turn it into force at the wheels using the gear ratios
+        # (90% drivetrain efficiency), limited by the theoretical engine power from the config
         total_gear_ratio = self.gear_ratios[self.current_gear - 1] * self.final_drive_ratio
-        wheel_torque = engine_torque * total_gear_ratio * 0.9  # Assuming 90% drivetrain efficiency
-        print("drivetrain efficiency is implemented as 90%")
-        print("update ice calculated  wheel_torque", wheel_torque)
-        # Calculate wheel force
-        wheel_radius = self.wheel_circumference / (2 * math.pi)
-        self.wheel_force = wheel_torque / wheel_radius
-        print("update ice calculated wheel_force", self.wheel_force)
-        
-        # Limit wheel force based on theoretical power limits based in config.py
-        max_force = (engine_power * 1000) / max(self.speed, 0.1)
-        self.wheel_force = min(self.wheel_force, max_force)
-        print(f"Debug: Engine theoretical Power: {engine_power:.2f} kW, Speed: {self.speed * 3.6:.2f} km/h, Max Force: {max_force:.2f} N")
-        print("debug:update_ice wheel_force", self.wheel_force, "= wheel_torque", wheel_torque, "/ wheel_radius", wheel_radius)
+        self.wheel_force = ice_wheel_force(engine_torque, engine_power, self.throttle, total_gear_ratio, self.wheel_circumference, self.speed)
+        print(f"Debug: Engine theoretical Power: {engine_power:.2f} kW, Speed: {self.speed * 3.6:.2f} km/h")
+        print("debug:update_ice wheel_force", self.wheel_force)
         print(f"Debug ICE: Speed: {self.speed*3.6:.2f}km/h, RPM: {self.current_rpm:.2f}, Gear: {self.current_gear}, Throttle: {self.throttle:.2f}, Shifting: {self.gear_system.shifting}, Clutch: {self.gear_system.clutch_engaged}")
             
     def update_performance_metrics(self, delta_time):
@@ -561,9 +655,9 @@ class Vehicle(pygame.sprite.Sprite):
         rotation_amount = (pixels_moved / wheel_circumference_pixels) * 360
         self.wheel_rotation += rotation_amount        
         self.wheel_rotation %= 360
-        if self.is_truck and hasattr(self, 'trailer'):
-            self.trailer.rect.x += position_change
-            self.trailer.update_wheel_rotation(delta_time, self.speed, self.wheel_circumference, self.VISUAL_SPEED_FACTOR, self.METERS_TO_PIXELS)
+        if self.trailers:
+            self.trailers.move(position_change)
+            self.trailers.update_wheel_rotation(delta_time, self.speed, self.wheel_circumference, self.VISUAL_SPEED_FACTOR, self.METERS_TO_PIXELS)
 
     def get_speed_kmh(self): # This method provides the vehicle's speed in a more familiar unit (km/h) for display purposes
         return self.speed * 3.6  # Convert m/s to km/h
@@ -576,20 +670,10 @@ class Vehicle(pygame.sprite.Sprite):
         self.current_rpm = wheel_rps * self.single_gear_ratio * 60
         
         current_torque = self.estimate_engine_output(self.current_rpm, self.torque_curve)
-        current_power = self.estimate_engine_output(self.current_rpm, self.power_curve) * 1000  # kW to W
-        
-        if self.speed < 1:  # Use torque-based calculation for low speeds
-            force = (current_torque * self.single_gear_ratio) / (self.wheel_circumference / 2)
-        else:  # Use power-based calculation for higher speeds
-            force = current_power / max(self.speed, 0.1)  # Prevent division by zero
-        
-        force *= self.throttle
-        
-        resistance = self.calculate_resistance_force()
+        current_power = self.estimate_engine_output(self.current_rpm, self.power_curve)  # kW
         
-        # Debug output (unchanged)
-        
-        return force
+        # Torque-based calculation for low speeds, power-based calculation for higher speeds
+        return electric_motor_force(current_torque, current_power, self.single_gear_ratio, self.wheel_circumference, self.speed, self.throttle)
     def get_performance_indicators(self): #This method provides a list of performance indicators,
         # different for electric and petrol engines. useful for displaying performance data to the user
         indicators = []
@@ -605,28 +689,26 @@ class Vehicle(pygame.sprite.Sprite):
                     indicators.append(f"Gear {gear}: {time:.2f}s ({speed:.1f} km/h)")  # Add formatted string to indicators
         
         return indicators  # Return the list of performance indicators
-    def draw(self, screen, height):
-        screen.blit(self.image, self.rect)  # Draw the main vehicle image on the screen
-
-        def draw_wheel(wheel_image, pos):
-            # Use smoothscale for better quality scaling
-            scaled_wheel = pygame.transform.smoothscale(wheel_image, self.wheel_size)  # Scale the wheel image for better quality
-            rotated_wheel = pygame.transform.rotate(scaled_wheel, -self.wheel_rotation)  # Rotate the wheel based on vehicle movement
-            wheel_x = self.rect.x + pos[0]  # Calculate x-position of the wheel
-            wheel_y = self.rect.y + pos[1]  # Calculate y-position of the wheel
-            wheel_rect = rotated_wheel.get_rect(center=(wheel_x, wheel_y))  # Create a rectangle for the wheel
-            screen.blit(rotated_wheel, wheel_rect)  # Draw the wheel on the screen
-        if self.is_truck:
-            for i, pos in enumerate(self.wheel_positions):
-                wheel_image = self.front_wheel_image if i == 0 else self.rear_wheel_image  # Choose front or rear wheel image
-                draw_wheel(wheel_image, pos)  # Draw each wheel for the truck
-        else:
-            for pos in self.wheel_positions:
-                draw_wheel(self.wheel_image, pos)  # Draw each wheel for non-truck vehicles
+    def draw(self, screen, height, smooth_wheels=True, camera=None):
+        # camera is the Camera from camera.py: the vehicle is drawn where the camera sees it, and not at all
+        # when it is off screen. None draws it at its position (the window doesn't scroll).
+        if camera is None or camera.sees(self.rect):
+            topleft = camera.to_screen(self.rect.topleft) if camera is not None else self.rect.topleft
+            screen.blit(self.image, topleft)  # Draw the main vehicle image on the screen
+            # Wheels are scaled and rotated once and shared (see sprite_cache.py).
+            # smoothscale looks better, scale is faster. The render quality governor picks one (see quality.py)
+            if self.is_truck:
+                # Front wheel image for the first wheel, rear wheel image for the others
+                wheel_sprites.draw(screen, self.front_wheel_image, self.wheel_size, self.wheel_rotation,
+                                   topleft, self.wheel_positions[:1], smooth_wheels)
+                wheel_sprites.draw(screen, self.rear_wheel_image, self.wheel_size, self.wheel_rotation,
+                                   topleft, self.wheel_positions[1:], smooth_wheels)
+            else:
+                wheel_sprites.draw(screen, self.wheel_image, self.wheel_size, self.wheel_rotation,
+                                   topleft, self.wheel_positions, smooth_wheels)
 
-        # Draw the trailer if it exists and the vehicle is a truck
-        if self.is_truck and hasattr(self, 'trailer') and self.trailer is not None:
-            self.trailer.draw(screen)
+        # Draw the trailers (if any) over the back of the truck, each one checks if the camera sees it
+        self.trailers.draw(screen, smooth_wheels, camera)
     def get_distance_km(self): #returns the total distance traveled in kilometers
         return self.distance_traveled / 1000
 
@@ -636,23 +718,9 @@ class Vehicle(pygame.sprite.Sprite):
     def get_zero_to_hundred_time(self): # returns the time taken to accelerate from 0 to 100 km/h
         return self.zero_to_hundred_time if self.zero_to_hundred_time is not None else "N/A"
     
-    def record_gear_shift_time(self): # records the time spent in each gear and the speed at which shifts occur
-   
-         if not self.is_electric and self.current_gear != self.previous_gear: # only for non-electric vehicles
-            current_speed = self.speed * 3.6  # Convert to km/h
-            gear_time = self.time_elapsed - self.gear_start_times[self.previous_gear - 1] # time elapsed from the start of the previous gear to the current gear
-            
-            for i, (gear, _, _) in enumerate(self.gear_shift_data): # Iterates through existing data, updates if gear exists, or appends new entry
-                if gear == self.previous_gear:
-                    self.gear_shift_data[i] = (self.previous_gear, gear_time, current_speed)
-                    break
-            else:
-                self.gear_shift_data.append((self.previous_gear, gear_time, current_speed)) # Appends a new tuple to the list if the gear is not found in existing data
-            
-            # Set the start time for the new gear
-            self.gear_start_times[self.current_gear - 1] = self.time_elapsed
-            self.gear_start_speeds[self.current_gear - 1] = self.speed
-            self.previous_gear = self.current_gear
+    @property
+    def gear_shift_data(self): # (gear, time in gear, speed at shift) for every gear we shifted out of, made from gear_stats when asked
+        return self.gear_stats.shift_data()
 
     def estimate_engine_output(self, x, curve):
         # This function helps us estimate values between known points on a power curve.
@@ -663,10 +731,15 @@ class Vehicle(pygame.sprite.Sprite):
         # allowing for a more realistic simulation of engine behavior across its entire RPM range.
         # The math here performs linear interpolation between two adjacent known points on the curve.
         # Sort the curve points by RPM (x-value) to ensure they're in order
-        sorted_curve = sorted(curve, key=lambda point: point[0])# Sort the curve points by RPM (first element of each pair)
-        # This line arranges the curve data in order of increasing RPM values
-        rpms = [point[0] for point in sorted_curve] # Extract RPM values from sorted curve
-        values = [point[1] for point in sorted_curve] # Extract power/torque values from sorted curve
+        # The vehicle's own curves are sorted once in compile_curves; any other curve is sorted here
+        table = self.curve_tables.get(id(curve))
+        if table is not None and table[0] is curve:
+            _, sorted_curve, rpms, values = table
+        else:
+            sorted_curve = sorted(curve, key=lambda point: point[0])# Sort the curve points by RPM (first element of each pair)
+            # This line arranges the curve data in order of increasing RPM values
+            rpms = [point[0] for point in sorted_curve] # Extract RPM values from sorted curve
+            values = [point[1] for point in sorted_curve] # Extract power/torque values from sorted curve
         if x <= rpms[0]:# If RPM is below or equal to the lowest rpm, return the corresponding value
             return values[0]
         if x >= rpms[-1]:# If RPM is above or equal to the highest rpm, return the corresponding value
@@ -686,9 +759,5 @@ class Vehicle(pygame.sprite.Sprite):
             power = self.estimate_engine_output(rpm, self.power_curve)  # Estimate power for ICE
             torque = self.estimate_engine_output(rpm, self.torque_curve)  # Estimate torque for ICE
             return power, torque  # Return estimated power and torque
-    def update_total_mass(self):
-        self.total_mass = self.mass
-        if self.trailer:
-            self.total_mass += self.trailer.mass
     # End of Vehicle class definition# Note: Additional helper functions or related classes could be added below if needed in the future.
    
\ No newline at end of file
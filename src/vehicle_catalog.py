@@ -0,0 +1,295 @@
+# vehicle_catalog.py
+# This file opens vehicle catalogs with thousands of vehicles and trailers without making the start slow.
+# A catalog is either a folder of spec files or one JSON Lines file:
+# - catalog/  one vehicle or trailer per .json or .toml file (the file name is the name, unless the spec has a
+#   "name"). The folder can also hold .jsonl files.
+# - catalog.jsonl  one spec per line, every line needs a "name"
+# Every spec uses the same keys as VEHICLE_CONFIGS (see vehicle_configs.py). Trailers have "kind": "trailer"
+# and the keys of TRAILER_CONFIGS. "vehicle_class" is optional; without it the class is electric, truck or car.
+#
+# How it stays fast:
+# - Opening a catalog only reads a small index: name, kind, class, mass, power-to-weight and where the full
+#   spec is (the file, or the byte offset of its line). The index is saved next to the catalog and only the
+#   files whose size or modification time changed are read again, so a big catalog is scanned once.
+# - Full specs are parsed only when asked for (spec(name)). The last CATALOG_CACHE_SIZE specs are kept in an
+#   LRU cache, so paging back and forth in the menu doesn't read the disk again.
+# - The index columns are NumPy arrays, so query() filters and sorts thousands of entries with a few masks and
+#   returns one page of names for the paged vehicle menu.
+# The built-in VEHICLE_CONFIGS and TRAILER_CONFIGS are always part of the catalog (they come first, also when
+# sorting by name). When a catalog vehicle is picked in the menu, main.py adds its spec to VEHICLE_CONFIGS.
+#
+# Look at a catalog from the src folder with:  python vehicle_catalog.py ../catalog --class truck --page 0
+
+import argparse
+import functools
+import json
+import os
+import time
+import numpy as np
+try:
+    import tomllib  # Python 3.11 and newer. Without it .toml files are skipped
+except ImportError:
+    tomllib = None
+from vehicle_configs import VEHICLE_CONFIGS, TRAILER_CONFIGS
+
+CATALOG_PATHS = ["catalog", "catalog.jsonl"]  # Looked for in the project folder, the first one found is used
+CATALOG_INDEX_FILE = "catalog_index.json"  # Inside a catalog folder, or "<file>.index.json" next to a .jsonl file
+CATALOG_INDEX_VERSION = 1  # Change this when the index layout changes, old indexes are then rebuilt
+CATALOG_CACHE_SIZE = 64  # Full specs kept in memory
+CATALOG_PAGE_SIZE = 5  # Vehicles per menu page
+SPEC_EXTENSIONS = (".json", ".toml", ".jsonl") if tomllib is not None else (".json", ".jsonl")
+SORT_KEYS = ["name", "mass", "power_to_weight"]
+
+
+def vehicle_class(spec, kind):
+    if kind == "trailer":
+        return "trailer"
+    if spec.get('vehicle_class'):
+        return str(spec['vehicle_class'])
+    if spec.get('is_electric', False):
+        return "electric"
+    return "truck" if spec.get('is_truck', False) else "car"
+
+
+def index_entry(name, spec, offset=None, length=None):
+    # One index row: [name, kind, class, mass in kg, power-to-weight in kW per tonne, offset, length]
+    kind = spec.get('kind', "vehicle")
+    mass = float(spec.get('mass', 0.0))
+    power = spec.get('engine_power')
+    power_to_weight = float(power) / (mass / 1000) if power is not None and mass > 0 else float('nan')
+    return [name, kind, vehicle_class(spec, kind), mass, power_to_weight, offset, length]
+
+
+def read_spec_file(path):
+    if path.endswith(".toml"):
+        with open(path, "rb") as spec_file:
+            return tomllib.load(spec_file)
+    with open(path) as spec_file:
+        return json.load(spec_file)
+
+
+def index_file(path):
+    # Index rows for one catalog file (this is the slow part, done once per new or changed file)
+    if not path.endswith(".jsonl"):
+        spec = read_spec_file(path)
+        return [index_entry(spec.get('name', os.path.splitext(os.path.basename(path))[0]), spec)]
+    entries = []
+    with open(path, "rb") as lines_file:
+        offset = 0
+        for line in lines_file:
+            if line.strip():
+                spec = json.loads(line)
+                entries.append(index_entry(spec['name'], spec, offset, len(line)))
+            offset += len(line)
+    return entries
+
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class VehicleCatalog:
+    def __init__(self, path=None, cache_size=CATALOG_CACHE_SIZE):
+        self.path = path
+        rows, locations = [], []  # locations: None for built-in specs, else (file, offset, length)
+        for name, config in VEHICLE_CONFIGS.items():
+            rows.append(index_entry(name, config))
+            locations.append(None)
+        for name, config in TRAILER_CONFIGS.items():
+            rows.append(index_entry(name, dict(config, kind="trailer")))
+            locations.append(None)
+        if path is not None:
+            for file_path, entries in self.load_index(path):
+                for entry in entries:
+                    rows.append(entry)
+                    locations.append((file_path, entry[5], entry[6]))
+
+        # Names must be unique: the built-in ones and the first file that has a name win
+        self.rows = {}
+        keep = []
+        for number, row in enumerate(rows):
+            if row[0] in self.rows:
+                print(f"Catalog: {row[0]!r} is there twice, using the first one")
+                continue
+            self.rows[row[0]] = len(keep)
+            keep.append(number)
+        self.names = np.array([rows[number][0] for number in keep], dtype=object)
+        self.lower_names = np.array([name.lower() for name in self.names], dtype=str)
+        self.kinds = np.array([rows[number][1] for number in keep], dtype=str)
+        self.classes = np.array([rows[number][2] for number in keep], dtype=str)
+        self.masses = np.array([rows[number][3] for number in keep], dtype=float)
+        self.power_to_weight = np.array([rows[number][4] for number in keep], dtype=float)
+        self.locations = [locations[number] for number in keep]
+        self.file_entries = sum(location is not None for location in self.locations)  # Entries from the catalog files
+        # Sorting by name keeps the built-in entries first, in their usual menu order
+        built_in = len(self.names) - self.file_entries
+        self.name_order = np.concatenate([np.arange(built_in), built_in + np.argsort(self.lower_names[built_in:], kind="stable")])
+        # Each catalog has its own cache (functools.lru_cache on a method would be shared by all of them)
+        self.cached_spec = functools.lru_cache(maxsize=cache_size)(self.read_spec)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def load_index(self, path):
+        # [(file path, index rows), ...] for every file of the catalog. Uses the saved index for unchanged files.
+        if os.path.isdir(path):
+            index_path = os.path.join(path, CATALOG_INDEX_FILE)
+            file_names = sorted(entry.name for entry in os.scandir(path)
+                                if entry.is_file() and entry.name.endswith(SPEC_EXTENSIONS) and entry.name != CATALOG_INDEX_FILE)
+            files = [(file_name, os.path.join(path, file_name)) for file_name in file_names]
+        else:
+            index_path = path + ".index.json"
+            files = [(os.path.basename(path), path)]
+
+        saved = {}
+        try:
+            with open(index_path) as index_file_handle:
+                data = json.load(index_file_handle)
+            if data.get("version") == CATALOG_INDEX_VERSION:
+                saved = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass  # No index yet, or a broken one: it is made again
+
+        start = time.perf_counter()
+        index, result, changed = {}, [], 0
+        for file_name, file_path in files:
+            stamp = file_stamp(file_path)
+            entry = saved.get(file_name)
+            if entry is None or entry["stamp"] != stamp:
+                try:
+                    entry = {"stamp": stamp, "entries": index_file(file_path)}
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Catalog: skipping {file_path}: {e}")
+                    continue
+                changed += 1
+            index[file_name] = entry
+            result.append((file_path, entry["entries"]))
+
+        if changed or len(index) != len(saved):
+            print(f"Catalog: indexed {changed} changed file(s) of {len(files)} in {time.perf_counter() - start:.2f} s")
+            try:
+                with open(index_path, "w") as index_file_handle:
+                    json.dump({"version": CATALOG_INDEX_VERSION, "files": index}, index_file_handle)
+            except OSError as e:
+                print(f"Catalog: couldn't save the index: {e}")
+        return result
+
+    def read_spec(self, row):
+        location = self.locations[row]
+        name = self.names[row]
+        if location is None:
+            return VEHICLE_CONFIGS[name] if self.kinds[row] == "vehicle" else TRAILER_CONFIGS[name]
+        file_path, offset, length = location
+        if offset is None:
+            spec = read_spec_file(file_path)
+        else:
+            with open(file_path, "rb") as lines_file:
+                lines_file.seek(offset)
+                spec = json.loads(lines_file.read(length))
+        spec.pop('name', None)
+        spec.pop('kind', None)
+        return spec
+
+    def spec(self, name):
+        # The full spec of a vehicle or trailer, parsed on the first call and then kept (LRU).
+        # Like VEHICLE_CONFIGS entries: copy it before changing it.
+        return self.cached_spec(self.rows[name])
+
+    def info(self, name):
+        # The index values of one entry, no file is read
+        row = self.rows[name]
+        return {"name": name, "kind": str(self.kinds[row]), "class": str(self.classes[row]),
+                "mass": float(self.masses[row]), "power_to_weight": float(self.power_to_weight[row])}
+
+    def vehicle_classes(self, kind="vehicle"):
+        return sorted(str(name) for name in set(self.classes[self.kinds == kind]))
+
+    def query(self, kind="vehicle", vehicle_class=None, name_contains=None, min_mass=None, max_mass=None,
+              min_power_to_weight=None, max_power_to_weight=None, sort_by="name", descending=False,
+              page=0, page_size=CATALOG_PAGE_SIZE):
+        # One page of names that match every filter given, and the number of matches.
+        # Only the index is used, so this is fast for any catalog size.
+        mask = self.kinds == kind
+        if vehicle_class is not None:
+            mask &= self.classes == vehicle_class
+        if name_contains:
+            mask &= np.char.find(self.lower_names, name_contains.lower()) >= 0
+        if min_mass is not None:
+            mask &= self.masses >= min_mass
+        if max_mass is not None:
+            mask &= self.masses <= max_mass
+        if min_power_to_weight is not None:
+            mask &= self.power_to_weight >= min_power_to_weight
+        if max_power_to_weight is not None:
+            mask &= self.power_to_weight <= max_power_to_weight
+
+        if sort_by == "name":
+            rows = self.name_order[mask[self.name_order]]
+        elif sort_by in ("mass", "power_to_weight"):
+            rows = np.nonzero(mask)[0]
+            values = self.masses[rows] if sort_by == "mass" else self.power_to_weight[rows]
+            rows = rows[np.argsort(values, kind="stable")]
+        else:
+            raise ValueError(f"Can't sort by {sort_by!r}, use one of {', '.join(SORT_KEYS)}")
+        if descending:
+            rows = rows[::-1]
+        start = page * page_size
+        return [str(name) for name in self.names[rows[start:start + page_size]]], len(rows)
+
+
+def find_catalog():
+    # The catalog in the project folder (main.py changes the working directory there), or None
+    for path in CATALOG_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def open_catalog(path=None):
+    # The built-in vehicles and trailers plus the ones of the catalog at path (or the one find_catalog finds)
+    path = find_catalog() if path is None else path
+    start = time.perf_counter()
+    catalog = VehicleCatalog(path)
+    print(f"Catalog: {len(catalog)} vehicles and trailers ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List one page of a vehicle catalog")
+    parser.add_argument("path", nargs="?", help="catalog folder or .jsonl file (default: the one in the project folder)")
+    parser.add_argument("--kind", default="vehicle", choices=["vehicle", "trailer"])
+    parser.add_argument("--class", dest="vehicle_class", help="only this class (car, truck, electric or the spec's vehicle_class)")
+    parser.add_argument("--name", help="only names that contain this text")
+    parser.add_argument("--min-mass", type=float)
+    parser.add_argument("--max-mass", type=float)
+    parser.add_argument("--min-power-to-weight", type=float, help="kW per tonne")
+    parser.add_argument("--max-power-to-weight", type=float, help="kW per tonne")
+    parser.add_argument("--sort", default="name", choices=SORT_KEYS)
+    parser.add_argument("--descending", action="store_true")
+    parser.add_argument("--page", type=int, default=0)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--spec", metavar="NAME", help="print the full spec of this entry")
+    args = parser.parse_args()
+
+    if args.path is None:
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    catalog = open_catalog(args.path)
+    if args.spec:
+        print(json.dumps(catalog.spec(args.spec), indent=1))
+        return
+    start = time.perf_counter()
+    names, total = catalog.query(args.kind, args.vehicle_class, args.name, args.min_mass, args.max_mass,
+                                 args.min_power_to_weight, args.max_power_to_weight, args.sort, args.descending,
+                                 args.page, args.page_size)
+    print(f"{total} matches ({(time.perf_counter() - start) * 1000:.1f} ms), page {args.page + 1} of {max(1, -(-total // args.page_size))}:")
+    for name in names:
+        info = catalog.info(name)
+        print(f"    {name:<32} {info['class']:<10} {info['mass']:9,.0f} kg {info['power_to_weight']:7.1f} kW/t")
+
+
+if __name__ == "__main__":
+    main()
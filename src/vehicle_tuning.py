@@ -0,0 +1,119 @@
+# vehicle_tuning.py
+# This file lets you tune a vehicle while the game is running, without restarting it.
+# Put your changes in vehicle_tuning.json in the project folder, for example:
+#     {"Sports car": {"mass": 1350, "final_drive_ratio": 3.9, "torque_curve": [[1000, 300], [4000, 480], [7000, 400]]}}
+# - Each entry is merged over the vehicle's entry in VEHICLE_CONFIGS, so you only write the keys you change.
+#   Removing an entry (or the whole file) brings the built-in values back.
+# - The game checks the file's modification time a few times per second (that is cheap). When the file changed
+#   it is read again, and only the vehicles whose merged config really changed are updated in VEHICLE_CONFIGS.
+# - The running vehicle picks up its new config at the start of the next frame (see Vehicle.apply_config):
+#   the curves and gear tables are rebuilt, the pictures only if an image path changed. Speed, position, gear
+#   and the totals are kept, so you see the effect of a change right away.
+# - If the file has a mistake (bad JSON, a missing key, an unknown vehicle) the error is printed and the last
+#   good config stays. Switching between electric and combustion engine needs a restart.
+# The menu's performance cards of the changed vehicles are simulated again when you go back to the menu.
+#
+# Write the current config of a vehicle to the file as a starting point (run it from the src folder):
+#     python vehicle_tuning.py "Sports car"
+
+import argparse
+import json
+import os
+import time
+from vehicle_configs import VEHICLE_CONFIGS
+from sim_server import validate_request
+
+TUNING_FILE = "vehicle_tuning.json"  # In the project folder (main.py changes the working directory there)
+TUNING_CHECK_INTERVAL = 0.25  # seconds between two checks of the file's modification time
+
+
+def read_tuning_file(path):
+    # {vehicle name: {key: value}} from the file. Raises ValueError if the file is not valid.
+    with open(path) as tuning_file:
+        try:
+            tuning = json.load(tuning_file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not valid JSON: {e}")
+    if not isinstance(tuning, dict) or not all(isinstance(changes, dict) for changes in tuning.values()):
+        raise ValueError(f"{path} must look like {{\"Vehicle name\": {{\"key\": value, ...}}, ...}}")
+    return tuning
+
+
+class TuningWatcher:
+    def __init__(self, path=TUNING_FILE, configs=VEHICLE_CONFIGS, check_interval=TUNING_CHECK_INTERVAL):
+        self.path = path
+        self.configs = configs  # Changed in place, so everybody who imported VEHICLE_CONFIGS sees the new values
+        # What we go back to when a vehicle is removed from the file. Made through JSON like the file itself
+        # (tuples become lists), so an unchanged value in the file is seen as unchanged.
+        self.built_in = json.loads(json.dumps(configs))
+        self.current = json.loads(json.dumps(configs))
+        self.check_interval = check_interval
+        self.last_check = 0
+        self.last_modified = None  # None means "no file"
+        self.poll(force=True)
+
+    def file_modified_time(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def poll(self, force=False):
+        # Call this once per frame. Returns the names of the vehicles whose config changed (usually none).
+        now = time.monotonic()
+        if not force and now - self.last_check < self.check_interval:
+            return []
+        self.last_check = now
+        modified = self.file_modified_time()
+        if modified == self.last_modified:
+            return []
+        self.last_modified = modified
+        start = time.perf_counter()
+        try:
+            tuning = read_tuning_file(self.path) if modified is not None else {}
+            merged = self.merge(tuning)
+        except (OSError, ValueError) as e:
+            print(f"Vehicle tuning not applied, keeping the last good config: {e}")
+            return []
+
+        changed = [name for name, config in merged.items() if config != self.current[name]]
+        for name in changed:
+            self.configs[name] = self.current[name] = merged[name]
+        if changed:
+            print(f"Vehicle tuning applied to {', '.join(changed)} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return changed
+
+    def merge(self, tuning):
+        # The full config of every vehicle with the changes from the file. Checks the changed ones.
+        unknown = [name for name in tuning if name not in self.built_in]
+        if unknown:
+            raise ValueError(f"Unknown vehicle(s) {', '.join(unknown)}, choose from {', '.join(self.built_in)}")
+        merged = {}
+        for name, built_in in self.built_in.items():
+            config = dict(built_in, **tuning.get(name, {}))
+            if name in tuning:
+                try:
+                    validate_request({'config': config})
+                except (TypeError, ValueError) as e:
+                    raise ValueError(f"{name}: {e}")
+                if config.get('is_electric', False) != built_in.get('is_electric', False):
+                    raise ValueError(f"{name}: switching between electric and combustion engine needs a restart")
+            merged[name] = config
+        return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a vehicle's current config to the tuning file")
+    parser.add_argument("vehicle", choices=list(VEHICLE_CONFIGS))
+    parser.add_argument("--file", default=os.path.join("..", TUNING_FILE), help="tuning file (default: the one the game watches)")
+    args = parser.parse_args()
+
+    tuning = read_tuning_file(args.file) if os.path.exists(args.file) else {}
+    tuning[args.vehicle] = VEHICLE_CONFIGS[args.vehicle]
+    with open(args.file, "w") as tuning_file:
+        json.dump(tuning, tuning_file, indent=1)
+    print(f"{args.vehicle} written to {args.file}, edit it while the game is running")
+
+
+if __name__ == "__main__":
+    main()